@@ -7,7 +7,7 @@ class ProductoForm(forms.ModelForm):
     
     class Meta:
         model = Producto
-        fields = ['nombre', 'descripcion', 'precio_referencia']
+        fields = ['nombre', 'descripcion', 'precio_referencia', 'stock_minimo']
         widgets = {
             'nombre': forms.TextInput(attrs={
                 'class': 'form-input',
@@ -23,6 +23,11 @@ class ProductoForm(forms.ModelForm):
                 'placeholder': 'Precio en pesos chilenos',
                 'min': '0',
                 'step': '100'
+            }),
+            'stock_minimo': forms.NumberInput(attrs={
+                'class': 'form-input',
+                'placeholder': 'Unidades mínimas por ubicación',
+                'min': '0'
             })
         }
     
@@ -31,6 +36,7 @@ class ProductoForm(forms.ModelForm):
         self.fields['nombre'].label = 'Nombre del Producto'
         self.fields['descripcion'].label = 'Descripción'
         self.fields['precio_referencia'].label = 'Precio de Referencia (pesos chilenos)'
+        self.fields['stock_minimo'].label = 'Stock Mínimo'
 
 class InventarioForm(forms.ModelForm):
     """Formulario para crear/editar inventarios"""
@@ -14,6 +14,7 @@ urlpatterns = [
     path('usuarios/', login_required(views.usuarios_view), name='usuarios'),
     path('usuarios/obtener/<int:usuario_id>/', login_required(views.obtener_usuario), name='obtener_usuario'),
     path('usuarios/guardar/', login_required(views.guardar_usuario), name='guardar_usuario'),
+    path('usuarios/importar/', login_required(views.importar_usuarios), name='importar_usuarios'),
     path('usuarios/eliminar/<int:usuario_id>/', login_required(views.eliminar_usuario), name='eliminar_usuario'),
     path('usuarios/cambiar-estado/<int:usuario_id>/', login_required(views.cambiar_estado_usuario), name='cambiar_estado_usuario'),
     path('usuarios/exportar-excel/', login_required(views.exportar_usuarios_excel), name='exportar_usuarios_excel'),
@@ -26,6 +27,10 @@ urlpatterns = [
     path('inventarios/', login_required(views.inventarios_view), name='inventarios'),
     path('inventarios/agregar/', login_required(views.agregar_inventario), name='agregar_inventario'),
     path('inventarios/editar/<int:inventario_id>/', login_required(views.editar_inventario), name='editar_inventario'),
+    path('inventarios/conteo/', login_required(views.conteo_fisico_view), name='conteo_fisico'),
+    path('inventarios/conteo/<int:conteo_id>/', login_required(views.conteo_fisico_detalle), name='conteo_fisico_detalle'),
+    path('inventarios/conteo/<int:conteo_id>/aplicar/', login_required(views.aplicar_conteo_fisico), name='aplicar_conteo_fisico'),
+    path('inventarios/conteo/<int:conteo_id>/descartar/', login_required(views.descartar_conteo_fisico), name='descartar_conteo_fisico'),
     path('proveedores/', login_required(views.proveedores_view), name='proveedores'),
     path('proveedores/obtener/<int:proveedor_id>/', login_required(views.obtener_proveedor), name='obtener_proveedor'),
     path('proveedores/guardar/', login_required(views.guardar_proveedor), name='guardar_proveedor'),
@@ -1,22 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import ValidationError
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
+from django.conf import settings
 from django.utils import timezone
-from django.core.paginator import Paginator
-from django.core.mail import send_mail
+from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.urls import reverse
+from django.db import transaction
+from django.db.models import F
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.contrib.auth.hashers import make_password
-from django.conf import settings
 from productos.models import Producto
-from inventarios.models import Inventario
+from inventarios.models import Inventario, ConteoFisico, AlertaStock
+from inventarios.conteos import crear_conteo, aplicar_conteo
+from inventarios import ajustes
 from usuarios.models import Usuario, PasswordResetToken
+from usuarios import limite_login, preferencias
+from usuarios.alta_masiva import contrasena_temporal, encolar_importacion
+from notificaciones.correo import encolar
+from roles.permisos import requiere_permiso, tiene_permiso
 from .forms import ProductoForm, InventarioForm
 
 def login_view(request):
@@ -29,6 +36,12 @@ def login_view(request):
         username = request.POST.get('username')
         password = request.POST.get('password')
         
+        # Rechazar antes de autenticar para no calcular el hash en un ataque
+        espera = limite_login.esperar(request, username)
+        if espera:
+            messages.error(request, f'Demasiados intentos fallidos. Intenta de nuevo en {espera} segundos.')
+            return render(request, 'dashboard/new_login.html', status=429)
+        
         user = authenticate(request, username=username, password=password)
         if user is not None:
             login(request, user)
@@ -65,7 +78,7 @@ def home(request):
     }
     
     # Datos ficticios para proveedores y ventas (solo para administradores)
-    if user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador'):
+    if tiene_permiso(user, 'ver_resumen'):
         context.update({
             'proveedores_count': 12,  # Ficticio
             'ventas_count': 156,      # Ficticio
@@ -79,11 +92,11 @@ def productos_view(request):
     user = request.user
     
     # Verificar permisos según rol
-    rol_nombre = user.id_rol.nombre if hasattr(user, 'id_rol') and user.id_rol else None
+    rol_nombre = user.nombre_rol
     es_vendedor = rol_nombre == 'Vendedor'
     es_bodeguero = rol_nombre == 'Bodeguero'
-    puede_crear_editar = user.is_superuser or rol_nombre in ['Administrador', 'Bodeguero']
-    puede_eliminar = user.is_superuser or rol_nombre == 'Administrador'
+    puede_crear_editar = tiene_permiso(user, 'editar_productos')
+    puede_eliminar = tiene_permiso(user, 'eliminar_productos')
     
     productos = Producto.objects.all()
     
@@ -110,16 +123,8 @@ def productos_view(request):
     
     productos = productos.order_by(order_field)
     
-    # Paginación - obtener de sesión o de parámetro GET
-    per_page_param = request.GET.get('per_page')
-    if per_page_param:
-        per_page = int(per_page_param)
-        request.session['productos_per_page'] = per_page
-    else:
-        per_page = request.session.get('productos_per_page', 10)
-        # Asegurar que sea entero
-        if isinstance(per_page, str):
-            per_page = int(per_page)
+    # Paginación - parámetro GET o la última preferencia del usuario
+    per_page = preferencias.por_pagina(request, 'productos')
     
     paginator = Paginator(productos, per_page)
     page = request.GET.get('page', 1)
@@ -146,14 +151,28 @@ def inventarios_view(request):
     user = request.user
     
     # Verificar permisos según rol
-    rol_nombre = user.id_rol.nombre if hasattr(user, 'id_rol') and user.id_rol else None
+    rol_nombre = user.nombre_rol
     es_vendedor = rol_nombre == 'Vendedor'
     es_bodeguero = rol_nombre == 'Bodeguero'
-    puede_editar = user.is_superuser or rol_nombre in ['Administrador', 'Bodeguero']
+    puede_editar = tiene_permiso(user, 'mover_stock')
     
-    inventarios = Inventario.objects.select_related('id_producto').all()
+    inventarios = Inventario.objects.select_related('id_producto', 'metrica').all()
     now = timezone.now()
     
+    # Ordenamiento por columnas; las métricas se leen ya calculadas
+    ordenes = {
+        'producto': [F('id_producto__nombre').asc()],
+        'stock': [F('cantidad_actual').asc()],
+        '-stock': [F('cantidad_actual').desc()],
+        'rotacion': [F('metrica__rotacion').asc(nulls_last=True)],
+        '-rotacion': [F('metrica__rotacion').desc(nulls_last=True)],
+        'cobertura': [F('metrica__dias_cobertura').asc(nulls_last=True)],
+        '-cobertura': [F('metrica__dias_cobertura').desc(nulls_last=True)],
+    }
+    orden = request.GET.get('orden', '')
+    if orden in ordenes:
+        inventarios = inventarios.order_by(*ordenes[orden], 'id_inventario')
+    
     # Mock data para proveedores
     class MockProveedor:
         def __init__(self, id_proveedor, nombre):
@@ -172,36 +191,29 @@ def inventarios_view(request):
         'total_productos': inventarios.count(),
         'stock_alto': 0,  # Calcular basado en lógica de stock
         'stock_medio': 0,
-        'stock_bajo': 0,
+        'stock_bajo': AlertaStock.objects.filter(estado__in=['activa', 'notificada']).count(),
         'today': now.date(),
         'user': request.user,
         'es_vendedor': es_vendedor,
         'es_bodeguero': es_bodeguero,
         'puede_editar': puede_editar,
+        'orden': orden,
     }
     return render(request, 'dashboard/inventarios.html', context)
 
 @login_required
+@requiere_permiso('gestionar_proveedores', 'No tienes permisos para acceder a esta sección')
 def proveedores_view(request):
     """Vista de gestión de proveedores"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        raise PermissionDenied("No tienes permisos para acceder a esta sección")
-    
     from proveedores.models import Proveedor
     from django.db.models import Q
     
     # Obtener parámetros de búsqueda y filtro
     search = request.GET.get('search', '')
-    per_page = request.GET.get('per_page', request.session.get('proveedores_per_page', 10))
+    per_page = preferencias.por_pagina(request, 'proveedores')
     order_by = request.GET.get('order_by', 'id_proveedor')
     order_direction = request.GET.get('order_direction', 'asc')
     
-    # Guardar per_page en sesión
-    request.session['proveedores_per_page'] = int(per_page)
-    
     # Obtener proveedores
     proveedores = Proveedor.objects.all()
     
@@ -239,7 +251,7 @@ def proveedores_view(request):
         'productos_proveedor': productos_disponibles.count(),
         'ordenes_pendientes': 0,
         'search': search,
-        'per_page': int(per_page),
+        'per_page': per_page,
         'order_by': order_by,
         'order_direction': order_direction,
         'user': request.user,
@@ -247,14 +259,9 @@ def proveedores_view(request):
     return render(request, 'dashboard/proveedores.html', context)
 
 @login_required
+@requiere_permiso('gestionar_proveedores', json=True)
 def obtener_proveedor(request, proveedor_id):
     """API para obtener datos de un proveedor en formato JSON"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    
     try:
         from proveedores.models import Proveedor
         from producto_proveedor.models import ProductoProveedor
@@ -294,14 +301,9 @@ def obtener_proveedor(request, proveedor_id):
         return JsonResponse({'success': False, 'message': f'Error: {str(e)}'}, status=500)
 
 @login_required
+@requiere_permiso('gestionar_proveedores', json=True)
 def guardar_proveedor(request):
     """API para crear o actualizar un proveedor"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
     
@@ -408,17 +410,12 @@ def guardar_proveedor(request):
         return JsonResponse({'success': False, 'message': f'Error al guardar: {str(e)}'}, status=500)
 
 @login_required
+@requiere_permiso('gestionar_proveedores', 'No tienes permisos para eliminar proveedores', json=True)
 def eliminar_proveedor(request, proveedor_id):
     """API para eliminar un proveedor"""
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
     
-    user = request.user
-    
-    # Verificar permisos - solo administradores
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos para eliminar proveedores'}, status=403)
-    
     try:
         from proveedores.models import Proveedor
         
@@ -440,14 +437,9 @@ def eliminar_proveedor(request, proveedor_id):
         return JsonResponse({'success': False, 'message': f'Error al eliminar: {str(e)}'}, status=500)
 
 @login_required
+@requiere_permiso('gestionar_proveedores', json=True)
 def exportar_proveedores_excel(request):
     """Exportar proveedores a Excel con formato profesional"""
-    user = request.user
-    
-    # Solo administradores pueden exportar
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    
     try:
         import openpyxl
         from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
@@ -561,37 +553,66 @@ def exportar_proveedores_excel(request):
         return JsonResponse({'success': False, 'message': f'Error al exportar: {str(e)}'}, status=500)
 
 @login_required
+@requiere_permiso('ver_ventas', 'No tienes permisos para acceder a esta sección')
 def ventas_view(request):
-    """Vista ficticia de ventas"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        raise PermissionDenied("No tienes permisos para acceder a esta sección")
-    
-    # Datos ficticios
+    """Vista de ventas con filtro y ordenamiento por total"""
+    from ventas.models import Venta
+
+    ventas_qs = Venta.objects.select_related('id_cliente')
+
+    # Filtros por total y cliente (servidos por los índices de venta.total)
+    total_min = request.GET.get('total_min', '')
+    total_max = request.GET.get('total_max', '')
+    cliente_id = request.GET.get('cliente', '')
+    if total_min.isdigit():
+        ventas_qs = ventas_qs.filter(total__gte=int(total_min))
+    if total_max.isdigit():
+        ventas_qs = ventas_qs.filter(total__lte=int(total_max))
+    if cliente_id.isdigit():
+        ventas_qs = ventas_qs.filter(id_cliente=int(cliente_id))
+
+    # Ordenamiento
+    order_by = request.GET.get('order_by', 'fecha')
+    order_direction = request.GET.get('order_direction', 'desc')
+    if order_by not in ['fecha', 'total', 'id_venta']:
+        order_by = 'fecha'
+    order_field = f'-{order_by}' if order_direction == 'desc' else order_by
+    ventas_qs = ventas_qs.order_by(order_field)
+
+    paginator = Paginator(ventas_qs, 25)
+    ventas_page = paginator.get_page(request.GET.get('page', 1))
+
     ventas = [
-        {'id': 1, 'fecha': '2025-01-15', 'cliente': 'Cliente A', 'total': 50000, 'estado': 'Completada'},
-        {'id': 2, 'fecha': '2025-01-14', 'cliente': 'Cliente B', 'total': 75000, 'estado': 'Pendiente'},
-        {'id': 3, 'fecha': '2025-01-13', 'cliente': 'Cliente C', 'total': 30000, 'estado': 'Completada'},
+        {
+            'id': venta.id_venta,
+            'fecha': venta.fecha,
+            'cliente': venta.id_cliente.nombre,
+            'total': venta.total,
+            'items': venta.items_count,
+            'unidades': venta.units_count,
+            'estado': 'Completada',
+        }
+        for venta in ventas_page
     ]
-    
+
     context = {
         'ventas': ventas,
+        'ventas_page': ventas_page,
+        'total_ventas': paginator.count,
+        'total_min': total_min,
+        'total_max': total_max,
+        'order_by': order_by,
+        'order_direction': order_direction,
         'user': request.user,
     }
     return render(request, 'dashboard/ventas.html', context)
 
 @login_required
+@requiere_permiso('editar_productos', 'No tienes permisos para agregar productos', redirigir='dashboard:productos')
 def agregar_producto(request):
     """Vista para agregar un nuevo producto"""
     user = request.user
     
-    # Verificar permisos
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre in ['Administrador', 'Bodeguero'])):
-        messages.error(request, 'No tienes permisos para agregar productos')
-        return redirect('dashboard:productos')
-    
     if request.method == 'POST':
         form = ProductoForm(request.POST)
         if form.is_valid():
@@ -611,16 +632,12 @@ def agregar_producto(request):
     return render(request, 'dashboard/form_producto.html', context)
 
 @login_required
+@requiere_permiso('editar_productos', 'No tienes permisos para editar productos', redirigir='dashboard:productos')
 def editar_producto(request, producto_id):
     """Vista para editar un producto existente"""
     user = request.user
     producto = get_object_or_404(Producto, id_producto=producto_id)
     
-    # Solo administradores pueden editar
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        messages.error(request, 'No tienes permisos para editar productos')
-        return redirect('dashboard:productos')
-    
     if request.method == 'POST':
         form = ProductoForm(request.POST, instance=producto)
         if form.is_valid():
@@ -639,19 +656,20 @@ def editar_producto(request, producto_id):
     return render(request, 'dashboard/form_producto.html', context)
 
 @login_required
+@requiere_permiso('editar_inventario', 'Solo los administradores pueden agregar inventarios', redirigir='dashboard:inventarios')
 def agregar_inventario(request):
     """Vista para agregar un nuevo inventario"""
     user = request.user
     
-    # Solo administradores pueden agregar inventarios
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        messages.error(request, 'Solo los administradores pueden agregar inventarios')
-        return redirect('dashboard:inventarios')
-    
     if request.method == 'POST':
         form = InventarioForm(request.POST)
         if form.is_valid():
-            form.save()
+            inventario = form.save()
+            ajustes.registrar(
+                [(inventario.id_inventario, inventario.id_producto_id, inventario.ubicacion, 0, inventario.cantidad_actual)],
+                'edicion',
+                user,
+            )
             messages.success(request, 'Inventario agregado exitosamente')
             return redirect('dashboard:inventarios')
     else:
@@ -665,20 +683,26 @@ def agregar_inventario(request):
     return render(request, 'dashboard/form_inventario.html', context)
 
 @login_required
+@requiere_permiso('editar_inventario', 'No tienes permisos para editar inventarios', redirigir='dashboard:inventarios')
 def editar_inventario(request, inventario_id):
     """Vista para editar un inventario existente"""
     user = request.user
     inventario = get_object_or_404(Inventario, id_inventario=inventario_id)
     
-    # Solo administradores pueden editar
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        messages.error(request, 'No tienes permisos para editar inventarios')
-        return redirect('dashboard:inventarios')
-    
     if request.method == 'POST':
+        # El formulario modifica la instancia al validar: guardar antes el valor anterior
+        anterior = (inventario.ubicacion, inventario.cantidad_actual)
         form = InventarioForm(request.POST, instance=inventario)
         if form.is_valid():
             form.save()
+            ajustes.registrar_edicion(
+                inventario.id_inventario,
+                inventario.id_producto_id,
+                anterior,
+                (inventario.ubicacion, inventario.cantidad_actual),
+                'edicion',
+                user,
+            )
             messages.success(request, 'Inventario actualizado exitosamente')
             return redirect('dashboard:inventarios')
     else:
@@ -692,39 +716,138 @@ def editar_inventario(request, inventario_id):
     }
     return render(request, 'dashboard/form_inventario.html', context)
 
+def _puede_contar(user):
+    return tiene_permiso(user, 'mover_stock')
+
+@login_required
+def conteo_fisico_view(request):
+    """Vista para cargar la planilla de un conteo físico"""
+    user = request.user
+    
+    # Administradores y bodegueros pueden cargar conteos
+    if not _puede_contar(user):
+        messages.error(request, 'No tienes permisos para cargar conteos físicos')
+        return redirect('dashboard:inventarios')
+    
+    if request.method == 'POST':
+        archivo = request.FILES.get('archivo')
+        if not archivo or not archivo.name.lower().endswith(('.csv', '.xlsx')):
+            messages.error(request, 'Selecciona un archivo CSV o XLSX')
+            return redirect('dashboard:conteo_fisico')
+        
+        try:
+            conteo, errores = crear_conteo(archivo, archivo.name, user)
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+            return redirect('dashboard:conteo_fisico')
+        
+        for error in errores:
+            messages.warning(request, error)
+        messages.success(
+            request,
+            f'Planilla procesada: {conteo.filas_leidas} filas leídas, {conteo.diferencias.count()} diferencias'
+        )
+        return redirect('dashboard:conteo_fisico_detalle', conteo_id=conteo.id_conteo)
+    
+    context = {
+        'user': user,
+        'conteos': ConteoFisico.objects.select_related('id_usuario')[:10],
+    }
+    return render(request, 'dashboard/conteo_fisico.html', context)
+
+@login_required
+def conteo_fisico_detalle(request, conteo_id):
+    """Vista con las diferencias de un conteo antes de aplicarlo"""
+    user = request.user
+    if not _puede_contar(user):
+        messages.error(request, 'No tienes permisos para ver conteos físicos')
+        return redirect('dashboard:inventarios')
+    
+    conteo = get_object_or_404(ConteoFisico, id_conteo=conteo_id)
+    diferencias = conteo.diferencias.select_related('id_producto')
+    paginator = Paginator(diferencias, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'user': user,
+        'conteo': conteo,
+        'page_obj': page_obj,
+        'diferencias': page_obj,
+        'total_diferencias': paginator.count,
+    }
+    return render(request, 'dashboard/conteo_fisico.html', context)
+
+@login_required
+def aplicar_conteo_fisico(request, conteo_id):
+    """Aplica todas las diferencias de un conteo al inventario"""
+    user = request.user
+    if request.method != 'POST' or not _puede_contar(user):
+        messages.error(request, 'No tienes permisos para aplicar conteos físicos')
+        return redirect('dashboard:inventarios')
+    
+    try:
+        ajustadas = aplicar_conteo(conteo_id, usuario=user)
+    except ConteoFisico.DoesNotExist:
+        messages.error(request, 'El conteo no existe')
+        return redirect('dashboard:conteo_fisico')
+    except ValidationError as e:
+        messages.error(request, ' '.join(e.messages))
+        return redirect('dashboard:conteo_fisico_detalle', conteo_id=conteo_id)
+    
+    messages.success(request, f'Conteo aplicado: {ajustadas} registros de inventario ajustados')
+    return redirect('dashboard:inventarios')
+
+@login_required
+def descartar_conteo_fisico(request, conteo_id):
+    """Descarta un conteo pendiente sin tocar el inventario"""
+    user = request.user
+    if request.method != 'POST' or not _puede_contar(user):
+        messages.error(request, 'No tienes permisos para descartar conteos físicos')
+        return redirect('dashboard:inventarios')
+    
+    descartados = ConteoFisico.objects.filter(id_conteo=conteo_id, estado='pendiente').update(estado='descartado')
+    if descartados:
+        messages.success(request, 'Conteo descartado')
+    else:
+        messages.error(request, 'El conteo no está pendiente')
+    return redirect('dashboard:conteo_fisico')
+
 def forgot_password_view(request):
     """Vista para recuperación de contraseña"""
     if request.method == 'POST':
-        email = request.POST.get('email')
+        email = request.POST.get('email', '').strip().lower()
         
         try:
             usuario = Usuario.objects.get(correo=email)
             
-            # Crear token de recuperación
-            token = PasswordResetToken.objects.create(usuario=usuario)
-            
-            # Construir URL de recuperación
-            reset_url = request.build_absolute_uri(
-                f'/reset-password/?token={token.token}'
-            )
-            
-            # Renderizar template de email
-            html_message = render_to_string('dashboard/password_reset_email.html', {
-                'usuario': usuario,
-                'reset_url': reset_url,
-                'token': token
-            })
-            plain_message = strip_tags(html_message)
-            
-            # Enviar email
-            send_mail(
-                subject='Recuperación de Contraseña - Dulcería Lilis',
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                html_message=html_message,
-                fail_silently=False,
-            )
+            with transaction.atomic():
+                # Crear token de recuperación
+                token = PasswordResetToken.objects.create(usuario=usuario)
+                
+                # Construir URL de recuperación
+                reset_url = request.build_absolute_uri(
+                    f'/reset-password/?token={token.token}'
+                )
+                
+                # Renderizar template de email
+                html_message = render_to_string('dashboard/password_reset_email.html', {
+                    'usuario': usuario,
+                    'reset_url': reset_url,
+                    'token': token
+                })
+                
+                # Dejar el email en la bandeja de salida; lo envía el comando enviar_correos
+                encolar(
+                    asunto='Recuperación de Contraseña - Dulcería Lilis',
+                    destinatarios=[usuario.correo],
+                    html=html_message,
+                    confidencial=True,
+                    # Un enlace que llega tarde ya no sirve: no se reintenta pasado el plazo
+                    vence=min(
+                        token.expires_at,
+                        timezone.now() + timedelta(seconds=settings.CORREO_PLAZO_RECUPERACION),
+                    ),
+                )
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({
@@ -766,69 +889,62 @@ def reset_password_view(request):
         return redirect('dashboard:login')
     
     try:
-        token = PasswordResetToken.objects.get(token=token_str)
-        
-        if not token.is_valid():
-            messages.error(request, 'El token ha expirado o ya fue usado. Solicita uno nuevo.')
-            return redirect('dashboard:forgot_password')
+        # Solo tokens vigentes: la validez se revisa en la misma consulta
+        token = PasswordResetToken.objects.validos().select_related('usuario').get(token=token_str)
+    except (PasswordResetToken.DoesNotExist, ValidationError):
+        messages.error(request, 'El token no es válido, ha expirado o ya fue usado. Solicita uno nuevo.')
+        return redirect('dashboard:forgot_password')
+    
+    if request.method == 'POST':
+        password = request.POST.get('password')
+        password_confirm = request.POST.get('password_confirm')
         
-        if request.method == 'POST':
-            password = request.POST.get('password')
-            password_confirm = request.POST.get('password_confirm')
-            
-            if password != password_confirm:
-                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'Las contraseñas no coinciden'
-                    })
-                messages.error(request, 'Las contraseñas no coinciden')
-            elif len(password) < 8:
-                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'La contraseña debe tener al menos 8 caracteres'
-                    })
-                messages.error(request, 'La contraseña debe tener al menos 8 caracteres')
-            else:
+        if password != password_confirm:
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Las contraseñas no coinciden'
+                })
+            messages.error(request, 'Las contraseñas no coinciden')
+        elif len(password) < 8:
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({
+                    'success': False,
+                    'message': 'La contraseña debe tener al menos 8 caracteres'
+                })
+            messages.error(request, 'La contraseña debe tener al menos 8 caracteres')
+        else:
+            with transaction.atomic():
+                # Marcar token como usado; si otra petición lo usó primero no se cambia nada
+                if not PasswordResetToken.objects.validos().filter(pk=token.pk).update(is_used=True):
+                    messages.error(request, 'El token ha expirado o ya fue usado. Solicita uno nuevo.')
+                    return redirect('dashboard:forgot_password')
+                
                 # Cambiar contraseña
                 usuario = token.usuario
                 usuario.password = make_password(password)
                 usuario.save()
-                
-                # Marcar token como usado
-                token.is_used = True
-                token.save()
-                
-                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                    return JsonResponse({
-                        'success': True,
-                        'message': 'Contraseña cambiada exitosamente'
-                    })
-                
-                messages.success(request, 'Contraseña cambiada exitosamente. Ahora puedes iniciar sesión.')
-                return redirect('dashboard:login')
-        
-        context = {
-            'token': token_str,
-            'usuario': token.usuario
-        }
-        return render(request, 'dashboard/reset_password.html', context)
-        
-    except PasswordResetToken.DoesNotExist:
-        messages.error(request, 'Token de recuperación no válido')
-        return redirect('dashboard:login')
+            
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({
+                    'success': True,
+                    'message': 'Contraseña cambiada exitosamente'
+                })
+            
+            messages.success(request, 'Contraseña cambiada exitosamente. Ahora puedes iniciar sesión.')
+            return redirect('dashboard:login')
+    
+    context = {
+        'token': token_str,
+        'usuario': token.usuario
+    }
+    return render(request, 'dashboard/reset_password.html', context)
 
 
 @login_required
+@requiere_permiso('gestionar_usuarios', 'No tienes permisos para gestionar usuarios')
 def usuarios_view(request):
     """Vista de gestión de usuarios con búsqueda, paginación y ordenamiento"""
-    user = request.user
-    
-    # Solo administradores pueden gestionar usuarios
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        raise PermissionDenied("No tienes permisos para gestionar usuarios")
-    
     # Usar el modelo de Usuario personalizado
     from usuarios.models import Usuario
     from roles.models import Rol
@@ -860,16 +976,8 @@ def usuarios_view(request):
     
     usuarios = usuarios.order_by(order_field)
     
-    # Paginación - obtener de sesión o de parámetro GET
-    per_page_param = request.GET.get('per_page')
-    if per_page_param:
-        per_page = int(per_page_param)
-        request.session['usuarios_per_page'] = per_page
-    else:
-        per_page = request.session.get('usuarios_per_page', 10)
-        # Asegurar que sea entero
-        if isinstance(per_page, str):
-            per_page = int(per_page)
+    # Paginación - parámetro GET o la última preferencia del usuario
+    per_page = preferencias.por_pagina(request, 'usuarios')
     
     paginator = Paginator(usuarios, per_page)
     page = request.GET.get('page', 1)
@@ -902,11 +1010,8 @@ def obtener_usuario(request, usuario_id):
     user = request.user
     
     # Solo administradores pueden acceder
-    try:
-        if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-            return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    except Exception as e:
-        return JsonResponse({'success': False, 'message': f'Error verificando permisos: {str(e)}'}, status=500)
+    if not tiene_permiso(user, 'gestionar_usuarios'):
+        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
     
     try:
         from usuarios.models import Usuario
@@ -934,25 +1039,18 @@ def obtener_usuario(request, usuario_id):
         return JsonResponse({'success': False, 'message': f'Error: {str(e)}'}, status=500)
 
 @login_required
+@requiere_permiso('gestionar_usuarios', json=True)
 def guardar_usuario(request):
     """API para crear o actualizar un usuario"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
     
     try:
         from usuarios.models import Usuario
         from roles.models import Rol
-        import secrets
-        import string
         
         usuario_id = request.POST.get('user_id')
-        email = request.POST.get('email', '').strip()
+        email = request.POST.get('email', '').strip().lower()
         nombre = request.POST.get('nombre', '').strip()
         telefono = request.POST.get('telefono', '').strip()
         id_rol = request.POST.get('id_rol')
@@ -1024,8 +1122,7 @@ def guardar_usuario(request):
                 })
             
             # Generar contraseña temporal aleatoria (12 caracteres con letras, números y símbolos)
-            alphabet = string.ascii_letters + string.digits + "!@#$%&*"
-            temp_password = ''.join(secrets.choice(alphabet) for i in range(12))
+            temp_password = contrasena_temporal()
             
             # Crear usuario
             usuario = Usuario(
@@ -1068,14 +1165,41 @@ def guardar_usuario(request):
         }, status=500)
 
 @login_required
+@requiere_permiso('gestionar_usuarios', json=True)
+def importar_usuarios(request):
+    """API para cargar una planilla CSV o XLSX de alta masiva; los usuarios los crea alta_usuarios --pendientes"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+    
+    archivo = request.FILES.get('archivo')
+    if not archivo or not archivo.name.lower().endswith(('.csv', '.xlsx')):
+        return JsonResponse({'success': False, 'message': 'Selecciona un archivo CSV o XLSX'})
+    
+    try:
+        # Los hashes de las contraseñas temporales se calculan fuera de la petición,
+        # en el comando alta_usuarios --pendientes
+        importacion = encolar_importacion(
+            archivo,
+            archivo.name,
+            request.user,
+            activo=request.POST.get('activo', 'on') in ['on', 'true', True],
+            url_login=request.build_absolute_uri(reverse('dashboard:login')),
+        )
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'message': ' '.join(e.messages)})
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Planilla recibida. Los usuarios se crearán en unos minutos y te avisaremos el resultado por correo.',
+        'id_importacion': importacion.id_importacion,
+    })
+
+@login_required
+@requiere_permiso('gestionar_usuarios', 'No tienes permisos para realizar esta acción', json=True)
 def eliminar_usuario(request, usuario_id):
     """API para eliminar un usuario"""
     user = request.user
     
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos para realizar esta acción'}, status=403)
-    
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
     
@@ -1149,14 +1273,11 @@ def cambiar_contrasena_obligatorio(request):
     })
 
 @login_required
+@requiere_permiso('gestionar_usuarios', 'No tienes permisos para realizar esta acción', json=True)
 def cambiar_estado_usuario(request, usuario_id):
     """API para activar/desactivar un usuario"""
     user = request.user
     
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos para realizar esta acción'}, status=403)
-    
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
     
@@ -1200,14 +1321,9 @@ def cambiar_estado_usuario(request, usuario_id):
         }, status=500)
 
 @login_required
+@requiere_permiso('gestionar_usuarios', json=True)
 def exportar_usuarios_excel(request):
     """Exportar lista de usuarios a Excel"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    
     try:
         from usuarios.models import Usuario
         
@@ -1281,14 +1397,9 @@ def exportar_usuarios_excel(request):
         }, status=500)
 
 @login_required
+@requiere_permiso('exportar_productos', json=True)
 def exportar_productos_excel(request):
     """Exportar lista de productos a Excel"""
-    user = request.user
-    
-    # Solo administradores pueden acceder
-    if not (user.is_superuser or (hasattr(user, 'id_rol') and user.id_rol.nombre == 'Administrador')):
-        return JsonResponse({'success': False, 'message': 'No tienes permisos'}, status=403)
-    
     try:
         from productos.models import Producto
         
@@ -1414,10 +1525,7 @@ def actualizar_producto(request):
         return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
     
     # Verificar permisos: Administrador y Bodeguero pueden editar
-    user = request.user
-    rol_nombre = user.id_rol.nombre if hasattr(user, 'id_rol') and user.id_rol else None
-    
-    if rol_nombre not in ['Administrador', 'Bodeguero'] and not user.is_superuser:
+    if not tiene_permiso(request.user, 'editar_productos'):
         return JsonResponse({
             'success': False, 
             'message': 'No tienes permisos para editar productos.'
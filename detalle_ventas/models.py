@@ -1,7 +1,37 @@
-from django.db import models
-from ventas.models import Venta
+from django.db import models, transaction
+from django.db.models import F
+from ventas.models import Venta, Turno
 from productos.models import Producto
 
+class DetalleVentaManager(models.Manager):
+    def crear_lote(self, venta, detalles):
+        """
+        Inserta las líneas de una venta con un solo bulk_create y suma sus
+        totales a la venta en el mismo UPDATE
+        """
+        detalles = list(detalles)
+        for detalle in detalles:
+            detalle.id_venta = venta
+        
+        total, items, unidades = Venta.calcular_totales(detalles)
+        # La venta cuenta en el turno solo la primera vez que recibe líneas
+        venta_nueva = 1 if venta.items_count == 0 else 0
+        
+        with transaction.atomic():
+            creados = self.bulk_create(detalles)
+            Venta.objects.filter(pk=venta.pk).update(
+                total=F('total') + total,
+                items_count=F('items_count') + items,
+                units_count=F('units_count') + unidades,
+            )
+            Turno.acumular([(venta.id_usuario_id, venta.medio_pago, venta_nueva, total, venta.fecha)])
+        
+        # Reflejar los nuevos totales en la instancia sin volver a consultarla
+        venta.total += total
+        venta.items_count += items
+        venta.units_count += unidades
+        return creados
+
 class DetalleVenta(models.Model):
     id_detalle = models.AutoField(primary_key=True)
     id_venta = models.ForeignKey(Venta, on_delete=models.CASCADE)
@@ -9,5 +39,7 @@ class DetalleVenta(models.Model):
     cantidad = models.IntegerField()
     precio_unitario = models.IntegerField()
 
+    objects = DetalleVentaManager()
+
     class Meta:
         db_table = 'detalle_venta'
@@ -47,6 +47,9 @@ INSTALLED_APPS = [
     'detalle_ventas',
     'proveedores',
     'producto_proveedor',
+    'promociones',
+    'kits',
+    'notificaciones',
 ]
 
 MIDDLEWARE = [
@@ -72,6 +75,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'roles.context_processors.permisos',
             ],
         },
     },
@@ -163,11 +167,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Configuración del modelo de usuario personalizado
 AUTH_USER_MODEL = 'usuarios.Usuario'
 
+# Carga el usuario de la sesión junto con su rol en una sola consulta
+AUTHENTICATION_BACKENDS = ['usuarios.backends.UsuarioBackend']
+
+# Cache compartido por todos los procesos del servidor: contadores del límite de login,
+# versiones del catálogo de roles y de promociones, y preferencias de usuario. Por defecto
+# una tabla de la base de datos (crearla con `manage.py createcachetable`); con
+# CACHE_URL=redis://host:6379/0 se usa Redis (requiere el paquete redis)
+CACHE_URL = config('CACHE_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': (
+            'django.core.cache.backends.redis.RedisCache' if CACHE_URL
+            else 'django.core.cache.backends.db.DatabaseCache'
+        ),
+        'LOCATION': CACHE_URL or 'cache_compartido',
+    }
+}
+
+# Motor de sesiones: db (por defecto), cached_db (lee del cache, escribe en la base de datos)
+# o signed_cookies (la sesión viaja firmada en la cookie, sin tabla); comparar con `manage.py benchmark_listados`
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
+
+# Folios de boleta: cantidad reservada por caja en cada acceso a la base de datos
+FOLIO_TAMANO_BLOQUE = config('FOLIO_TAMANO_BLOQUE', default=50, cast=int)
+
+# Reservas de stock para pedidos telefónicos: minutos antes de liberarse
+RESERVA_MINUTOS = config('RESERVA_MINUTOS', default=30, cast=int)
+
+# Checkpoints de inventario: cada cuántos se guarda uno completo en vez de solo los cambios
+CHECKPOINT_BASE_CADA = config('CHECKPOINT_BASE_CADA', default=12, cast=int)
+
+# Costo del hash de contraseñas; medirlo en cada servidor con `manage.py calibrar_hash`
+HASH_ITERACIONES = config('HASH_ITERACIONES', default=1_000_000, cast=int)
+# Hilos para calcular hashes fuera del event loop bajo ASGI (0 = en el mismo hilo)
+HASH_HILOS = config('HASH_HILOS', default=4, cast=int)
+
+PASSWORD_HASHERS = [
+    'usuarios.hashers.PBKDF2Calibrado',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Límite de intentos de login fallidos dentro de la ventana deslizante
+LOGIN_VENTANA_SEGUNDOS = config('LOGIN_VENTANA_SEGUNDOS', default=300, cast=int)
+LOGIN_INTENTOS_IP = config('LOGIN_INTENTOS_IP', default=30, cast=int)
+LOGIN_INTENTOS_USUARIO = config('LOGIN_INTENTOS_USUARIO', default=5, cast=int)
+
 # Configuración de Email
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# En desarrollo: django.core.mail.backends.console.EmailBackend o filebased.EmailBackend
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+# Carpeta donde escribe los correos el backend filebased
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'correos'))
+# Segundos antes de abandonar una conexión SMTP que no responde
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='tu-email@gmail.com')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='tu-app-password')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Bandeja de salida (manage.py enviar_correos): correos por lote, intentos antes
+# de marcarlo fallido, espera inicial entre reintentos (se duplica en cada fallo)
+# y segundos que un worker mantiene reservado un lote
+CORREO_LOTE = config('CORREO_LOTE', default=100, cast=int)
+CORREO_MAX_INTENTOS = config('CORREO_MAX_INTENTOS', default=6, cast=int)
+CORREO_REINTENTO_SEGUNDOS = config('CORREO_REINTENTO_SEGUNDOS', default=60, cast=int)
+CORREO_PLAZO_RECLAMO = config('CORREO_PLAZO_RECLAMO', default=600, cast=int)
+# Segundos para entregar un correo de recuperación de contraseña; pasado ese plazo
+# (o el vencimiento del token) no se reintenta y queda fallido
+CORREO_PLAZO_RECUPERACION = config('CORREO_PLAZO_RECUPERACION', default=900, cast=int)
@@ -32,6 +32,8 @@ urlpatterns = [
     path('usuarios/', include('usuarios.urls')),
     path('productos/', include('productos.urls')),
     path('proveedores/', include('proveedores.urls')),
+    path('ventas/', include('ventas.urls')),
+    path('inventarios/', include('inventarios.urls')),
 ]
 
 # Servir archivos media en desarrollo
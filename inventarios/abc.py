@@ -0,0 +1,118 @@
+"""
+Clasificación ABC por ingresos y calendario de conteo cíclico.
+
+Los ingresos por producto salen de un solo agregado sobre DetalleVenta; el
+orden y la participación acumulada se calculan con numpy. La clase define cada
+cuántos días se cuenta el producto y proximo_conteo, indexado, permite armar
+la lista diaria sin recorrer el inventario.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection
+from django.db.models import Case, DateField, F, Sum, Value, When
+from django.utils import timezone
+from productos.models import Producto
+from .models import ClasificacionABC
+
+# Participación acumulada de ingresos hasta la que llega cada clase
+LIMITE_A = 0.80
+LIMITE_B = 0.95
+
+# Días entre conteos según la clase
+INTERVALO_CONTEO = {'A': 7, 'B': 30, 'C': 90}
+
+
+def clasificar(ingresos):
+    """
+    Recibe un arreglo de ingresos y devuelve (clases, participacion_acumulada)
+    alineados con él. Los productos sin ventas quedan en C
+    """
+    ingresos = np.asarray(ingresos, dtype=np.float64)
+    clases = np.full(len(ingresos), 'C', dtype='<U1')
+    acumulada = np.zeros(len(ingresos), dtype=np.float64)
+    total = ingresos.sum()
+    if not len(ingresos) or total <= 0:
+        return clases, acumulada
+
+    orden = np.argsort(-ingresos, kind='stable')
+    acumulada[orden] = np.cumsum(ingresos[orden]) / total
+    # Un producto es A si la participación acumulada antes de él no supera el límite
+    previa = acumulada - ingresos / total
+    clases[(previa < LIMITE_B) & (ingresos > 0)] = 'B'
+    clases[(previa < LIMITE_A) & (ingresos > 0)] = 'A'
+    return clases, acumulada
+
+
+def recalcular(dias=365):
+    """Reclasifica todos los productos con las ventas de los últimos `dias`; devuelve {clase: cantidad}"""
+    from detalle_ventas.models import DetalleVenta
+
+    ahora = timezone.now()
+    hoy = timezone.localdate()
+    ventas = dict(DetalleVenta.objects.filter(
+        id_venta__fecha__gte=ahora - timedelta(days=dias)
+    ).values_list('id_producto').annotate(ingresos=Sum(F('cantidad') * F('precio_unitario'))).order_by())
+
+    productos = np.fromiter(Producto.objects.values_list('id_producto', flat=True).order_by(), dtype=np.int64)
+    ingresos = np.array([ventas.get(int(id_producto), 0) or 0 for id_producto in productos], dtype=np.float64)
+    clases, acumulada = clasificar(ingresos)
+
+    existentes = {
+        id_producto: (ultimo, proximo)
+        for id_producto, ultimo, proximo in ClasificacionABC.objects.values_list(
+            'id_producto', 'ultimo_conteo', 'proximo_conteo'
+        )
+    }
+    filas = []
+    for id_producto, clase, monto, participacion in zip(productos.tolist(), clases.tolist(), ingresos.tolist(), acumulada.tolist()):
+        intervalo = INTERVALO_CONTEO[clase]
+        ultimo, programado = existentes.get(id_producto, (None, None))
+        if ultimo:
+            proximo = ultimo + timedelta(days=intervalo)
+        else:
+            # Los nunca contados se reparten en el intervalo para no juntar todo el primer día
+            proximo = hoy + timedelta(days=id_producto % intervalo)
+            # Una fecha ya programada se mantiene (si no, se correría cada noche y nunca
+            # llegaría); solo se adelanta si la nueva clase pide contarlo antes
+            if programado and programado < proximo:
+                proximo = programado
+        filas.append(ClasificacionABC(
+            id_producto_id=id_producto,
+            clase=clase,
+            ingresos=int(monto),
+            participacion_acumulada=participacion,
+            fecha_calculo=ahora,
+            ultimo_conteo=ultimo,
+            proximo_conteo=proximo,
+        ))
+
+    ClasificacionABC.objects.bulk_create(
+        filas,
+        batch_size=1000,
+        update_conflicts=True,
+        # MySQL no acepta unique_fields: su ON DUPLICATE KEY UPDATE usa el índice único de id_producto
+        unique_fields=['id_producto'] if connection.features.supports_update_conflicts_with_target else None,
+        update_fields=['clase', 'ingresos', 'participacion_acumulada', 'fecha_calculo', 'proximo_conteo'],
+    )
+    return {clase: int((clases == clase).sum()) for clase in INTERVALO_CONTEO}
+
+
+def registrar_conteo(productos, fecha=None):
+    """Marca productos como contados y reprograma su próximo conteo según su clase"""
+    fecha = fecha or timezone.localdate()
+    return ClasificacionABC.objects.filter(id_producto__in=list(productos)).update(
+        ultimo_conteo=fecha,
+        proximo_conteo=Case(
+            *[When(clase=clase, then=Value(fecha + timedelta(days=dias))) for clase, dias in INTERVALO_CONTEO.items()],
+            output_field=DateField(),
+        ),
+    )
+
+
+def lista_conteo(fecha=None):
+    """Clasificaciones con conteo vencido a la fecha, leídas por el índice de proximo_conteo"""
+    fecha = fecha or timezone.localdate()
+    return ClasificacionABC.objects.filter(proximo_conteo__lte=fecha).select_related('id_producto').order_by(
+        'proximo_conteo', 'clase'
+    )
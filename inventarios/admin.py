@@ -1,26 +1,36 @@
 from django.contrib import admin
-from .models import Inventario
+from django.utils import timezone
+from .models import (
+    Inventario, Lote, Reserva, SugerenciaTransferencia, CheckpointInventario, AlertaStock, ClasificacionABC,
+    AjusteInventario, HallazgoAnomalia,
+)
+from .signals import stock_actualizado
+from . import ajustes
+from roles.permisos import PoliticaAdminMixin, tiene_permiso
 
 class InventarioInline(admin.TabularInline):
     model = Inventario
     extra = 1
     fields = ('id_producto', 'cantidad_actual', 'ubicacion')
 
+class LoteInline(admin.TabularInline):
+    model = Lote
+    extra = 0
+    fields = ('codigo', 'fecha_vencimiento', 'cantidad')
+    ordering = ('fecha_vencimiento',)
+
 @admin.register(Inventario)
-class InventarioAdmin(admin.ModelAdmin):
+class InventarioAdmin(PoliticaAdminMixin, admin.ModelAdmin):
     list_display = ('id_inventario', 'id_producto', 'cantidad_actual', 'ubicacion', 'fecha_ultima_actualizacion')
     search_fields = ('id_producto__nombre', 'ubicacion')
     list_filter = ('ubicacion', 'fecha_ultima_actualizacion')
     ordering = ('-fecha_ultima_actualizacion',)
     list_select_related = ('id_producto',)
     
-    def has_module_permission(self, request):
-        """Controlar acceso al módulo de inventarios"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            # Solo administradores pueden ver inventarios
-            return user_role == 'Administrador'
-        return request.user.is_superuser
+    permiso_modulo = 'editar_inventario'
+    permiso_agregar = 'mover_stock'
+    permiso_cambiar = 'mover_stock'
+    permiso_eliminar = 'editar_inventario'
     
     fieldsets = (
         ('Información del Inventario', {
@@ -33,49 +43,178 @@ class InventarioAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        """Filtrar datos según el rol del usuario"""
+        """Filtrar datos según los permisos del usuario"""
         qs = super().get_queryset(request)
         
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            
-            if user_role == 'Vendedor':
-                # Los vendedores solo pueden ver inventarios con stock > 0
-                qs = qs.filter(cantidad_actual__gt=0)
-            elif user_role == 'Bodeguero':
-                # Los bodegueros pueden ver todos los inventarios
-                pass
-            elif user_role == 'Cliente':
-                # Los clientes no deberían acceder aquí (bloqueado por middleware)
-                qs = qs.none()
+        if not tiene_permiso(request.user, 'admin_sitio'):
+            # Sin acceso al sitio de administración (bloqueado también por middleware)
+            return qs.none()
+        if not tiene_permiso(request.user, 'ver_inventario_sin_stock'):
+            # Los vendedores solo pueden ver inventarios con stock > 0
+            qs = qs.filter(cantidad_actual__gt=0)
         
         return qs
     
-    def has_add_permission(self, request):
-        """Controlar permisos de agregar según rol"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            return user_role in ['Administrador', 'Bodeguero']
-        return request.user.is_superuser
-    
-    def has_change_permission(self, request, obj=None):
-        """Controlar permisos de editar según rol"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            return user_role in ['Administrador', 'Bodeguero']
-        return request.user.is_superuser
-    
-    def has_delete_permission(self, request, obj=None):
-        """Controlar permisos de eliminar según rol"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            return user_role == 'Administrador'
-        return request.user.is_superuser
-    
     def actualizar_stock(self, request, queryset):
         """Acción personalizada para actualizar stock"""
-        updated = queryset.update(cantidad_actual=100)  # Ejemplo: resetear a 100
+        anteriores = list(queryset.values_list('id_inventario', 'id_producto', 'ubicacion', 'cantidad_actual'))
+        updated = queryset.update(cantidad_actual=100, fecha_ultima_actualizacion=timezone.now())  # Ejemplo: resetear a 100
+        ajustes.registrar([(*fila, 100) for fila in anteriores], 'admin', request.user)
+        stock_actualizado.send(sender=Inventario, pares={(fila[1], fila[2]) for fila in anteriores})
         self.message_user(request, f'{updated} registros de inventario actualizados.')
     actualizar_stock.short_description = "Actualizar stock a 100 unidades"
     
     actions = ['actualizar_stock']
+    inlines = [LoteInline]
+    
+    def save_model(self, request, obj, form, change):
+        """Registrar el ajuste de stock hecho desde el formulario de administración"""
+        anterior = (obj.ubicacion, 0)
+        if change:
+            anterior = Inventario.objects.filter(pk=obj.pk).values_list('ubicacion', 'cantidad_actual').first() or anterior
+        super().save_model(request, obj, form, change)
+        ajustes.registrar_edicion(
+            obj.pk, obj.id_producto_id, anterior, (obj.ubicacion, obj.cantidad_actual), 'admin', request.user
+        )
+
+@admin.register(Lote)
+class LoteAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_lote', 'codigo', 'id_producto', 'ubicacion', 'fecha_vencimiento', 'cantidad')
+    search_fields = ('codigo', 'id_producto__nombre', 'ubicacion')
+    list_filter = ('ubicacion', 'fecha_vencimiento')
+    ordering = ('fecha_vencimiento',)
+    list_select_related = ('id_producto',)
+    date_hierarchy = 'fecha_vencimiento'
+    
+    permiso_modulo = 'mover_stock'
+
+
+@admin.register(Reserva)
+class ReservaAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('pedido', 'id_producto', 'ubicacion', 'cantidad', 'id_cliente', 'expira_en')
+    search_fields = ('pedido', 'id_producto__nombre', 'id_cliente__nombre')
+    list_filter = ('ubicacion',)
+    ordering = ('expira_en',)
+    list_select_related = ('id_producto', 'id_cliente')
+    
+    permiso_modulo = 'vender'
+    
+    def has_add_permission(self, request):
+        """Las reservas se crean desde la API de pedidos"""
+        return False
+
+
+@admin.register(SugerenciaTransferencia)
+class SugerenciaTransferenciaAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_producto', 'origen', 'destino', 'cantidad', 'cobertura_destino', 'estado', 'fecha_generada')
+    search_fields = ('id_producto__nombre', 'origen', 'destino')
+    list_filter = ('estado', 'origen', 'destino')
+    ordering = ('cobertura_destino',)
+    list_select_related = ('id_producto',)
+    
+    permiso_modulo = 'mover_stock'
+    
+    def has_add_permission(self, request):
+        """Las sugerencias las genera el comando sugerir_transferencias"""
+        return False
+    
+    def descartar(self, request, queryset):
+        """Marcar las sugerencias seleccionadas como descartadas"""
+        updated = queryset.filter(estado='pendiente').update(estado='descartada')
+        self.message_user(request, f'{updated} sugerencias descartadas.')
+    descartar.short_description = "Descartar sugerencias seleccionadas"
+    
+    actions = ['descartar']
+
+
+@admin.register(CheckpointInventario)
+class CheckpointInventarioAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('fecha', 'es_base', 'id_base', 'filas_guardadas')
+    list_filter = ('es_base',)
+    ordering = ('-fecha',)
+    
+    permiso_modulo = 'ver_valorizacion'
+    
+    def has_add_permission(self, request):
+        """Los checkpoints los genera el comando checkpoint_inventario"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AlertaStock)
+class AlertaStockAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_producto', 'ubicacion', 'cantidad', 'stock_minimo', 'estado', 'fecha_creacion')
+    search_fields = ('id_producto__nombre', 'ubicacion')
+    list_filter = ('estado', 'ubicacion')
+    ordering = ('-fecha_creacion',)
+    list_select_related = ('id_producto',)
+    
+    permiso_modulo = 'mover_stock'
+    
+    def has_add_permission(self, request):
+        """Las alertas se generan al cambiar el stock"""
+        return False
+
+
+@admin.register(ClasificacionABC)
+class ClasificacionABCAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_producto', 'clase', 'ingresos', 'participacion_acumulada', 'ultimo_conteo', 'proximo_conteo')
+    search_fields = ('id_producto__nombre',)
+    list_filter = ('clase',)
+    ordering = ('clase', '-ingresos')
+    list_select_related = ('id_producto',)
+    
+    permiso_modulo = 'mover_stock'
+    
+    def has_add_permission(self, request):
+        """La clasificación la calcula el comando clasificar_abc"""
+        return False
+
+
+@admin.register(AjusteInventario)
+class AjusteInventarioAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('fecha', 'id_producto', 'ubicacion', 'origen', 'cantidad_anterior', 'cantidad_nueva', 'id_usuario')
+    search_fields = ('id_producto__nombre', 'ubicacion', 'id_usuario__username')
+    list_filter = ('origen', 'ubicacion')
+    date_hierarchy = 'fecha'
+    list_select_related = ('id_producto', 'id_usuario')
+    
+    permiso_modulo = 'auditar_inventario'
+    
+    def has_add_permission(self, request):
+        """Los ajustes se registran al modificar el stock"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(HallazgoAnomalia)
+class HallazgoAnomaliaAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('tipo', 'id_producto', 'ubicacion', 'id_usuario', 'unidades', 'valor', 'puntaje', 'estado', 'fecha_deteccion')
+    search_fields = ('id_producto__nombre', 'ubicacion', 'id_usuario__username')
+    list_filter = ('estado', 'tipo', 'ubicacion')
+    ordering = ('-fecha_deteccion', '-puntaje')
+    list_select_related = ('id_producto', 'id_usuario')
+    
+    permiso_modulo = 'auditar_inventario'
+    
+    def has_add_permission(self, request):
+        """Los hallazgos los genera el comando detectar_anomalias"""
+        return False
+    
+    def marcar_revisado(self, request, queryset):
+        """Marcar los hallazgos seleccionados como revisados"""
+        updated = queryset.filter(estado='pendiente').update(estado='revisado')
+        self.message_user(request, f'{updated} hallazgos marcados como revisados.')
+    marcar_revisado.short_description = "Marcar como revisados"
+    
+    def descartar(self, request, queryset):
+        """Descartar los hallazgos seleccionados"""
+        updated = queryset.filter(estado='pendiente').update(estado='descartado')
+        self.message_user(request, f'{updated} hallazgos descartados.')
+    descartar.short_description = "Descartar hallazgos seleccionados"
+    
+    actions = ['marcar_revisado', 'descartar']
@@ -0,0 +1,43 @@
+"""Registro de los cambios de stock que no provienen de ventas"""
+from .models import AjusteInventario
+
+
+def registrar(filas, origen, usuario=None):
+    """
+    Guarda un AjusteInventario por cada (id_inventario, id_producto, ubicacion,
+    cantidad_anterior, cantidad_nueva) que efectivamente cambió, en un solo INSERT
+    """
+    id_usuario = usuario.pk if usuario is not None and usuario.is_authenticated else None
+    ajustes = [
+        AjusteInventario(
+            id_inventario_id=id_inventario,
+            id_producto_id=id_producto,
+            ubicacion=ubicacion,
+            id_usuario_id=id_usuario,
+            origen=origen,
+            cantidad_anterior=anterior,
+            cantidad_nueva=nueva,
+        )
+        for id_inventario, id_producto, ubicacion, anterior, nueva in filas
+        if anterior != nueva
+    ]
+    AjusteInventario.objects.bulk_create(ajustes, batch_size=1000)
+    return len(ajustes)
+
+
+def registrar_edicion(id_inventario, id_producto, anterior, nuevo, origen, usuario=None):
+    """
+    Registra la edición de una fila de inventario; anterior y nuevo son
+    (ubicacion, cantidad). Un cambio de ubicación se guarda como un par
+    'reubicacion' (sale de la anterior y entra en la nueva) y solo la
+    diferencia de cantidad queda con `origen`
+    """
+    (ubicacion_anterior, cantidad_anterior), (ubicacion, cantidad) = anterior, nuevo
+    registrados = 0
+    if ubicacion_anterior != ubicacion:
+        registrados += registrar([
+            (id_inventario, id_producto, ubicacion_anterior, cantidad_anterior, 0),
+            (id_inventario, id_producto, ubicacion, 0, cantidad_anterior),
+        ], 'reubicacion', usuario)
+    registrados += registrar([(id_inventario, id_producto, ubicacion, cantidad_anterior, cantidad)], origen, usuario)
+    return registrados
@@ -0,0 +1,58 @@
+"""
+Alertas de stock bajo.
+
+Se evalúan solo las filas de inventario tocadas por cada escritura (las que
+llegan en la señal stock_actualizado) y quedan registradas en alerta_stock.
+El aviso a bodega se envía después como un resumen periódico.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils import timezone
+from .models import AlertaStock, Inventario
+
+ABIERTAS = ['activa', 'notificada']
+
+
+def evaluar(pares):
+    """
+    Abre una alerta para cada par (id_producto, ubicacion) bajo su stock
+    mínimo que no tenga una abierta, y resuelve las abiertas de los pares que
+    ya se repusieron. Devuelve (creadas, resueltas)
+    """
+    pares = set(pares)
+    if not pares:
+        return 0, 0
+    productos = {id_producto for id_producto, _ in pares}
+    ubicaciones = {ubicacion for _, ubicacion in pares}
+
+    bajo_minimo = {}
+    for id_producto, ubicacion, cantidad, minimo in Inventario.objects.filter(
+        id_producto__in=productos, ubicacion__in=ubicaciones
+    ).values_list('id_producto', 'ubicacion', 'cantidad_actual', 'id_producto__stock_minimo'):
+        if (id_producto, ubicacion) in pares and cantidad < minimo:
+            bajo_minimo[(id_producto, ubicacion)] = (cantidad, minimo)
+
+    abiertas = {
+        par for par in AlertaStock.objects.filter(
+            id_producto__in=productos, ubicacion__in=ubicaciones, estado__in=ABIERTAS
+        ).values_list('id_producto', 'ubicacion')
+        if par in pares
+    }
+
+    nuevas = [
+        AlertaStock(id_producto_id=id_producto, ubicacion=ubicacion, cantidad=cantidad, stock_minimo=minimo)
+        for (id_producto, ubicacion), (cantidad, minimo) in bajo_minimo.items()
+        if (id_producto, ubicacion) not in abiertas
+    ]
+    AlertaStock.objects.bulk_create(nuevas)
+
+    repuestas = abiertas - bajo_minimo.keys()
+    resueltas = 0
+    if repuestas:
+        resueltas = AlertaStock.objects.filter(
+            reduce(or_, (Q(id_producto=id_producto, ubicacion=ubicacion) for id_producto, ubicacion in repuestas)),
+            estado__in=ABIERTAS,
+        ).update(estado='resuelta', fecha_resolucion=timezone.now())
+    return len(nuevas), resueltas
@@ -0,0 +1,158 @@
+"""
+Detección de mermas atípicas a partir de los ajustes manuales de stock.
+
+Para cada fila de inventario el stock esperado es el registrado más lo que
+los ajustes manuales (edición, administración, conteo) le quitaron en la
+ventana: sin ellos, el stock solo habría bajado por ventas y transferencias.
+La merma es esa diferencia. Se leen con un agregado por tabla (ajustes,
+ventas, inventario y precios) y el resto se calcula con numpy:
+
+- por producto y ubicación, la tasa de merma sobre el stock que pasó por la
+  fila (esperado más vendido), comparada con las demás filas de la ubicación
+- por usuario y ubicación, el valor de la merma, comparado con el resto
+
+Se marca lo que supera el puntaje z robusto (mediana y desviación absoluta
+mediana) y se guarda como HallazgoAnomalia pendiente de revisión. Lo que ya
+fue marcado en una ventana que se superpone no se repite, así la ejecución
+nocturna sobre los últimos días no duplica hallazgos.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import F, Sum
+from django.utils import timezone
+from productos.models import Producto
+from .models import AjusteInventario, HallazgoAnomalia, Inventario
+
+# Los movimientos entre ubicaciones (transferencias y cambios de ubicación) no son merma
+ORIGENES_MANUALES = ['edicion', 'admin', 'conteo']
+
+UMBRAL = 3.5
+
+DIAS_VENTANA = 7
+
+
+def puntaje_robusto(valores):
+    """
+    Puntaje z modificado de cada valor. Si más de la mitad de los valores son
+    iguales la desviación absoluta mediana es cero y se usa la media absoluta
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if len(valores) < 2:
+        return np.zeros(len(valores))
+    mediana = np.median(valores)
+    desvio = np.abs(valores - mediana)
+    mad = np.median(desvio)
+    if mad > 0:
+        return 0.6745 * (valores - mediana) / mad
+    media = desvio.mean()
+    if media > 0:
+        return (valores - mediana) / (1.253314 * media)
+    return np.zeros(len(valores))
+
+
+def _puntaje_por_grupo(grupos, valores):
+    """Puntaje robusto de cada valor dentro de su grupo"""
+    puntajes = np.zeros(len(valores))
+    _, inversa = np.unique(grupos, return_inverse=True)
+    for grupo in range(inversa.max() + 1 if len(inversa) else 0):
+        indices = np.flatnonzero(inversa == grupo)
+        puntajes[indices] = puntaje_robusto(valores[indices])
+    return puntajes
+
+
+def detectar(dias=DIAS_VENTANA, umbral=UMBRAL):
+    """
+    Analiza los ajustes de los últimos `dias` y guarda los hallazgos nuevos;
+    devuelve cuántos se guardaron
+    """
+    from detalle_ventas.models import DetalleVenta
+
+    hasta = timezone.now()
+    desde = hasta - timedelta(days=dias)
+
+    # Variación neta de los ajustes manuales por producto, ubicación y usuario
+    ajustes = list(AjusteInventario.objects.filter(
+        fecha__gt=desde, fecha__lte=hasta, origen__in=ORIGENES_MANUALES
+    ).values_list('id_producto', 'ubicacion', 'id_usuario').annotate(
+        neto=Sum(F('cantidad_nueva') - F('cantidad_anterior'))
+    ).order_by())
+    if not ajustes:
+        return 0
+
+    vendidas = dict(
+        ((id_producto, ubicacion), unidades)
+        for id_producto, ubicacion, unidades in DetalleVenta.objects.filter(
+            id_venta__fecha__gt=desde, id_venta__fecha__lte=hasta
+        ).exclude(id_venta__ubicacion='').values_list('id_producto', 'id_venta__ubicacion').annotate(
+            unidades=Sum('cantidad')
+        ).order_by()
+    )
+    stock = {
+        (id_producto, ubicacion): cantidad
+        for id_producto, ubicacion, cantidad in Inventario.objects.values_list(
+            'id_producto', 'ubicacion', 'cantidad_actual'
+        ).order_by()
+    }
+    precios = dict(Producto.objects.values_list('id_producto', 'precio_referencia').order_by())
+
+    # Merma por fila de inventario y por usuario (faltante = -variación neta)
+    por_fila = defaultdict(int)
+    por_usuario = defaultdict(int)
+    for id_producto, ubicacion, id_usuario, neto in ajustes:
+        por_fila[(id_producto, ubicacion)] -= neto
+        por_usuario[(ubicacion, id_usuario)] -= neto * (precios.get(id_producto) or 0)
+
+    filas = list(por_fila)
+    faltante = np.array([por_fila[clave] for clave in filas], dtype=np.float64)
+    registrado = np.array([stock.get(clave, 0) for clave in filas], dtype=np.float64)
+    vendido = np.array([vendidas.get(clave, 0) for clave in filas], dtype=np.float64)
+    esperado = registrado + faltante
+    tasa = faltante / np.maximum(esperado + vendido, 1)
+    puntajes = _puntaje_por_grupo(np.array([ubicacion for _, ubicacion in filas]), tasa)
+
+    usuarios = list(por_usuario)
+    valor_usuario = np.array([por_usuario[clave] for clave in usuarios], dtype=np.float64)
+    puntajes_usuario = puntaje_robusto(valor_usuario)
+    unidades_usuario = defaultdict(int)
+    for id_producto, ubicacion, id_usuario, neto in ajustes:
+        unidades_usuario[(ubicacion, id_usuario)] -= neto
+
+    # Lo ya marcado en una ventana que se superpone no se repite
+    marcados = set(HallazgoAnomalia.objects.filter(hasta__gt=desde).values_list(
+        'tipo', 'id_producto', 'ubicacion', 'id_usuario'
+    ))
+
+    hallazgos = []
+    for i in np.flatnonzero((faltante > 0) & (puntajes > umbral)):
+        id_producto, ubicacion = filas[i]
+        if ('producto', id_producto, ubicacion, None) in marcados:
+            continue
+        hallazgos.append(HallazgoAnomalia(
+            tipo='producto',
+            id_producto_id=id_producto,
+            ubicacion=ubicacion,
+            desde=desde,
+            hasta=hasta,
+            unidades=int(faltante[i]),
+            valor=int(faltante[i]) * (precios.get(id_producto) or 0),
+            puntaje=float(puntajes[i]),
+        ))
+    for i in np.flatnonzero((valor_usuario > 0) & (puntajes_usuario > umbral)):
+        ubicacion, id_usuario = usuarios[i]
+        if ('usuario', None, ubicacion, id_usuario) in marcados:
+            continue
+        hallazgos.append(HallazgoAnomalia(
+            tipo='usuario',
+            ubicacion=ubicacion,
+            id_usuario_id=id_usuario,
+            desde=desde,
+            hasta=hasta,
+            unidades=unidades_usuario[(ubicacion, id_usuario)],
+            valor=int(valor_usuario[i]),
+            puntaje=float(puntajes_usuario[i]),
+        ))
+
+    HallazgoAnomalia.objects.bulk_create(hallazgos, batch_size=1000)
+    return len(hallazgos)
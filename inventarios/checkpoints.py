@@ -0,0 +1,110 @@
+"""
+Checkpoints del inventario para consultas a una fecha.
+
+Cada cierre guarda solo las filas cuya cantidad o precio cambió desde el
+checkpoint anterior (y las eliminadas, con cantidad nula). Cada cierto número
+de checkpoints se guarda uno base con todas las filas, de modo que reconstruir
+cualquier fecha lee una base y sus deltas, nunca el historial completo.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from productos.models import Producto
+from .models import CheckpointInventario, FilaCheckpoint, Inventario
+
+
+def _estado(checkpoint):
+    """{(id_producto, ubicacion): (cantidad, precio)} reconstruido para un checkpoint"""
+    id_base = checkpoint.id_checkpoint if checkpoint.es_base else checkpoint.id_base_id
+    filas = FilaCheckpoint.objects.filter(
+        Q(id_checkpoint_id=id_base) | Q(id_checkpoint__id_base_id=id_base, id_checkpoint__fecha__lte=checkpoint.fecha)
+    ).order_by('id_checkpoint__fecha').values_list('id_producto', 'ubicacion', 'cantidad', 'precio_referencia')
+
+    estado = {}
+    for id_producto, ubicacion, cantidad, precio in filas.iterator(chunk_size=5000):
+        if cantidad is None:
+            estado.pop((id_producto, ubicacion), None)
+        else:
+            estado[(id_producto, ubicacion)] = (cantidad, precio)
+    return estado
+
+
+def crear_checkpoint(fecha=None, forzar_base=False):
+    """Guarda el estado actual del inventario y devuelve el checkpoint creado"""
+    fecha = fecha or timezone.now()
+    actual = {
+        (id_producto, ubicacion): (cantidad, precio)
+        for id_producto, ubicacion, cantidad, precio in Inventario.objects.values_list(
+            'id_producto', 'ubicacion', 'cantidad_actual', 'id_producto__precio_referencia'
+        ).order_by().iterator(chunk_size=5000)
+    }
+
+    anterior = CheckpointInventario.objects.filter(fecha__lt=fecha).order_by('-fecha').first()
+    es_base = forzar_base or anterior is None
+    if not es_base:
+        id_base = anterior.id_checkpoint if anterior.es_base else anterior.id_base_id
+        deltas = CheckpointInventario.objects.filter(id_base_id=id_base).count()
+        es_base = deltas + 1 >= settings.CHECKPOINT_BASE_CADA
+
+    if es_base:
+        filas = [(clave, valor) for clave, valor in actual.items()]
+    else:
+        previo = _estado(anterior)
+        filas = [(clave, valor) for clave, valor in actual.items() if previo.get(clave) != valor]
+        filas.extend((clave, (None, None)) for clave in previo.keys() - actual.keys())
+
+    with transaction.atomic():
+        checkpoint = CheckpointInventario.objects.create(
+            fecha=fecha,
+            es_base=es_base,
+            id_base_id=None if es_base else id_base,
+            filas_guardadas=len(filas),
+        )
+        FilaCheckpoint.objects.bulk_create([
+            FilaCheckpoint(
+                id_checkpoint=checkpoint,
+                id_producto=id_producto,
+                ubicacion=ubicacion,
+                cantidad=cantidad,
+                precio_referencia=precio,
+            )
+            for (id_producto, ubicacion), (cantidad, precio) in filas
+        ], batch_size=2000)
+    return checkpoint
+
+
+def stock_a_fecha(fecha, ubicacion=None):
+    """
+    Stock y valorización (cantidad * precio_referencia) según el último
+    checkpoint en o antes de `fecha`. Devuelve None si no hay checkpoints
+    anteriores a esa fecha
+    """
+    checkpoint = CheckpointInventario.objects.filter(fecha__lte=fecha).order_by('-fecha').first()
+    if checkpoint is None:
+        return None
+
+    estado = _estado(checkpoint)
+    nombres = dict(Producto.objects.filter(
+        id_producto__in={id_producto for id_producto, _ in estado}
+    ).values_list('id_producto', 'nombre'))
+
+    filas = []
+    for (id_producto, ubic), (cantidad, precio) in sorted(estado.items(), key=lambda item: (item[0][1], item[0][0])):
+        if ubicacion and ubic != ubicacion:
+            continue
+        filas.append({
+            'id_producto': id_producto,
+            'producto': nombres.get(id_producto, f'Producto {id_producto}'),
+            'ubicacion': ubic,
+            'cantidad': cantidad,
+            'precio_referencia': precio or 0,
+            'valor': cantidad * (precio or 0),
+        })
+
+    return {
+        'fecha_checkpoint': checkpoint.fecha,
+        'filas': filas,
+        'unidades': sum(fila['cantidad'] for fila in filas),
+        'valor_total': sum(fila['valor'] for fila in filas),
+    }
@@ -0,0 +1,243 @@
+"""
+Conciliación de conteos físicos.
+
+La planilla (CSV o XLSX con columnas producto, ubicacion, cantidad) se lee
+como flujo de filas y se compara con Inventario por tramos, con una consulta
+por clave (producto, ubicación) para cada tramo. Solo se guardan las filas que
+difieren; al aplicar el conteo todas se escriben con bulk_update en una misma
+transacción.
+"""
+import csv
+import io
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from productos.models import Producto
+from . import ajustes
+from .abc import registrar_conteo
+from .models import ConteoFisico, ConteoFisicoDiferencia, Inventario
+from .signals import stock_actualizado
+
+COLUMNAS = ['producto', 'ubicacion', 'cantidad']
+
+TAMANO_TRAMO = 1000
+
+# Errores de fila que se devuelven para mostrar; el resto solo se cuenta
+MAX_ERRORES = 50
+
+# Tope de cantidad_actual (IntegerField: entero de 32 bits con signo)
+MAX_CANTIDAD = 2 ** 31 - 1
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '').strip().lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    yield from csv.reader(texto, dialecto)
+
+
+def _filas_xlsx(archivo):
+    import openpyxl
+
+    libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        for fila in libro.active.iter_rows(values_only=True):
+            yield ['' if valor is None else valor for valor in fila]
+    finally:
+        libro.close()
+
+
+def leer_planilla(archivo, nombre, columnas=COLUMNAS, opcionales=()):
+    """
+    Entrega (numero_fila, *valores de `columnas` y `opcionales`) sin cargar el
+    archivo completo en memoria; por defecto (numero_fila, producto, ubicacion,
+    cantidad). Las columnas opcionales ausentes vienen vacías. Lanza
+    ValidationError si faltan columnas obligatorias
+    """
+    filas = _filas_xlsx(archivo) if nombre.lower().endswith('.xlsx') else _filas_csv(archivo)
+    encabezado = [_normalizar(columna) for columna in next(filas, [])]
+    faltantes = [columna for columna in columnas if columna not in encabezado]
+    if faltantes:
+        raise ValidationError(f"Faltan columnas en la planilla: {', '.join(faltantes)}")
+    indices = [encabezado.index(columna) if columna in encabezado else None for columna in [*columnas, *opcionales]]
+    ancho = max(i for i in indices if i is not None) + 1
+
+    for numero, fila in enumerate(filas, 2):
+        if not any(str(valor).strip() for valor in fila):
+            continue
+        fila = list(fila) + [''] * (ancho - len(fila))
+        yield (numero, *('' if i is None else fila[i] for i in indices))
+
+
+def _cantidad(valor):
+    """Cantidad contada como entero entre 0 y MAX_CANTIDAD, o None si no lo es (3.7, 1e30, -1, texto)"""
+    try:
+        numero = Decimal(str(valor).strip())
+    except InvalidOperation:
+        return None
+    if not numero.is_finite() or numero != numero.to_integral_value() or not 0 <= numero <= MAX_CANTIDAD:
+        return None
+    return int(numero)
+
+
+def _resolver_productos():
+    """Clave de planilla -> id_producto, aceptando el id o el nombre del producto"""
+    productos = {}
+    for id_producto, nombre in Producto.objects.values_list('id_producto', 'nombre'):
+        productos[str(id_producto)] = id_producto
+        productos[_normalizar(nombre)] = id_producto
+    return productos
+
+
+def crear_conteo(archivo, nombre, usuario, tamano_tramo=TAMANO_TRAMO):
+    """
+    Lee la planilla, guarda las diferencias con el inventario y devuelve
+    (conteo, errores) con los primeros errores de fila. El conteo se crea en
+    una sola transacción
+    """
+    productos = _resolver_productos()
+    filas = leer_planilla(archivo, nombre)
+    errores = []
+    leidas = invalidas = 0
+
+    # Si la lectura falla a mitad de la planilla no queda un conteo a medias
+    with transaction.atomic():
+        conteo = ConteoFisico.objects.create(archivo=nombre[:255], id_usuario=usuario)
+        vistos = set()
+        while True:
+            tramo = list(islice(filas, tamano_tramo))
+            if not tramo:
+                break
+
+            contadas = {}
+            for numero, producto, ubicacion, cantidad in tramo:
+                leidas += 1
+                id_producto = productos.get(_normalizar(producto)) or productos.get(str(producto).strip())
+                ubicacion = str(ubicacion).strip()[:150]
+                cantidad = _cantidad(cantidad)
+                if id_producto is None or not ubicacion or cantidad is None:
+                    invalidas += 1
+                    if len(errores) < MAX_ERRORES:
+                        errores.append(f'Fila {numero}: producto, ubicación o cantidad inválidos')
+                    continue
+                if (id_producto, ubicacion) in vistos:
+                    invalidas += 1
+                    if len(errores) < MAX_ERRORES:
+                        errores.append(f'Fila {numero}: producto y ubicación repetidos en la planilla')
+                    continue
+                vistos.add((id_producto, ubicacion))
+                contadas[(id_producto, ubicacion)] = cantidad
+
+            # Una consulta por tramo sobre el índice único (producto, ubicación)
+            registradas = {
+                (id_producto, ubicacion): (id_inventario, cantidad)
+                for id_inventario, id_producto, ubicacion, cantidad in Inventario.objects.filter(
+                    id_producto__in={p for p, _ in contadas}, ubicacion__in={u for _, u in contadas}
+                ).values_list('id_inventario', 'id_producto', 'ubicacion', 'cantidad_actual')
+            }
+
+            diferencias = []
+            for (id_producto, ubicacion), cantidad in contadas.items():
+                id_inventario, en_sistema = registradas.get((id_producto, ubicacion), (None, 0))
+                if cantidad != en_sistema:
+                    diferencias.append(ConteoFisicoDiferencia(
+                        id_conteo=conteo,
+                        id_inventario_id=id_inventario,
+                        id_producto_id=id_producto,
+                        ubicacion=ubicacion,
+                        cantidad_sistema=en_sistema,
+                        cantidad_contada=cantidad,
+                    ))
+            ConteoFisicoDiferencia.objects.bulk_create(diferencias)
+            ConteoFisico.productos_contados.through.objects.bulk_create(
+                [
+                    ConteoFisico.productos_contados.through(conteofisico_id=conteo.id_conteo, producto_id=id_producto)
+                    for id_producto in {id_producto for id_producto, _ in contadas}
+                ],
+                ignore_conflicts=True,
+            )
+
+        conteo.filas_leidas = leidas
+        conteo.filas_invalidas = invalidas
+        conteo.save(update_fields=['filas_leidas', 'filas_invalidas'])
+    return conteo, errores
+
+
+def aplicar_conteo(id_conteo, usuario=None, _reintentar=True):
+    """
+    Deja el inventario con las cantidades contadas. Las filas se buscan y
+    bloquean por (producto, ubicación) al aplicar, no al cargar la planilla:
+    las existentes se actualizan con un bulk_update y las que siguen sin
+    existir se crean con un bulk_create, todo en una transacción. El ajuste
+    registra la cantidad que había al aplicar. Devuelve la cantidad de filas
+    ajustadas
+    """
+    try:
+        with transaction.atomic():
+            conteo = ConteoFisico.objects.select_for_update().get(pk=id_conteo)
+            if conteo.estado != 'pendiente':
+                raise ValidationError("El conteo ya fue aplicado o descartado.")
+
+            diferencias = list(conteo.diferencias.all())
+            # Una venta, transferencia o alta posterior a la carga cambió estas filas
+            inventarios = {
+                (inventario.id_producto_id, inventario.ubicacion): inventario
+                for inventario in Inventario.objects.select_for_update().filter(
+                    id_producto__in={d.id_producto_id for d in diferencias},
+                    ubicacion__in={d.ubicacion for d in diferencias},
+                ).order_by('id_inventario')
+            }
+            ahora = timezone.now()
+            actualizar = []
+            nuevas = []
+            movimientos = []
+            for diferencia in diferencias:
+                inventario = inventarios.get((diferencia.id_producto_id, diferencia.ubicacion))
+                if inventario is None:
+                    nuevas.append(Inventario(
+                        id_producto_id=diferencia.id_producto_id,
+                        ubicacion=diferencia.ubicacion,
+                        cantidad_actual=diferencia.cantidad_contada,
+                    ))
+                else:
+                    movimientos.append((
+                        inventario.id_inventario, inventario.id_producto_id, inventario.ubicacion,
+                        inventario.cantidad_actual, diferencia.cantidad_contada,
+                    ))
+                    inventario.cantidad_actual = diferencia.cantidad_contada
+                    inventario.fecha_ultima_actualizacion = ahora
+                    actualizar.append(inventario)
+
+            Inventario.objects.bulk_update(actualizar, ['cantidad_actual', 'fecha_ultima_actualizacion'], batch_size=500)
+            Inventario.objects.bulk_create(nuevas, batch_size=500)
+            movimientos.extend((fila.pk, fila.id_producto_id, fila.ubicacion, 0, fila.cantidad_actual) for fila in nuevas)
+            ajustes.registrar(movimientos, 'conteo', usuario)
+
+            # Solo un conteo aplicado reprograma el calendario cíclico; uno descartado no cuenta
+            registrar_conteo(conteo.productos_contados.values_list('id_producto', flat=True))
+
+            conteo.estado = 'aplicado'
+            conteo.fecha_aplicacion = ahora
+            conteo.save(update_fields=['estado', 'fecha_aplicacion'])
+    except IntegrityError:
+        # Otra transacción creó en paralelo alguna de las filas nuevas: al
+        # reintentar ya existe y queda bloqueada junto a las demás
+        if not _reintentar:
+            raise
+        return aplicar_conteo(id_conteo, usuario, _reintentar=False)
+
+    stock_actualizado.send(sender=Inventario, pares={(d.id_producto_id, d.ubicacion) for d in diferencias})
+    return len(diferencias)
@@ -0,0 +1,140 @@
+"""
+Asignación de lotes FEFO (primero en vencer, primero en salir).
+
+Cada línea vendida recorre el índice (producto, ubicación, vencimiento) por
+tramos de TRAMO_LOTES lotes con paginación por clave (fecha_vencimiento,
+id_lote): cada tramo bloquea solo sus filas y el recorrido se corta apenas
+cubre la cantidad pedida, así que una venta no bloquea todos los lotes del
+producto. Los lotes consumidos se descuentan en un UPDATE.
+
+Las transferencias entre ubicaciones mueven los lotes con trasladar(): salen
+del origen en el mismo orden FEFO, con las mismas sentencias para uno o
+muchos productos, y llegan al destino con su código y vencimiento.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from .models import Inventario, Lote
+
+# Lotes leídos por tramo al recorrer el índice
+TRAMO_LOTES = 20
+
+
+def asignar_fefo(id_producto, ubicacion, cantidad):
+    """
+    Descuenta `cantidad` unidades de los lotes no vencidos que vencen primero
+    y devuelve [(id_lote, unidades)]. Si los lotes no alcanzan se consume lo
+    que haya; el resto corresponde a unidades sin lote
+    """
+    asignacion = []
+    pendiente = cantidad
+    with transaction.atomic():
+        lotes = Lote.objects.filter(
+            id_producto=id_producto, ubicacion=ubicacion,
+            fecha_vencimiento__gte=timezone.localdate(), cantidad__gt=0,
+        ).order_by('fecha_vencimiento', 'id_lote')
+        ultimo = None
+        while pendiente:
+            tramo = lotes
+            if ultimo is not None:
+                vencimiento, id_lote = ultimo
+                tramo = tramo.filter(
+                    Q(fecha_vencimiento__gt=vencimiento) | Q(fecha_vencimiento=vencimiento, id_lote__gt=id_lote)
+                )
+            filas = list(tramo.select_for_update().values_list(
+                'id_lote', 'fecha_vencimiento', 'cantidad'
+            )[:TRAMO_LOTES])
+            for id_lote, vencimiento, disponible in filas:
+                tomar = min(disponible, pendiente)
+                asignacion.append((id_lote, tomar))
+                pendiente -= tomar
+                if not pendiente:
+                    break
+            if len(filas) < TRAMO_LOTES:
+                break
+            ultimo = (vencimiento, id_lote)
+
+        if asignacion:
+            descuento = Case(
+                *[When(id_lote=id_lote, then=Value(unidades)) for id_lote, unidades in asignacion],
+                output_field=IntegerField(),
+            )
+            Lote.objects.filter(id_lote__in=[id_lote for id_lote, _ in asignacion]).update(
+                cantidad=F('cantidad') - descuento
+            )
+    return asignacion
+
+
+def asignar_carro(unidades_por_producto, ubicacion):
+    """Asigna lotes FEFO a cada línea del carro; devuelve {id_producto: [(id_lote, unidades)]}"""
+    return {
+        id_producto: asignar_fefo(id_producto, ubicacion, unidades)
+        for id_producto, unidades in unidades_por_producto.items()
+        if unidades > 0
+    }
+
+
+def _sumar_lotes(unidades_por_lote, signo):
+    """UPDATE único que suma (o resta) unidades a varios lotes"""
+    if unidades_por_lote:
+        Lote.objects.filter(id_lote__in=list(unidades_por_lote)).update(cantidad=F('cantidad') + signo * Case(
+            *[When(id_lote=id_lote, then=Value(unidades)) for id_lote, unidades in unidades_por_lote.items()],
+            output_field=IntegerField(),
+        ))
+
+
+def trasladar(unidades_por_producto, origen, destino):
+    """
+    Mueve lotes de `origen` a `destino` en orden FEFO junto con una
+    transferencia, con un número fijo de sentencias sin importar cuántos
+    productos lleve: una consulta bloquea los lotes de origen de todos los
+    productos, un UPDATE los descuenta, otro suma en los lotes de destino con
+    el mismo código y vencimiento y un INSERT masivo crea los que faltan. Debe
+    llamarse dentro de la transacción de la transferencia, con las filas de
+    inventario de destino ya creadas. Devuelve {id_producto: [(id_lote_origen, unidades)]}
+    """
+    pendientes = {id_producto: unidades for id_producto, unidades in unidades_por_producto.items() if unidades > 0}
+    asignacion = defaultdict(list)
+    llegadas = defaultdict(int)
+    for id_lote, id_producto, codigo, vencimiento, disponible in Lote.objects.select_for_update().filter(
+        id_producto__in=list(pendientes), ubicacion=origen,
+        fecha_vencimiento__gte=timezone.localdate(), cantidad__gt=0,
+    ).order_by('id_producto', 'fecha_vencimiento', 'id_lote').values_list(
+        'id_lote', 'id_producto', 'codigo', 'fecha_vencimiento', 'cantidad'
+    ):
+        if not pendientes[id_producto]:
+            continue
+        tomar = min(disponible, pendientes[id_producto])
+        pendientes[id_producto] -= tomar
+        asignacion[id_producto].append((id_lote, tomar))
+        llegadas[(id_producto, codigo, vencimiento)] += tomar
+    if not llegadas:
+        return {}
+
+    _sumar_lotes({id_lote: unidades for lotes in asignacion.values() for id_lote, unidades in lotes}, -1)
+
+    inventarios = dict(Inventario.objects.filter(
+        id_producto__in=list(asignacion), ubicacion=destino
+    ).values_list('id_producto', 'id_inventario'))
+    existentes = {
+        (id_producto, codigo, vencimiento): id_lote
+        for id_lote, id_producto, codigo, vencimiento in Lote.objects.select_for_update().filter(
+            id_producto__in=list(asignacion), ubicacion=destino,
+            fecha_vencimiento__in={vencimiento for _, _, vencimiento in llegadas},
+        ).order_by('id_lote').values_list('id_lote', 'id_producto', 'codigo', 'fecha_vencimiento')
+    }
+    _sumar_lotes({existentes[clave]: unidades for clave, unidades in llegadas.items() if clave in existentes}, 1)
+    # bulk_create no pasa por Lote.save: producto y ubicación se copian aquí
+    nuevos = [
+        Lote(
+            id_inventario_id=inventarios[id_producto], id_producto_id=id_producto, ubicacion=destino,
+            codigo=codigo, fecha_vencimiento=vencimiento, cantidad=unidades,
+        )
+        for (id_producto, codigo, vencimiento), unidades in llegadas.items()
+        if (id_producto, codigo, vencimiento) not in existentes
+    ]
+    if nuevos:
+        Lote.objects.bulk_create(nuevos, batch_size=500)
+    return dict(asignacion)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from inventarios.checkpoints import crear_checkpoint
+
+
+class Command(BaseCommand):
+    help = 'Guarda un checkpoint del inventario con las filas cambiadas desde el anterior. Ejecutar al cierre de cada mes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base', action='store_true', help='Guardar todas las filas aunque no haya cambiado nada')
+
+    def handle(self, *args, **options):
+        checkpoint = crear_checkpoint(forzar_base=options['base'])
+        tipo = 'base' if checkpoint.es_base else 'delta'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checkpoint {tipo} del {checkpoint.fecha:%d/%m/%Y %H:%M}: {checkpoint.filas_guardadas} filas guardadas'
+        ))
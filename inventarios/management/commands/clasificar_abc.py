@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from inventarios.abc import LIMITE_A, LIMITE_B, recalcular
+
+
+class Command(BaseCommand):
+    help = (
+        f'Clasifica los productos en A (hasta {LIMITE_A:.0%} de los ingresos), B (hasta {LIMITE_B:.0%}) y C. '
+        'Pensado para ejecutarse cada noche con cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=365, help='Días de ventas considerados')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        conteo = recalcular(options['dias'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Clasificación ABC: {conteo["A"]} A, {conteo["B"]} B, {conteo["C"]} C '
+            f'en {time.perf_counter() - inicio:.2f}s'
+        ))
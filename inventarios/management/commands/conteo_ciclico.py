@@ -0,0 +1,46 @@
+import csv
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from inventarios.abc import lista_conteo
+from inventarios.models import Inventario
+
+
+class Command(BaseCommand):
+    help = 'Lista los productos que corresponde contar hoy según su clase ABC'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha de la lista en formato AAAA-MM-DD (por defecto hoy)')
+        parser.add_argument('--csv', help='Guardar la planilla de conteo en este archivo, lista para cargarla después')
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options['fecha']:
+            fecha = parse_date(options['fecha'])
+            if fecha is None:
+                raise CommandError('Fecha inválida, usa AAAA-MM-DD')
+
+        pendientes = list(lista_conteo(fecha))
+        ubicaciones = defaultdict(list)
+        for id_producto, ubicacion in Inventario.objects.filter(
+            id_producto__in=[c.id_producto_id for c in pendientes]
+        ).values_list('id_producto', 'ubicacion').order_by('ubicacion'):
+            ubicaciones[id_producto].append(ubicacion)
+
+        for clasificacion in pendientes:
+            self.stdout.write(
+                f'[{clasificacion.clase}] {clasificacion.id_producto.nombre} '
+                f'(vence {clasificacion.proximo_conteo}): {", ".join(ubicaciones[clasificacion.id_producto_id]) or "sin inventario"}'
+            )
+
+        if options['csv']:
+            with open(options['csv'], 'w', newline='', encoding='utf-8') as f:
+                escritor = csv.writer(f)
+                escritor.writerow(['producto', 'ubicacion', 'cantidad'])
+                for clasificacion in pendientes:
+                    for ubicacion in ubicaciones[clasificacion.id_producto_id]:
+                        escritor.writerow([clasificacion.id_producto_id, ubicacion, ''])
+            self.stdout.write(f'Planilla guardada en {options["csv"]}')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(pendientes)} productos por contar'))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from inventarios.anomalias import DIAS_VENTANA, UMBRAL, detectar
+
+
+class Command(BaseCommand):
+    help = (
+        'Busca mermas atípicas en los ajustes manuales de stock por producto, ubicación y usuario. '
+        'Pensado para ejecutarse con cron cada noche.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS_VENTANA, help='Días de ajustes a analizar')
+        parser.add_argument('--umbral', type=float, default=UMBRAL, help='Puntaje z robusto desde el que se marca')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        hallazgos = detectar(options['dias'], options['umbral'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{hallazgos} hallazgos de merma registrados en {time.perf_counter() - inicio:.2f}s'
+        ))
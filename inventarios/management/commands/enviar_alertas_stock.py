@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from inventarios.models import AlertaStock
+from notificaciones.correo import encolar
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía a los bodegueros un único correo con las alertas de stock bajo nuevas. '
+        'Pensado para ejecutarse periódicamente con cron (por ejemplo, cada hora).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=500, help='Máximo de alertas listadas en un resumen')
+
+    def handle(self, *args, **options):
+        alertas = list(AlertaStock.objects.filter(estado='activa').select_related('id_producto').order_by(
+            'ubicacion', 'id_producto__nombre'
+        )[:options['limite']])
+        if not alertas:
+            self.stdout.write('No hay alertas nuevas')
+            return
+
+        destinatarios = list(Usuario.objects.filter(
+            id_rol__nombre='Bodeguero', is_active=True
+        ).exclude(correo='').values_list('correo', flat=True))
+        if not destinatarios:
+            self.stderr.write('No hay bodegueros activos con correo; las alertas quedan pendientes')
+            return
+
+        lineas = [f'Productos bajo su stock mínimo ({len(alertas)}):']
+        ubicacion = None
+        for alerta in alertas:
+            if alerta.ubicacion != ubicacion:
+                ubicacion = alerta.ubicacion
+                lineas.extend(['', f'{ubicacion}:'])
+            lineas.append(f'  - {alerta.id_producto.nombre}: {alerta.cantidad} unidades (mínimo {alerta.stock_minimo})')
+
+        # El resumen queda en la bandeja de salida junto con el cambio de estado de las alertas
+        with transaction.atomic():
+            encolar(
+                asunto=f'Alertas de stock bajo ({len(alertas)}) - Dulcería Lilis',
+                destinatarios=destinatarios,
+                cuerpo='\n'.join(lineas),
+            )
+            AlertaStock.objects.filter(
+                id_alerta__in=[alerta.id_alerta for alerta in alertas], estado='activa'
+            ).update(estado='notificada', fecha_notificacion=timezone.now())
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumen con {len(alertas)} alertas encolado para {len(destinatarios)} bodegueros'
+        ))
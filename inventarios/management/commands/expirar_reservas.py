@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from inventarios.reservas import LOTE_BARRIDO, expirar_reservas
+
+
+class Command(BaseCommand):
+    help = 'Elimina las reservas de stock vencidas. Pensado para ejecutarse cada pocos minutos con cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=LOTE_BARRIDO, help='Reservas eliminadas por sentencia')
+
+    def handle(self, *args, **options):
+        eliminadas = expirar_reservas(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{eliminadas} reservas vencidas eliminadas'))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from inventarios.metricas import DIAS_VENTANA, refrescar
+
+
+class Command(BaseCommand):
+    help = (
+        'Actualiza la rotación y los días de cobertura de las filas de inventario que cambiaron '
+        'desde el último refresco. Pensado para ejecutarse con cron cada pocos minutos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS_VENTANA, help='Días de ventas de la ventana móvil')
+        parser.add_argument('--completo', action='store_true', help='Recalcular todas las filas')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        filas = refrescar(options['dias'], options['completo'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{filas} métricas de inventario actualizadas en {time.perf_counter() - inicio:.2f}s'
+        ))
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from inventarios.models import Lote
+
+
+class Command(BaseCommand):
+    help = (
+        'Lista los lotes con stock que vencen en los próximos días. Consulta un rango '
+        'del índice de vencimiento, sin recorrer todos los lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Días hacia adelante a revisar')
+        parser.add_argument('--vencidos', type=int, default=0,
+                            help='Incluir también los lotes vencidos en los últimos N días')
+        parser.add_argument('--ubicacion', help='Revisar solo esta ubicación')
+
+    def handle(self, *args, **options):
+        hoy = timezone.localdate()
+        lotes = Lote.objects.filter(
+            fecha_vencimiento__gte=hoy - timedelta(days=options['vencidos']),
+            fecha_vencimiento__lte=hoy + timedelta(days=options['dias']),
+            cantidad__gt=0,
+        ).select_related('id_producto').order_by('fecha_vencimiento', 'id_lote')
+        if options['ubicacion']:
+            lotes = lotes.filter(ubicacion=options['ubicacion'])
+
+        total_lotes = 0
+        total_unidades = 0
+        for lote in lotes.iterator(chunk_size=500):
+            dias = (lote.fecha_vencimiento - hoy).days
+            linea = (
+                f'{lote.fecha_vencimiento}  {lote.id_producto.nombre} - {lote.ubicacion} '
+                f'(lote {lote.codigo or lote.id_lote}): {lote.cantidad} unidades'
+            )
+            if dias < 0:
+                self.stdout.write(self.style.ERROR(f'{linea}, vencido hace {-dias} días'))
+            elif dias <= 7:
+                self.stdout.write(self.style.WARNING(f'{linea}, vence en {dias} días'))
+            else:
+                self.stdout.write(f'{linea}, vence en {dias} días')
+            total_lotes += 1
+            total_unidades += lote.cantidad
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_lotes} lotes por vencer en {options["dias"]} días ({total_unidades} unidades)'
+        ))
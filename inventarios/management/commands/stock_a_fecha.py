@@ -0,0 +1,38 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from inventarios.checkpoints import stock_a_fecha
+
+
+class Command(BaseCommand):
+    help = 'Muestra el stock y su valorización al cierre de una fecha, según el checkpoint más cercano anterior'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fecha', help='Fecha en formato AAAA-MM-DD')
+        parser.add_argument('--ubicacion', help='Limitar a una ubicación')
+        parser.add_argument('--detalle', action='store_true', help='Listar cada producto y ubicación')
+
+    def handle(self, *args, **options):
+        try:
+            dia = parse_date(options['fecha'])
+        except ValueError:
+            # Bien formada pero inexistente, por ejemplo 2024-02-30
+            dia = None
+        if dia is None:
+            raise CommandError('Fecha inválida, usa AAAA-MM-DD')
+
+        resultado = stock_a_fecha(timezone.make_aware(datetime.combine(dia, time.max)), options['ubicacion'])
+        if resultado is None:
+            raise CommandError(f'No hay checkpoints anteriores al {dia:%d/%m/%Y}')
+
+        if options['detalle']:
+            for fila in resultado['filas']:
+                self.stdout.write(
+                    f'{fila["ubicacion"]}  {fila["producto"]}: {fila["cantidad"]} x ${fila["precio_referencia"]} = ${fila["valor"]}'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Checkpoint del {timezone.localtime(resultado["fecha_checkpoint"]):%d/%m/%Y %H:%M}: '
+            f'{resultado["unidades"]} unidades, valorizado en ${resultado["valor_total"]}'
+        ))
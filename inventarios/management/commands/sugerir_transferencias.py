@@ -0,0 +1,64 @@
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from inventarios.models import SugerenciaTransferencia
+from inventarios.rebalanceo import generar_sugerencias, resolver
+from inventarios.transferencias import transferir
+
+
+class Command(BaseCommand):
+    help = 'Propone transferencias de stock entre ubicaciones para evitar quiebres según la demanda reciente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Días de ventas usados para estimar la demanda')
+        parser.add_argument('--cobertura', type=int, default=14, help='Días de venta que cada ubicación debería cubrir')
+        parser.add_argument('--minimo', type=int, default=1, help='Cantidad mínima de una transferencia sugerida')
+        parser.add_argument('--aplicar', action='store_true', help='Ejecutar las sugerencias pendientes')
+        parser.add_argument('--sinteticas', type=int, default=0,
+                            help='Medir el solver con N filas aleatorias en memoria, sin tocar la base de datos')
+
+    def _medir(self, filas, options):
+        rnd = np.random.default_rng(42)
+        productos = rnd.integers(1, max(filas // 5, 2), size=filas)
+        stock = rnd.integers(0, 200, size=filas)
+        demanda = np.where(rnd.random(filas) < 0.7, rnd.gamma(2.0, 2.0, size=filas), 0.0)
+
+        inicio = time.perf_counter()
+        movimientos = resolver(productos, stock, demanda, options['cobertura'], options['minimo'])
+        transcurrido = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{filas} filas sintéticas: {len(movimientos)} transferencias en {transcurrido:.2f}s'
+        ))
+
+    def _aplicar(self):
+        grupos = defaultdict(list)
+        for sugerencia in SugerenciaTransferencia.objects.filter(estado='pendiente'):
+            grupos[(sugerencia.origen, sugerencia.destino)].append(sugerencia)
+
+        for (origen, destino), sugerencias in grupos.items():
+            try:
+                transferir([(s.id_producto_id, s.cantidad) for s in sugerencias], origen, destino)
+            except ValidationError as e:
+                self.stderr.write(f'{origen} -> {destino}: {" ".join(e.messages)}')
+                continue
+            SugerenciaTransferencia.objects.filter(
+                id_sugerencia__in=[s.id_sugerencia for s in sugerencias]
+            ).update(estado='aplicada')
+            self.stdout.write(f'{origen} -> {destino}: {len(sugerencias)} productos transferidos')
+
+    def handle(self, *args, **options):
+        if options['sinteticas']:
+            self._medir(options['sinteticas'], options)
+            return
+        if options['aplicar']:
+            self._aplicar()
+            return
+
+        inicio = time.perf_counter()
+        cantidad = generar_sugerencias(options['dias'], options['cobertura'], options['minimo'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{cantidad} transferencias sugeridas en {time.perf_counter() - inicio:.2f}s'
+        ))
@@ -0,0 +1,88 @@
+"""
+Métricas de rotación y días de cobertura por fila de inventario.
+
+Se guardan en metrica_inventario para que el listado solo las lea. Cada
+refresco recalcula únicamente las filas cuyo resultado pudo cambiar desde el
+anterior: stock modificado, ventas nuevas o ventas que salieron de la ventana.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Max, Sum
+from django.utils import timezone
+from .models import Inventario, MetricaInventario
+
+DIAS_VENTANA = 30
+
+
+def _pares_afectados(desde_ultimo, dias):
+    """Pares (id_producto, ubicacion) con cambios de stock o de ventas en la ventana desde el último refresco"""
+    from detalle_ventas.models import DetalleVenta
+
+    ahora = timezone.now()
+    pares = set(Inventario.objects.filter(
+        fecha_ultima_actualizacion__gt=desde_ultimo
+    ).values_list('id_producto', 'ubicacion'))
+    # Ventas nuevas y ventas que salieron de la ventana desde el último refresco
+    for desde, hasta in ((desde_ultimo, ahora), (desde_ultimo - timedelta(days=dias), ahora - timedelta(days=dias))):
+        pares.update(DetalleVenta.objects.filter(
+            id_venta__fecha__gt=desde, id_venta__fecha__lte=hasta
+        ).exclude(id_venta__ubicacion='').values_list('id_producto', 'id_venta__ubicacion').distinct())
+    return pares
+
+
+def refrescar(dias=DIAS_VENTANA, completo=False):
+    """Recalcula las métricas afectadas; devuelve la cantidad de filas escritas"""
+    from detalle_ventas.models import DetalleVenta
+
+    ahora = timezone.now()
+    ultimo = MetricaInventario.objects.aggregate(ultimo=Max('fecha_calculo'))['ultimo']
+    distinta_ventana = MetricaInventario.objects.exclude(dias_ventana=dias).exists()
+    inventarios = Inventario.objects.values_list('id_inventario', 'id_producto', 'ubicacion', 'cantidad_actual')
+
+    if completo or ultimo is None or distinta_ventana:
+        filas = list(inventarios)
+    else:
+        pares = _pares_afectados(ultimo, dias)
+        if not pares:
+            return 0
+        filas = [
+            fila for fila in inventarios.filter(
+                id_producto__in={p for p, _ in pares}, ubicacion__in={u for _, u in pares}
+            )
+            if (fila[1], fila[2]) in pares
+        ]
+    if not filas:
+        return 0
+
+    vendidas = defaultdict(int)
+    for id_producto, ubicacion, unidades in DetalleVenta.objects.filter(
+        id_venta__fecha__gt=ahora - timedelta(days=dias),
+        id_producto__in={fila[1] for fila in filas},
+        id_venta__ubicacion__in={fila[2] for fila in filas},
+    ).values_list('id_producto', 'id_venta__ubicacion').annotate(unidades=Sum('cantidad')).order_by():
+        vendidas[(id_producto, ubicacion)] = unidades
+
+    metricas = []
+    for id_inventario, id_producto, ubicacion, cantidad in filas:
+        unidades = vendidas.get((id_producto, ubicacion), 0)
+        diaria = unidades / dias
+        metricas.append(MetricaInventario(
+            id_inventario_id=id_inventario,
+            unidades_vendidas=unidades,
+            dias_ventana=dias,
+            rotacion=round(diaria * 365 / cantidad, 2) if cantidad > 0 else None,
+            dias_cobertura=round(max(cantidad, 0) / diaria, 1) if diaria else None,
+            fecha_calculo=ahora,
+        ))
+
+    MetricaInventario.objects.bulk_create(
+        metricas,
+        batch_size=1000,
+        update_conflicts=True,
+        # MySQL no acepta unique_fields: su ON DUPLICATE KEY UPDATE usa el índice único de id_inventario
+        unique_fields=['id_inventario'] if connection.features.supports_update_conflicts_with_target else None,
+        update_fields=['unidades_vendidas', 'dias_ventana', 'rotacion', 'dias_cobertura', 'fecha_calculo'],
+    )
+    return len(metricas)
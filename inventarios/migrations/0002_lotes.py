@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0001_initial'),
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Lote',
+            fields=[
+                ('id_lote', models.AutoField(primary_key=True, serialize=False)),
+                ('ubicacion', models.CharField(editable=False, max_length=150, verbose_name='Ubicación')),
+                ('codigo', models.CharField(blank=True, default='', max_length=50, verbose_name='Código de Lote')),
+                ('fecha_vencimiento', models.DateField(verbose_name='Fecha de Vencimiento')),
+                ('cantidad', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('fecha_ingreso', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Ingreso')),
+                ('id_inventario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lotes', to='inventarios.inventario', verbose_name='Inventario')),
+                ('id_producto', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Lote',
+                'verbose_name_plural': 'Lotes',
+                'db_table': 'lote',
+                'ordering': ['fecha_vencimiento', 'id_lote'],
+                'indexes': [models.Index(fields=['id_producto', 'ubicacion', 'fecha_vencimiento'], name='lote_fefo_idx'), models.Index(fields=['fecha_vencimiento'], name='lote_vencimiento_idx')],
+            },
+        ),
+    ]
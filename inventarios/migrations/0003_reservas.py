@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:52
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('inventarios', '0002_lotes'),
+        ('productos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reserva',
+            fields=[
+                ('id_reserva', models.AutoField(primary_key=True, serialize=False)),
+                ('pedido', models.UUIDField(db_index=True, default=uuid.uuid4, verbose_name='Pedido')),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('cantidad', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('creada_en', models.DateTimeField(auto_now_add=True, verbose_name='Creada')),
+                ('expira_en', models.DateTimeField(verbose_name='Expira')),
+                ('id_cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dashboard.cliente', verbose_name='Cliente')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+                ('id_usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Reserva',
+                'verbose_name_plural': 'Reservas',
+                'db_table': 'reserva',
+                'ordering': ['expira_en'],
+                'indexes': [models.Index(fields=['id_producto', 'ubicacion', 'expira_en'], name='reserva_activa_idx'), models.Index(fields=['expira_en'], name='reserva_expira_idx')],
+            },
+        ),
+    ]
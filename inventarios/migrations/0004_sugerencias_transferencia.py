@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0003_reservas'),
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SugerenciaTransferencia',
+            fields=[
+                ('id_sugerencia', models.AutoField(primary_key=True, serialize=False)),
+                ('origen', models.CharField(max_length=150, verbose_name='Origen')),
+                ('destino', models.CharField(max_length=150, verbose_name='Destino')),
+                ('cantidad', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('cobertura_destino', models.FloatField(verbose_name='Cobertura del Destino (días)')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('aplicada', 'Aplicada'), ('descartada', 'Descartada')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('fecha_generada', models.DateTimeField(auto_now_add=True, verbose_name='Generada')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Sugerencia de Transferencia',
+                'verbose_name_plural': 'Sugerencias de Transferencia',
+                'db_table': 'sugerencia_transferencia',
+                'ordering': ['cobertura_destino'],
+                'indexes': [models.Index(fields=['estado', 'origen', 'destino'], name='sugerencia_estado_idx')],
+            },
+        ),
+    ]
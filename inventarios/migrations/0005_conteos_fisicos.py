@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0004_sugerencias_transferencia'),
+        ('productos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteoFisico',
+            fields=[
+                ('id_conteo', models.AutoField(primary_key=True, serialize=False)),
+                ('archivo', models.CharField(max_length=255, verbose_name='Archivo')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('aplicado', 'Aplicado'), ('descartado', 'Descartado')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('filas_leidas', models.IntegerField(default=0, verbose_name='Filas Leídas')),
+                ('filas_invalidas', models.IntegerField(default=0, verbose_name='Filas Inválidas')),
+                ('fecha_carga', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Carga')),
+                ('fecha_aplicacion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Aplicación')),
+                ('id_usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Conteo Físico',
+                'verbose_name_plural': 'Conteos Físicos',
+                'db_table': 'conteo_fisico',
+                'ordering': ['-fecha_carga'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConteoFisicoDiferencia',
+            fields=[
+                ('id_diferencia', models.AutoField(primary_key=True, serialize=False)),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('cantidad_sistema', models.IntegerField(verbose_name='Cantidad en Sistema')),
+                ('cantidad_contada', models.IntegerField(verbose_name='Cantidad Contada')),
+                ('id_conteo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='diferencias', to='inventarios.conteofisico', verbose_name='Conteo')),
+                ('id_inventario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventarios.inventario', verbose_name='Inventario')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Diferencia de Conteo',
+                'verbose_name_plural': 'Diferencias de Conteo',
+                'db_table': 'conteo_fisico_diferencia',
+                'ordering': ['id_diferencia'],
+                'unique_together': {('id_conteo', 'id_producto', 'ubicacion')},
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0005_conteos_fisicos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckpointInventario',
+            fields=[
+                ('id_checkpoint', models.AutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateTimeField(unique=True, verbose_name='Fecha')),
+                ('es_base', models.BooleanField(default=False, verbose_name='Checkpoint Base')),
+                ('filas_guardadas', models.IntegerField(default=0, verbose_name='Filas Guardadas')),
+                ('id_base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deltas', to='inventarios.checkpointinventario', verbose_name='Checkpoint Base')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Inventario',
+                'verbose_name_plural': 'Checkpoints de Inventario',
+                'db_table': 'checkpoint_inventario',
+                'ordering': ['-fecha'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FilaCheckpoint',
+            fields=[
+                ('id_fila', models.AutoField(primary_key=True, serialize=False)),
+                ('id_producto', models.IntegerField(verbose_name='Producto')),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('cantidad', models.IntegerField(blank=True, null=True, verbose_name='Cantidad')),
+                ('precio_referencia', models.IntegerField(blank=True, null=True, verbose_name='Precio de Referencia')),
+                ('id_checkpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='filas', to='inventarios.checkpointinventario', verbose_name='Checkpoint')),
+            ],
+            options={
+                'verbose_name': 'Fila de Checkpoint',
+                'verbose_name_plural': 'Filas de Checkpoint',
+                'db_table': 'checkpoint_inventario_fila',
+                'unique_together': {('id_checkpoint', 'id_producto', 'ubicacion')},
+            },
+        ),
+    ]
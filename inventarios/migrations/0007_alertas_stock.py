@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0006_checkpoints'),
+        ('productos', '0002_stock_minimo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaStock',
+            fields=[
+                ('id_alerta', models.AutoField(primary_key=True, serialize=False)),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('cantidad', models.IntegerField(verbose_name='Cantidad al Alertar')),
+                ('stock_minimo', models.IntegerField(verbose_name='Stock Mínimo')),
+                ('estado', models.CharField(choices=[('activa', 'Activa'), ('notificada', 'Notificada'), ('resuelta', 'Resuelta')], default='activa', max_length=20, verbose_name='Estado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_notificacion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Notificación')),
+                ('fecha_resolucion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Resolución')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Stock',
+                'verbose_name_plural': 'Alertas de Stock',
+                'db_table': 'alerta_stock',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'fecha_creacion'], name='alerta_estado_idx'), models.Index(fields=['id_producto', 'ubicacion', 'estado'], name='alerta_producto_idx')],
+            },
+        ),
+    ]
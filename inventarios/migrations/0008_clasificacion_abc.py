@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0007_alertas_stock'),
+        ('productos', '0002_stock_minimo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClasificacionABC',
+            fields=[
+                ('id_clasificacion', models.AutoField(primary_key=True, serialize=False)),
+                ('clase', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], default='C', max_length=1, verbose_name='Clase')),
+                ('ingresos', models.BigIntegerField(default=0, verbose_name='Ingresos del Período')),
+                ('participacion_acumulada', models.FloatField(default=0, verbose_name='Participación Acumulada')),
+                ('fecha_calculo', models.DateTimeField(verbose_name='Fecha de Cálculo')),
+                ('ultimo_conteo', models.DateField(blank=True, null=True, verbose_name='Último Conteo')),
+                ('proximo_conteo', models.DateField(verbose_name='Próximo Conteo')),
+                ('id_producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='clasificacion_abc', to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Clasificación ABC',
+                'verbose_name_plural': 'Clasificaciones ABC',
+                'db_table': 'clasificacion_abc',
+                'ordering': ['clase', '-ingresos'],
+                'indexes': [models.Index(fields=['proximo_conteo', 'clase'], name='abc_proximo_conteo_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0008_clasificacion_abc'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaInventario',
+            fields=[
+                ('id_metrica', models.AutoField(primary_key=True, serialize=False)),
+                ('unidades_vendidas', models.IntegerField(default=0, verbose_name='Unidades Vendidas en la Ventana')),
+                ('dias_ventana', models.IntegerField(verbose_name='Días de la Ventana')),
+                ('rotacion', models.FloatField(blank=True, null=True, verbose_name='Rotación Anual')),
+                ('dias_cobertura', models.FloatField(blank=True, null=True, verbose_name='Días de Cobertura')),
+                ('fecha_calculo', models.DateTimeField(verbose_name='Fecha de Cálculo')),
+                ('id_inventario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='metrica', to='inventarios.inventario', verbose_name='Inventario')),
+            ],
+            options={
+                'verbose_name': 'Métrica de Inventario',
+                'verbose_name_plural': 'Métricas de Inventario',
+                'db_table': 'metrica_inventario',
+                'indexes': [models.Index(fields=['rotacion'], name='metrica_rotacion_idx'), models.Index(fields=['dias_cobertura'], name='metrica_cobertura_idx'), models.Index(fields=['fecha_calculo'], name='metrica_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0009_metricas_inventario'),
+        ('productos', '0002_stock_minimo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AjusteInventario',
+            fields=[
+                ('id_ajuste', models.AutoField(primary_key=True, serialize=False)),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('origen', models.CharField(choices=[('edicion', 'Edición manual'), ('admin', 'Administración'), ('conteo', 'Conteo físico'), ('transferencia', 'Transferencia')], max_length=20, verbose_name='Origen')),
+                ('cantidad_anterior', models.IntegerField(verbose_name='Cantidad Anterior')),
+                ('cantidad_nueva', models.IntegerField(verbose_name='Cantidad Nueva')),
+                ('fecha', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+                ('id_inventario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventarios.inventario', verbose_name='Inventario')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+                ('id_usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Ajuste de Inventario',
+                'verbose_name_plural': 'Ajustes de Inventario',
+                'db_table': 'ajuste_inventario',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['fecha', 'origen'], name='ajuste_fecha_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HallazgoAnomalia',
+            fields=[
+                ('id_hallazgo', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('producto', 'Producto en ubicación'), ('usuario', 'Usuario en ubicación')], max_length=20, verbose_name='Tipo')),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('desde', models.DateTimeField(verbose_name='Desde')),
+                ('hasta', models.DateTimeField(verbose_name='Hasta')),
+                ('unidades', models.IntegerField(verbose_name='Unidades Faltantes')),
+                ('valor', models.IntegerField(verbose_name='Valor Faltante')),
+                ('puntaje', models.FloatField(verbose_name='Puntaje de Anomalía')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('revisado', 'Revisado'), ('descartado', 'Descartado')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('fecha_deteccion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Detección')),
+                ('id_producto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+                ('id_usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Hallazgo de Anomalía',
+                'verbose_name_plural': 'Hallazgos de Anomalías',
+                'db_table': 'hallazgo_anomalia',
+                'ordering': ['-puntaje'],
+                'indexes': [models.Index(fields=['estado', 'fecha_deteccion'], name='hallazgo_estado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0010_ajustes_anomalias'),
+        ('productos', '0002_stock_minimo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conteofisico',
+            name='productos_contados',
+            field=models.ManyToManyField(blank=True, db_table='conteo_fisico_producto', related_name='+', to='productos.producto', verbose_name='Productos Contados'),
+        ),
+    ]
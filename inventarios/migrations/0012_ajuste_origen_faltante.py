@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventarios', '0011_conteo_productos_contados'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ajusteinventario',
+            name='origen',
+            field=models.CharField(choices=[('edicion', 'Edición manual'), ('admin', 'Administración'), ('conteo', 'Conteo físico'), ('transferencia', 'Transferencia'), ('faltante', 'Faltante en venta')], max_length=20, verbose_name='Origen'),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import uuid
+
 from django.db import models
 from productos.models import Producto
+from usuarios.models import Usuario
+from dashboard.models import Cliente
 
 class Inventario(models.Model):
     id_inventario = models.AutoField(primary_key=True)
@@ -26,3 +30,361 @@ class Inventario(models.Model):
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
+
+
+class Lote(models.Model):
+    """
+    Lote con fecha de vencimiento dentro de una fila de inventario. Producto y
+    ubicación se copian del inventario para que la asignación FEFO recorra
+    directamente el índice (producto, ubicación, vencimiento). Las unidades
+    sin lote registrado siguen contando solo en cantidad_actual
+    """
+    id_lote = models.AutoField(primary_key=True)
+    id_inventario = models.ForeignKey(Inventario, on_delete=models.CASCADE, related_name='lotes', verbose_name="Inventario")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, editable=False, verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, editable=False, verbose_name="Ubicación")
+    codigo = models.CharField(max_length=50, blank=True, default='', verbose_name="Código de Lote")
+    fecha_vencimiento = models.DateField(verbose_name="Fecha de Vencimiento")
+    cantidad = models.PositiveIntegerField(verbose_name="Cantidad")
+    fecha_ingreso = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Ingreso")
+    
+    class Meta:
+        verbose_name = "Lote"
+        verbose_name_plural = "Lotes"
+        db_table = "lote"
+        ordering = ['fecha_vencimiento', 'id_lote']
+        indexes = [
+            models.Index(fields=['id_producto', 'ubicacion', 'fecha_vencimiento'], name='lote_fefo_idx'),
+            models.Index(fields=['fecha_vencimiento'], name='lote_vencimiento_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Lote {self.codigo or self.id_lote} - vence {self.fecha_vencimiento}: {self.cantidad} unidades"
+    
+    def save(self, *args, **kwargs):
+        self.id_producto_id = self.id_inventario.id_producto_id
+        self.ubicacion = self.id_inventario.ubicacion
+        super().save(*args, **kwargs)
+
+
+class Reserva(models.Model):
+    """
+    Unidades apartadas para un pedido pendiente de pago. No modifican
+    cantidad_actual: el stock disponible es cantidad_actual menos las reservas
+    no vencidas. Las líneas de un mismo pedido comparten el UUID `pedido`
+    """
+    id_reserva = models.AutoField(primary_key=True)
+    pedido = models.UUIDField(default=uuid.uuid4, db_index=True, verbose_name="Pedido")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    cantidad = models.PositiveIntegerField(verbose_name="Cantidad")
+    id_cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, verbose_name="Cliente")
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, verbose_name="Usuario")
+    creada_en = models.DateTimeField(auto_now_add=True, verbose_name="Creada")
+    expira_en = models.DateTimeField(verbose_name="Expira")
+    
+    class Meta:
+        verbose_name = "Reserva"
+        verbose_name_plural = "Reservas"
+        db_table = "reserva"
+        ordering = ['expira_en']
+        indexes = [
+            models.Index(fields=['id_producto', 'ubicacion', 'expira_en'], name='reserva_activa_idx'),
+            models.Index(fields=['expira_en'], name='reserva_expira_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Reserva {self.pedido} - {self.cantidad} unidades hasta {self.expira_en:%d/%m/%Y %H:%M}"
+
+
+class SugerenciaTransferencia(models.Model):
+    """Transferencia propuesta por el rebalanceo de stock entre ubicaciones"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('aplicada', 'Aplicada'),
+        ('descartada', 'Descartada'),
+    ]
+    
+    id_sugerencia = models.AutoField(primary_key=True)
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, verbose_name="Producto")
+    origen = models.CharField(max_length=150, verbose_name="Origen")
+    destino = models.CharField(max_length=150, verbose_name="Destino")
+    cantidad = models.PositiveIntegerField(verbose_name="Cantidad")
+    # Días de venta que cubría el stock del destino al generar la sugerencia
+    cobertura_destino = models.FloatField(verbose_name="Cobertura del Destino (días)")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente', verbose_name="Estado")
+    fecha_generada = models.DateTimeField(auto_now_add=True, verbose_name="Generada")
+    
+    class Meta:
+        verbose_name = "Sugerencia de Transferencia"
+        verbose_name_plural = "Sugerencias de Transferencia"
+        db_table = "sugerencia_transferencia"
+        ordering = ['cobertura_destino']
+        indexes = [
+            models.Index(fields=['estado', 'origen', 'destino'], name='sugerencia_estado_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.cantidad} x {self.id_producto_id}: {self.origen} -> {self.destino}"
+
+
+class ConteoFisico(models.Model):
+    """Planilla de conteo físico cargada, con sus diferencias pendientes de aplicar"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('aplicado', 'Aplicado'),
+        ('descartado', 'Descartado'),
+    ]
+    
+    id_conteo = models.AutoField(primary_key=True)
+    archivo = models.CharField(max_length=255, verbose_name="Archivo")
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, verbose_name="Usuario")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente', verbose_name="Estado")
+    filas_leidas = models.IntegerField(default=0, verbose_name="Filas Leídas")
+    filas_invalidas = models.IntegerField(default=0, verbose_name="Filas Inválidas")
+    fecha_carga = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Carga")
+    fecha_aplicacion = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Aplicación")
+    # Todos los productos de la planilla, coincidan o no; se marcan como contados al aplicar
+    productos_contados = models.ManyToManyField(
+        Producto, blank=True, related_name='+', db_table='conteo_fisico_producto', verbose_name="Productos Contados"
+    )
+    
+    class Meta:
+        verbose_name = "Conteo Físico"
+        verbose_name_plural = "Conteos Físicos"
+        db_table = "conteo_fisico"
+        ordering = ['-fecha_carga']
+    
+    def __str__(self):
+        return f"Conteo {self.id_conteo} - {self.archivo} ({self.get_estado_display()})"
+
+
+class ConteoFisicoDiferencia(models.Model):
+    """Fila contada cuya cantidad no coincide con el inventario registrado"""
+    id_diferencia = models.AutoField(primary_key=True)
+    id_conteo = models.ForeignKey(ConteoFisico, on_delete=models.CASCADE, related_name='diferencias', verbose_name="Conteo")
+    # Nulo cuando el producto no tenía fila de inventario en esa ubicación
+    id_inventario = models.ForeignKey(Inventario, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Inventario")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    cantidad_sistema = models.IntegerField(verbose_name="Cantidad en Sistema")
+    cantidad_contada = models.IntegerField(verbose_name="Cantidad Contada")
+    
+    class Meta:
+        verbose_name = "Diferencia de Conteo"
+        verbose_name_plural = "Diferencias de Conteo"
+        db_table = "conteo_fisico_diferencia"
+        ordering = ['id_diferencia']
+        unique_together = ['id_conteo', 'id_producto', 'ubicacion']
+    
+    def __str__(self):
+        return f"{self.id_producto_id} - {self.ubicacion}: {self.cantidad_sistema} -> {self.cantidad_contada}"
+    
+    @property
+    def diferencia(self):
+        return self.cantidad_contada - self.cantidad_sistema
+
+
+class CheckpointInventario(models.Model):
+    """
+    Foto del inventario en una fecha. Un checkpoint base guarda todas las filas;
+    los siguientes guardan solo las filas que cambiaron desde el checkpoint
+    anterior y se reconstruyen sobre su base
+    """
+    id_checkpoint = models.AutoField(primary_key=True)
+    fecha = models.DateTimeField(unique=True, verbose_name="Fecha")
+    es_base = models.BooleanField(default=False, verbose_name="Checkpoint Base")
+    id_base = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True,
+                                related_name='deltas', verbose_name="Checkpoint Base")
+    filas_guardadas = models.IntegerField(default=0, verbose_name="Filas Guardadas")
+    
+    class Meta:
+        verbose_name = "Checkpoint de Inventario"
+        verbose_name_plural = "Checkpoints de Inventario"
+        db_table = "checkpoint_inventario"
+        ordering = ['-fecha']
+    
+    def __str__(self):
+        tipo = 'base' if self.es_base else 'delta'
+        return f"Checkpoint {self.fecha:%d/%m/%Y %H:%M} ({tipo}, {self.filas_guardadas} filas)"
+
+
+class FilaCheckpoint(models.Model):
+    """Fila de inventario en un checkpoint; cantidad nula indica que la fila se eliminó"""
+    id_fila = models.AutoField(primary_key=True)
+    id_checkpoint = models.ForeignKey(CheckpointInventario, on_delete=models.CASCADE, related_name='filas', verbose_name="Checkpoint")
+    # Sin clave foránea: el historial contable se conserva aunque el producto se elimine
+    id_producto = models.IntegerField(verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    cantidad = models.IntegerField(null=True, blank=True, verbose_name="Cantidad")
+    precio_referencia = models.IntegerField(null=True, blank=True, verbose_name="Precio de Referencia")
+    
+    class Meta:
+        verbose_name = "Fila de Checkpoint"
+        verbose_name_plural = "Filas de Checkpoint"
+        db_table = "checkpoint_inventario_fila"
+        unique_together = ['id_checkpoint', 'id_producto', 'ubicacion']
+
+
+class AlertaStock(models.Model):
+    """Ubicación donde un producto quedó bajo su stock mínimo"""
+    ESTADOS = [
+        ('activa', 'Activa'),
+        ('notificada', 'Notificada'),
+        ('resuelta', 'Resuelta'),
+    ]
+    
+    id_alerta = models.AutoField(primary_key=True)
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    cantidad = models.IntegerField(verbose_name="Cantidad al Alertar")
+    stock_minimo = models.IntegerField(verbose_name="Stock Mínimo")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='activa', verbose_name="Estado")
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    fecha_notificacion = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Notificación")
+    fecha_resolucion = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Resolución")
+    
+    class Meta:
+        verbose_name = "Alerta de Stock"
+        verbose_name_plural = "Alertas de Stock"
+        db_table = "alerta_stock"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion'], name='alerta_estado_idx'),
+            models.Index(fields=['id_producto', 'ubicacion', 'estado'], name='alerta_producto_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.id_producto_id} - {self.ubicacion}: {self.cantidad}/{self.stock_minimo} ({self.get_estado_display()})"
+
+
+class ClasificacionABC(models.Model):
+    """Clase ABC de un producto según su participación en los ingresos, con su calendario de conteo cíclico"""
+    CLASES = [
+        ('A', 'A'),
+        ('B', 'B'),
+        ('C', 'C'),
+    ]
+    
+    id_clasificacion = models.AutoField(primary_key=True)
+    id_producto = models.OneToOneField(Producto, on_delete=models.CASCADE, related_name='clasificacion_abc', verbose_name="Producto")
+    clase = models.CharField(max_length=1, choices=CLASES, default='C', verbose_name="Clase")
+    ingresos = models.BigIntegerField(default=0, verbose_name="Ingresos del Período")
+    participacion_acumulada = models.FloatField(default=0, verbose_name="Participación Acumulada")
+    fecha_calculo = models.DateTimeField(verbose_name="Fecha de Cálculo")
+    ultimo_conteo = models.DateField(null=True, blank=True, verbose_name="Último Conteo")
+    proximo_conteo = models.DateField(verbose_name="Próximo Conteo")
+    
+    class Meta:
+        verbose_name = "Clasificación ABC"
+        verbose_name_plural = "Clasificaciones ABC"
+        db_table = "clasificacion_abc"
+        ordering = ['clase', '-ingresos']
+        indexes = [
+            models.Index(fields=['proximo_conteo', 'clase'], name='abc_proximo_conteo_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.id_producto_id}: clase {self.clase}, próximo conteo {self.proximo_conteo}"
+
+
+class MetricaInventario(models.Model):
+    """Rotación y días de cobertura de una fila de inventario, recalculados por refrescar_metricas_inventario"""
+    id_metrica = models.AutoField(primary_key=True)
+    id_inventario = models.OneToOneField(Inventario, on_delete=models.CASCADE, related_name='metrica', verbose_name="Inventario")
+    unidades_vendidas = models.IntegerField(default=0, verbose_name="Unidades Vendidas en la Ventana")
+    dias_ventana = models.IntegerField(verbose_name="Días de la Ventana")
+    # Veces al año que se vende el stock actual al ritmo de la ventana
+    rotacion = models.FloatField(null=True, blank=True, verbose_name="Rotación Anual")
+    # Días que dura el stock actual al ritmo de la ventana; nulo si no hubo ventas
+    dias_cobertura = models.FloatField(null=True, blank=True, verbose_name="Días de Cobertura")
+    fecha_calculo = models.DateTimeField(verbose_name="Fecha de Cálculo")
+    
+    class Meta:
+        verbose_name = "Métrica de Inventario"
+        verbose_name_plural = "Métricas de Inventario"
+        db_table = "metrica_inventario"
+        indexes = [
+            models.Index(fields=['rotacion'], name='metrica_rotacion_idx'),
+            models.Index(fields=['dias_cobertura'], name='metrica_cobertura_idx'),
+            models.Index(fields=['fecha_calculo'], name='metrica_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.id_inventario_id}: rotación {self.rotacion}, cobertura {self.dias_cobertura} días"
+
+
+class AjusteInventario(models.Model):
+    """Cambio de stock que no proviene de una venta, con quién lo hizo y desde dónde"""
+    ORIGENES = [
+        ('edicion', 'Edición manual'),
+        ('admin', 'Administración'),
+        ('conteo', 'Conteo físico'),
+        ('transferencia', 'Transferencia'),
+        ('reubicacion', 'Cambio de ubicación'),
+        ('faltante', 'Faltante en venta'),
+    ]
+    
+    id_ajuste = models.AutoField(primary_key=True)
+    id_inventario = models.ForeignKey(Inventario, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Inventario")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Usuario")
+    origen = models.CharField(max_length=20, choices=ORIGENES, verbose_name="Origen")
+    cantidad_anterior = models.IntegerField(verbose_name="Cantidad Anterior")
+    cantidad_nueva = models.IntegerField(verbose_name="Cantidad Nueva")
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name="Fecha")
+    
+    class Meta:
+        verbose_name = "Ajuste de Inventario"
+        verbose_name_plural = "Ajustes de Inventario"
+        db_table = "ajuste_inventario"
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['fecha', 'origen'], name='ajuste_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_origen_display()} {self.id_producto_id} - {self.ubicacion}: {self.cantidad_anterior} -> {self.cantidad_nueva}"
+    
+    @property
+    def diferencia(self):
+        return self.cantidad_nueva - self.cantidad_anterior
+
+
+class HallazgoAnomalia(models.Model):
+    """Merma atípica detectada por el análisis nocturno, pendiente de revisión"""
+    TIPOS = [
+        ('producto', 'Producto en ubicación'),
+        ('usuario', 'Usuario en ubicación'),
+    ]
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('revisado', 'Revisado'),
+        ('descartado', 'Descartado'),
+    ]
+    
+    id_hallazgo = models.AutoField(primary_key=True)
+    tipo = models.CharField(max_length=20, choices=TIPOS, verbose_name="Tipo")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Producto")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Usuario")
+    desde = models.DateTimeField(verbose_name="Desde")
+    hasta = models.DateTimeField(verbose_name="Hasta")
+    unidades = models.IntegerField(verbose_name="Unidades Faltantes")
+    valor = models.IntegerField(verbose_name="Valor Faltante")
+    puntaje = models.FloatField(verbose_name="Puntaje de Anomalía")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente', verbose_name="Estado")
+    fecha_deteccion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Detección")
+    
+    class Meta:
+        verbose_name = "Hallazgo de Anomalía"
+        verbose_name_plural = "Hallazgos de Anomalías"
+        db_table = "hallazgo_anomalia"
+        ordering = ['-puntaje']
+        indexes = [
+            models.Index(fields=['estado', 'fecha_deteccion'], name='hallazgo_estado_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.ubicacion}: -{self.unidades} unidades (${self.valor})"
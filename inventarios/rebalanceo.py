@@ -0,0 +1,121 @@
+"""
+Rebalanceo de stock entre ubicaciones.
+
+Lee todas las filas de inventario y la demanda reciente de cada ubicación en
+arreglos de numpy y propone transferencias con un algoritmo voraz: para cada
+producto, las ubicaciones más cerca de quedarse sin stock reciben primero,
+desde las que tienen mayor excedente sobre su objetivo de cobertura.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import Inventario, Reserva, SugerenciaTransferencia
+
+Movimiento = namedtuple('Movimiento', ['origen', 'destino', 'cantidad', 'cobertura_destino'])
+
+
+def resolver(productos, stock, demanda_diaria, cobertura=14, minimo=1):
+    """
+    Calcula las transferencias sobre arreglos alineados (una posición por fila
+    de inventario). Devuelve una lista de Movimiento con índices de fila.
+
+    - objetivo de cada fila: demanda_diaria * cobertura días
+    - excedente: stock sobre el objetivo, disponible para enviar
+    - déficit: lo que falta para el objetivo en filas con demanda
+    """
+    productos = np.asarray(productos)
+    stock = np.asarray(stock, dtype=np.int64)
+    demanda_diaria = np.asarray(demanda_diaria, dtype=np.float64)
+    if not len(productos):
+        return []
+
+    objetivo = np.ceil(demanda_diaria * cobertura).astype(np.int64)
+    excedente = np.maximum(stock - objetivo, 0)
+    deficit = np.where(demanda_diaria > 0, np.maximum(objetivo - np.maximum(stock, 0), 0), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias = np.where(demanda_diaria > 0, np.maximum(stock, 0) / demanda_diaria, np.inf)
+
+    # Agrupar por producto; dentro del grupo, menor cobertura primero
+    orden = np.lexsort((dias, productos))
+    inicios = np.flatnonzero(np.r_[True, productos[orden][1:] != productos[orden][:-1]])
+    con_excedente = np.add.reduceat(excedente[orden], inicios)
+    con_deficit = np.add.reduceat(deficit[orden], inicios)
+    fines = np.r_[inicios[1:], len(orden)]
+
+    movimientos = []
+    for grupo in np.flatnonzero((con_excedente >= minimo) & (con_deficit >= minimo)):
+        filas = orden[inicios[grupo]:fines[grupo]]
+        receptoras = [fila for fila in filas if deficit[fila] >= minimo]
+        donantes = sorted((fila for fila in filas if excedente[fila] >= minimo), key=lambda f: -excedente[f])
+        restante = {fila: int(excedente[fila]) for fila in donantes}
+
+        for receptora in receptoras:
+            falta = int(deficit[receptora])
+            for donante in donantes:
+                if falta < minimo:
+                    break
+                if donante == receptora or restante[donante] < minimo:
+                    continue
+                cantidad = min(falta, restante[donante])
+                restante[donante] -= cantidad
+                falta -= cantidad
+                movimientos.append(Movimiento(int(donante), int(receptora), cantidad, float(dias[receptora])))
+    return movimientos
+
+
+def cargar_arreglos(dias_demanda=30):
+    """
+    Arreglos de entrada del solver a partir de la base de datos: una fila por
+    Inventario con su stock libre de reservas y su venta diaria promedio
+    """
+    from detalle_ventas.models import DetalleVenta
+
+    ahora = timezone.now()
+    filas = list(Inventario.objects.values_list('id_producto', 'ubicacion', 'cantidad_actual').order_by())
+    n = len(filas)
+    claves = {(id_producto, ubicacion): i for i, (id_producto, ubicacion, _) in enumerate(filas)}
+    productos = np.fromiter((f[0] for f in filas), dtype=np.int64, count=n)
+    stock = np.fromiter((f[2] for f in filas), dtype=np.int64, count=n)
+    vendido = np.zeros(n, dtype=np.float64)
+
+    for id_producto, ubicacion, unidades in Reserva.objects.filter(expira_en__gt=ahora).values_list(
+        'id_producto', 'ubicacion'
+    ).annotate(reservado=Sum('cantidad')).order_by():
+        i = claves.get((id_producto, ubicacion))
+        if i is not None:
+            stock[i] -= unidades
+
+    for id_producto, ubicacion, unidades in DetalleVenta.objects.filter(
+        id_venta__fecha__gte=ahora - timedelta(days=dias_demanda)
+    ).exclude(id_venta__ubicacion='').values_list('id_producto', 'id_venta__ubicacion').annotate(
+        unidades=Sum('cantidad')
+    ).order_by():
+        i = claves.get((id_producto, ubicacion))
+        if i is not None:
+            vendido[i] = unidades
+
+    return filas, productos, stock, vendido / dias_demanda
+
+
+def generar_sugerencias(dias_demanda=30, cobertura=14, minimo=1):
+    """Reemplaza las sugerencias pendientes por las del cálculo actual; devuelve cuántas se guardaron"""
+    filas, productos, stock, demanda = cargar_arreglos(dias_demanda)
+    movimientos = resolver(productos, stock, demanda, cobertura, minimo)
+
+    with transaction.atomic():
+        SugerenciaTransferencia.objects.filter(estado='pendiente').delete()
+        SugerenciaTransferencia.objects.bulk_create([
+            SugerenciaTransferencia(
+                id_producto_id=filas[m.origen][0],
+                origen=filas[m.origen][1],
+                destino=filas[m.destino][1],
+                cantidad=m.cantidad,
+                cobertura_destino=min(m.cobertura_destino, 99999.0),
+            )
+            for m in movimientos
+        ], batch_size=1000)
+    return len(movimientos)
@@ -0,0 +1,116 @@
+"""
+Reservas de stock con vencimiento.
+
+El stock disponible de (producto, ubicación) es cantidad_actual menos la suma
+de las reservas no vencidas, que se obtiene con un agregado sobre el índice
+(producto, ubicación, expira_en). Las reservas vencidas no cuentan aunque
+sigan en la tabla hasta que el barrido las elimina.
+"""
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from dashboard.models import Cliente
+from .models import Inventario, Reserva
+
+# Reservas eliminadas por sentencia al barrer las vencidas
+LOTE_BARRIDO = 1000
+
+
+def stock_disponible(pares, ahora=None):
+    """{(id_producto, ubicacion): cantidad_actual - reservas activas} para los pares dados"""
+    pares = set(pares)
+    if not pares:
+        return {}
+    ahora = ahora or timezone.now()
+    productos = {id_producto for id_producto, _ in pares}
+    ubicaciones = {ubicacion for _, ubicacion in pares}
+
+    disponible = {par: 0 for par in pares}
+    for id_producto, ubicacion, cantidad in Inventario.objects.filter(
+        id_producto__in=productos, ubicacion__in=ubicaciones
+    ).values_list('id_producto', 'ubicacion', 'cantidad_actual'):
+        if (id_producto, ubicacion) in disponible:
+            disponible[(id_producto, ubicacion)] = cantidad
+
+    for fila in Reserva.objects.filter(
+        id_producto__in=productos, ubicacion__in=ubicaciones, expira_en__gt=ahora
+    ).values('id_producto', 'ubicacion').annotate(reservado=Sum('cantidad')).order_by():
+        par = (fila['id_producto'], fila['ubicacion'])
+        if par in disponible:
+            disponible[par] -= fila['reservado']
+    return disponible
+
+
+def reservar(lineas, ubicacion, id_cliente, usuario, minutos=None):
+    """
+    Aparta las unidades de un pedido. lineas es un iterable de (id_producto,
+    cantidad). Devuelve el UUID del pedido; si alguna línea no alcanza no se
+    reserva nada
+    """
+    por_producto = defaultdict(int)
+    for id_producto, cantidad in lineas:
+        if cantidad <= 0:
+            raise ValidationError("La cantidad a reservar debe ser mayor que cero.")
+        por_producto[id_producto] += cantidad
+    if not por_producto:
+        raise ValidationError("El pedido no tiene líneas.")
+    if minutos is not None and minutos <= 0:
+        raise ValidationError("Los minutos de reserva deben ser mayores que cero.")
+    if not Cliente.objects.filter(pk=id_cliente).exists():
+        raise ValidationError("El cliente no existe.")
+
+    ahora = timezone.now()
+    expira_en = ahora + timedelta(minutes=minutos or settings.RESERVA_MINUTOS)
+    pedido = uuid.uuid4()
+    with transaction.atomic():
+        # Bloquear las filas de inventario en orden de clave serializa las
+        # reservas concurrentes sobre los mismos productos
+        list(Inventario.objects.select_for_update().filter(
+            id_producto__in=list(por_producto), ubicacion=ubicacion
+        ).order_by('id_inventario').values_list('id_inventario', flat=True))
+
+        disponible = stock_disponible({(id_producto, ubicacion) for id_producto in por_producto}, ahora)
+        faltantes = [
+            id_producto for id_producto, cantidad in por_producto.items()
+            if disponible[(id_producto, ubicacion)] < cantidad
+        ]
+        if faltantes:
+            raise ValidationError(f"Stock insuficiente en {ubicacion} para los productos {sorted(faltantes)}.")
+
+        Reserva.objects.bulk_create([
+            Reserva(
+                pedido=pedido,
+                id_producto_id=id_producto,
+                ubicacion=ubicacion,
+                cantidad=cantidad,
+                id_cliente_id=id_cliente,
+                id_usuario=usuario,
+                expira_en=expira_en,
+            )
+            for id_producto, cantidad in por_producto.items()
+        ])
+    return pedido
+
+
+def liberar(pedido):
+    """Elimina las reservas de un pedido; devuelve la cantidad de líneas liberadas"""
+    eliminadas, _ = Reserva.objects.filter(pedido=pedido).delete()
+    return eliminadas
+
+
+def expirar_reservas(lote=LOTE_BARRIDO, ahora=None):
+    """Elimina las reservas vencidas en DELETE de a `lote` filas; devuelve el total eliminado"""
+    ahora = ahora or timezone.now()
+    total = 0
+    while True:
+        ids = list(Reserva.objects.filter(expira_en__lte=ahora).order_by('expira_en').values_list('id_reserva', flat=True)[:lote])
+        if not ids:
+            return total
+        eliminadas, _ = Reserva.objects.filter(id_reserva__in=ids).delete()
+        total += eliminadas
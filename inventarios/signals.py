@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from productos.models import Producto
+from .models import Inventario
+from . import alertas
+
+# Se envía con pares={(id_producto, ubicacion), ...} cada vez que cambia el stock,
+# tanto al guardar un Inventario como tras las escrituras masivas con update()
+stock_actualizado = Signal()
+
+
+@receiver([post_save, post_delete], sender=Inventario)
+def notificar_cambio_inventario(sender, instance, **kwargs):
+    stock_actualizado.send(sender=Inventario, pares={(instance.id_producto_id, instance.ubicacion)})
+
+
+@receiver(stock_actualizado)
+def evaluar_alertas_stock(sender, pares, **kwargs):
+    alertas.evaluar(pares)
+
+
+@receiver(post_save, sender=Producto)
+def evaluar_alertas_producto(sender, instance, created, **kwargs):
+    # Un cambio de stock mínimo puede abrir o resolver alertas en todas sus ubicaciones
+    if created:
+        return
+    ubicaciones = Inventario.objects.filter(id_producto=instance).values_list('ubicacion', flat=True)
+    alertas.evaluar((instance.id_producto, ubicacion) for ubicacion in ubicaciones)
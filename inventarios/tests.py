@@ -1,3 +1,150 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.admin.sites import AdminSite
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from productos.models import Producto
+from roles.models import Rol
+from usuarios.models import Usuario
+from .admin import InventarioAdmin
+from .conteos import aplicar_conteo, crear_conteo
+from .lotes import trasladar
+from .models import AjusteInventario, ConteoFisico, Inventario, Lote
+from .transferencias import transferir
+
+
+class ConteoFisicoTest(TestCase):
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre='Bodeguero', descripcion='Bodega')
+        self.usuario = Usuario(username='ana@dulceria.cl', correo='ana@dulceria.cl', nombre='Ana', id_rol=rol)
+        self.usuario.set_unusable_password()
+        self.usuario.save()
+        self.chocolate = Producto.objects.create(nombre='Chocolate', descripcion='Barra', precio_referencia=1000)
+        self.caramelo = Producto.objects.create(nombre='Caramelo', descripcion='Bolsa', precio_referencia=500)
+
+    def contar(self, *filas):
+        contenido = '\n'.join(['producto,ubicacion,cantidad', *filas]).encode()
+        return crear_conteo(SimpleUploadedFile('conteo.csv', contenido), 'conteo.csv', self.usuario)
+
+    def test_cantidades_invalidas_cuentan_como_filas_invalidas(self):
+        conteo, errores = self.contar(
+            'Chocolate,Sala,1e30', 'Chocolate,Bodega,3.7', 'Chocolate,Local,-1', 'Chocolate,Vitrina,inf',
+            'Chocolate,Mesón,2147483648', 'Caramelo,Sala,5.0', 'Caramelo,Bodega,1e3',
+        )
+        self.assertEqual((conteo.filas_leidas, conteo.filas_invalidas), (7, 5))
+        self.assertEqual(
+            [e.split(':')[0] for e in errores], ['Fila 2', 'Fila 3', 'Fila 4', 'Fila 5', 'Fila 6']
+        )
+        self.assertEqual(
+            sorted(conteo.diferencias.values_list('ubicacion', 'cantidad_contada')), [('Bodega', 1000), ('Sala', 5)]
+        )
+
+    def test_ajuste_registra_la_cantidad_al_aplicar(self):
+        Inventario.objects.create(id_producto=self.chocolate, ubicacion='Sala', cantidad_actual=10)
+        conteo, _ = self.contar('Chocolate,Sala,7')
+        # Una venta entre la carga y la aplicación
+        Inventario.objects.filter(id_producto=self.chocolate, ubicacion='Sala').update(cantidad_actual=8)
+
+        self.assertEqual(aplicar_conteo(conteo.pk, self.usuario), 1)
+        ajuste = AjusteInventario.objects.get(origen='conteo')
+        self.assertEqual((ajuste.cantidad_anterior, ajuste.cantidad_nueva), (8, 7))
+        self.assertEqual(Inventario.objects.get(id_producto=self.chocolate).cantidad_actual, 7)
+
+    def test_fila_creada_despues_de_la_carga_se_actualiza(self):
+        conteo, _ = self.contar('Caramelo,Bodega,4', 'Chocolate,Bodega,2')
+        self.assertFalse(conteo.diferencias.exclude(id_inventario=None).exists())
+        fila = Inventario.objects.create(id_producto=self.caramelo, ubicacion='Bodega', cantidad_actual=6)
+
+        self.assertEqual(aplicar_conteo(conteo.pk, self.usuario), 2)
+        fila.refresh_from_db()
+        self.assertEqual(fila.cantidad_actual, 4)
+        self.assertEqual(Inventario.objects.get(id_producto=self.chocolate, ubicacion='Bodega').cantidad_actual, 2)
+        self.assertEqual(
+            sorted(AjusteInventario.objects.filter(origen='conteo').values_list(
+                'id_producto', 'cantidad_anterior', 'cantidad_nueva'
+            )),
+            [(self.chocolate.pk, 0, 2), (self.caramelo.pk, 6, 4)],
+        )
+        self.assertEqual(ConteoFisico.objects.get(pk=conteo.pk).estado, 'aplicado')
+
+
+class TransferenciaLotesTest(TestCase):
+
+    def setUp(self):
+        self.hoy = timezone.localdate()
+        self.productos = [
+            Producto.objects.create(nombre=f'Producto {i}', descripcion='Caja', precio_referencia=1000)
+            for i in range(6)
+        ]
+        for producto in self.productos:
+            inventario = Inventario.objects.create(id_producto=producto, ubicacion='Bodega', cantidad_actual=50)
+            for dias, codigo in ((30, 'L3'), (5, 'L1'), (10, 'L2')):
+                Lote.objects.create(
+                    id_inventario=inventario, codigo=codigo,
+                    fecha_vencimiento=self.hoy + timedelta(days=dias), cantidad=4,
+                )
+        # El primer producto ya tiene en destino un lote con el mismo código y vencimiento
+        sala = Inventario.objects.create(id_producto=self.productos[0], ubicacion='Sala', cantidad_actual=1)
+        Lote.objects.create(id_inventario=sala, codigo='L1', fecha_vencimiento=self.hoy + timedelta(days=5), cantidad=1)
+
+    def lotes(self, producto, ubicacion):
+        return list(Lote.objects.filter(id_producto=producto, ubicacion=ubicacion).order_by(
+            'fecha_vencimiento'
+        ).values_list('codigo', 'cantidad'))
+
+    def test_mueve_lotes_en_orden_fefo(self):
+        transferir([(self.productos[0].pk, 6), (self.productos[1].pk, 9)], 'Bodega', 'Sala')
+
+        self.assertEqual(self.lotes(self.productos[0], 'Bodega'), [('L1', 0), ('L2', 2), ('L3', 4)])
+        self.assertEqual(self.lotes(self.productos[0], 'Sala'), [('L1', 5), ('L2', 2)])
+        self.assertEqual(self.lotes(self.productos[1], 'Sala'), [('L1', 4), ('L2', 4), ('L3', 1)])
+        sala = Inventario.objects.get(id_producto=self.productos[1], ubicacion='Sala')
+        self.assertEqual(set(sala.lotes.values_list('ubicacion', flat=True)), {'Sala'})
+
+    def test_sentencias_fijas_sin_importar_los_productos(self):
+        # Las filas de inventario de destino existen antes de trasladar, como en transferir
+        Inventario.objects.bulk_create([
+            Inventario(id_producto=producto, ubicacion='Sala', cantidad_actual=0) for producto in self.productos[1:]
+        ])
+        # Lotes de origen, descuento, filas de destino, lotes de destino, suma e INSERT
+        with self.assertNumQueries(6):
+            trasladar({self.productos[0].pk: 6, self.productos[1].pk: 9}, 'Bodega', 'Sala')
+        with self.assertNumQueries(6):
+            trasladar({producto.pk: 3 for producto in self.productos}, 'Bodega', 'Sala')
+
+    def test_transferencia_completa_con_sentencias_fijas(self):
+        def contar(productos, origen, destino):
+            with CaptureQueriesContext(connection) as consultas:
+                transferir([(producto.pk, 3) for producto in productos], origen, destino)
+            return len(consultas)
+
+        self.assertEqual(contar(self.productos[:2], 'Bodega', 'Local'), contar(self.productos, 'Bodega', 'Vitrina'))
+
+
+class InventarioAdminTest(TestCase):
+
+    def setUp(self):
+        chocolate = Producto.objects.create(nombre='Chocolate', descripcion='Barra', precio_referencia=1000)
+        Inventario.objects.create(id_producto=chocolate, ubicacion='Sala', cantidad_actual=4)
+        Inventario.objects.create(id_producto=chocolate, ubicacion='Bodega', cantidad_actual=0)
+        self.admin = InventarioAdmin(Inventario, AdminSite())
+
+    def ubicaciones(self, rol):
+        usuario = Usuario(
+            username=f'{rol.lower()}@dulceria.cl', correo=f'{rol.lower()}@dulceria.cl', nombre='Ana',
+            id_rol=Rol.objects.create(nombre=rol, descripcion=rol),
+        )
+        usuario.set_unusable_password()
+        usuario.save()
+        request = RequestFactory().get('/admin/inventarios/inventario/')
+        request.user = usuario
+        return sorted(self.admin.get_queryset(request).values_list('ubicacion', flat=True))
+
+    def test_filas_visibles_segun_la_politica(self):
+        self.assertEqual(self.ubicaciones('Bodeguero'), ['Bodega', 'Sala'])
+        self.assertEqual(self.ubicaciones('Vendedor'), ['Sala'])
+        self.assertEqual(self.ubicaciones('Cliente'), [])
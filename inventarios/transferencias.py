@@ -0,0 +1,108 @@
+"""
+Transferencias de stock entre ubicaciones.
+
+Un lote de productos se mueve con un número fijo de sentencias: bloqueo de
+las filas de origen y destino en orden de clave primaria (dos transferencias
+concurrentes nunca se esperan en orden inverso), un UPDATE que descuenta el
+origen, otro que suma en los destinos existentes y un INSERT masivo para los
+destinos que aún no tienen fila. Los lotes con vencimiento se mueven en orden
+FEFO junto con las unidades, también con sentencias fijas (ver lotes.trasladar).
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from . import ajustes
+from .lotes import trasladar
+from .models import Inventario
+from .reservas import stock_disponible
+from .signals import stock_actualizado
+
+MAX_PRODUCTOS_POR_TRANSFERENCIA = 500
+
+
+def _sumar(por_producto, signo):
+    return F('cantidad_actual') + signo * Case(
+        *[When(id_producto=id_producto, then=Value(cantidad)) for id_producto, cantidad in por_producto.items()],
+        output_field=IntegerField(),
+    )
+
+
+def transferir(movimientos, origen, destino, usuario=None, _reintentar=True):
+    """
+    Mueve stock de `origen` a `destino`. movimientos es un iterable de
+    (id_producto, cantidad). Todo el lote se aplica o ninguno; no se puede
+    mover stock reservado. Devuelve {id_producto: cantidad} transferido
+    """
+    if origen == destino:
+        raise ValidationError("El origen y el destino deben ser distintos.")
+    por_producto = defaultdict(int)
+    for id_producto, cantidad in movimientos:
+        if cantidad <= 0:
+            raise ValidationError("La cantidad a transferir debe ser mayor que cero.")
+        por_producto[id_producto] += cantidad
+    if not por_producto:
+        raise ValidationError("La transferencia no tiene productos.")
+    if len(por_producto) > MAX_PRODUCTOS_POR_TRANSFERENCIA:
+        raise ValidationError(f"Una transferencia no puede superar {MAX_PRODUCTOS_POR_TRANSFERENCIA} productos.")
+    por_producto = dict(por_producto)
+
+    try:
+        with transaction.atomic():
+            filas = {
+                (id_producto, ubicacion): (id_inventario, cantidad)
+                for id_inventario, id_producto, ubicacion, cantidad in Inventario.objects.select_for_update().filter(
+                    id_producto__in=list(por_producto), ubicacion__in=[origen, destino]
+                ).order_by('id_inventario').values_list('id_inventario', 'id_producto', 'ubicacion', 'cantidad_actual')
+            }
+            en_destino = {id_producto for id_producto, ubicacion in filas if ubicacion == destino}
+
+            disponible = stock_disponible({(id_producto, origen) for id_producto in por_producto})
+            faltantes = sorted(
+                id_producto for id_producto, cantidad in por_producto.items()
+                if disponible[(id_producto, origen)] < cantidad
+            )
+            if faltantes:
+                raise ValidationError(f"Stock insuficiente en {origen} para los productos {faltantes}.")
+
+            ahora = timezone.now()
+            Inventario.objects.filter(id_producto__in=list(por_producto), ubicacion=origen).update(
+                cantidad_actual=_sumar(por_producto, -1),
+                fecha_ultima_actualizacion=ahora,
+            )
+            existentes = {id_producto: c for id_producto, c in por_producto.items() if id_producto in en_destino}
+            if existentes:
+                Inventario.objects.filter(id_producto__in=list(existentes), ubicacion=destino).update(
+                    cantidad_actual=_sumar(existentes, 1),
+                    fecha_ultima_actualizacion=ahora,
+                )
+            nuevas = Inventario.objects.bulk_create([
+                Inventario(id_producto_id=id_producto, ubicacion=destino, cantidad_actual=cantidad)
+                for id_producto, cantidad in por_producto.items()
+                if id_producto not in en_destino
+            ])
+            trasladar(por_producto, origen, destino)
+
+            movimientos = []
+            for id_producto, cantidad in por_producto.items():
+                id_inventario, anterior = filas[(id_producto, origen)]
+                movimientos.append((id_inventario, id_producto, origen, anterior, anterior - cantidad))
+                if id_producto in en_destino:
+                    id_inventario, anterior = filas[(id_producto, destino)]
+                    movimientos.append((id_inventario, id_producto, destino, anterior, anterior + cantidad))
+            movimientos.extend((fila.pk, fila.id_producto_id, destino, 0, fila.cantidad_actual) for fila in nuevas)
+            ajustes.registrar(movimientos, 'transferencia', usuario)
+    except IntegrityError:
+        # Otra transferencia creó en paralelo alguna fila de destino: al
+        # reintentar ya existe y queda bloqueada junto a las demás
+        if not _reintentar:
+            raise
+        return transferir(por_producto.items(), origen, destino, usuario, _reintentar=False)
+
+    stock_actualizado.send(
+        sender=Inventario,
+        pares={(id_producto, ubicacion) for id_producto in por_producto for ubicacion in (origen, destino)},
+    )
+    return por_producto
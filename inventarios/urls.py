@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'inventarios'
+
+urlpatterns = [
+    path('transferir/', views.transferir_stock, name='transferir_stock'),
+    path('stock-a-fecha/', views.stock_a_fecha_view, name='stock_a_fecha'),
+]
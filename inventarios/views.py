@@ -1,3 +1,74 @@
-from django.shortcuts import render
+import json
+from datetime import datetime, time
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET, require_POST
+from roles.permisos import requiere_permiso
+from .checkpoints import stock_a_fecha
+from .transferencias import transferir
+
+
+@login_required
+@require_POST
+@requiere_permiso('mover_stock', json=True)
+def transferir_stock(request):
+    """API para mover varios productos de una ubicación a otra en una sola operación"""
+    user = request.user
+    
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'success': False, 'message': 'JSON inválido'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'success': False, 'message': 'JSON inválido'}, status=400)
+    
+    origen = str(payload.get('origen') or '').strip()
+    destino = str(payload.get('destino') or '').strip()
+    if not origen or not destino:
+        return JsonResponse({'success': False, 'message': 'Origen y destino son obligatorios'}, status=400)
+    
+    movimientos = []
+    for linea in payload.get('productos') or []:
+        try:
+            movimientos.append((int(linea['producto']), int(linea['cantidad'])))
+        except (TypeError, ValueError, KeyError):
+            return JsonResponse({'success': False, 'message': 'Producto inválido en la transferencia'}, status=400)
+    
+    try:
+        transferido = transferir(movimientos, origen, destino, usuario=user)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'message': ' '.join(e.messages)}, status=409)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(transferido)} productos transferidos de {origen} a {destino}',
+        'unidades': sum(transferido.values()),
+    })
+
+
+@login_required
+@require_GET
+@requiere_permiso('ver_valorizacion', json=True)
+def stock_a_fecha_view(request):
+    """API con el stock y su valorización al cierre de una fecha"""
+    try:
+        dia = parse_date(request.GET.get('fecha', ''))
+    except ValueError:
+        # Bien formada pero inexistente, por ejemplo 2024-02-30
+        dia = None
+    if dia is None:
+        return JsonResponse({'success': False, 'message': 'Fecha inválida, usa AAAA-MM-DD'}, status=400)
+    
+    resultado = stock_a_fecha(
+        timezone.make_aware(datetime.combine(dia, time.max)),
+        request.GET.get('ubicacion') or None,
+    )
+    if resultado is None:
+        return JsonResponse({'success': False, 'message': 'No hay checkpoints anteriores a esa fecha'}, status=404)
+    
+    resultado['fecha_checkpoint'] = resultado['fecha_checkpoint'].isoformat()
+    return JsonResponse({'success': True, **resultado})
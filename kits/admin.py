@@ -0,0 +1,37 @@
+from django.contrib import admin
+from .models import Kit, ComponenteKit, DisponibilidadKit
+from roles.permisos import PoliticaAdminMixin
+
+class ComponenteKitInline(admin.TabularInline):
+    model = ComponenteKit
+    extra = 1
+    fields = ('id_producto', 'cantidad')
+
+@admin.register(Kit)
+class KitAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_kit', 'id_producto', 'activo')
+    search_fields = ('id_producto__nombre',)
+    list_filter = ('activo',)
+    ordering = ('id_producto__nombre',)
+    list_select_related = ('id_producto',)
+    
+    permiso_modulo = 'mover_stock'
+    
+    inlines = [ComponenteKitInline]
+
+@admin.register(DisponibilidadKit)
+class DisponibilidadKitAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_kit', 'ubicacion', 'disponible', 'fecha_actualizacion')
+    search_fields = ('id_kit__id_producto__nombre', 'ubicacion')
+    list_filter = ('ubicacion',)
+    ordering = ('id_kit', 'ubicacion')
+    list_select_related = ('id_kit__id_producto',)
+    
+    permiso_modulo = 'mover_stock'
+    
+    def has_add_permission(self, request):
+        """La disponibilidad se calcula desde el inventario"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,90 @@
+"""
+Disponibilidad materializada de kits.
+
+La cantidad armable de un kit en una ubicación es el mínimo, sobre sus
+componentes, de cantidad_actual // cantidad por kit. Se guarda en
+disponibilidad_kit y se recalcula solo para los kits que contienen los
+productos cuyo stock cambió, de modo que consultar la disponibilidad en el
+cobro es una lectura por clave.
+"""
+from collections import defaultdict
+
+from django.db import connection
+from inventarios.models import Inventario
+from .models import ComponenteKit, DisponibilidadKit
+
+
+def recalcular(pares=None, kits=None):
+    """
+    Recalcula la disponibilidad de los kits afectados. Con pares
+    {(id_producto, ubicacion)} se limitan los kits y ubicaciones a los que
+    cambiaron; con kits se recalculan esos kits en todas sus ubicaciones.
+    Devuelve la cantidad de filas escritas
+    """
+    ubicaciones = None
+    if kits is None:
+        pares = pares or set()
+        kits = set(ComponenteKit.objects.filter(
+            id_producto__in={id_producto for id_producto, _ in pares}
+        ).values_list('id_kit', flat=True))
+        ubicaciones = {ubicacion for _, ubicacion in pares}
+    if not kits:
+        return 0
+
+    componentes = defaultdict(list)
+    for id_kit, id_producto, cantidad in ComponenteKit.objects.filter(
+        id_kit__in=kits
+    ).values_list('id_kit', 'id_producto', 'cantidad'):
+        componentes[id_kit].append((id_producto, cantidad))
+
+    inventarios = Inventario.objects.filter(
+        id_producto__in={p for lista in componentes.values() for p, _ in lista}
+    )
+    if ubicaciones is not None:
+        inventarios = inventarios.filter(ubicacion__in=ubicaciones)
+    stock = {
+        (id_producto, ubicacion): cantidad
+        for id_producto, ubicacion, cantidad in inventarios.values_list('id_producto', 'ubicacion', 'cantidad_actual')
+    }
+    todas = set(ubicaciones or ()) | {ubicacion for _, ubicacion in stock}
+
+    filas = []
+    for id_kit in kits:
+        lista = componentes.get(id_kit)
+        for ubicacion in todas:
+            disponible = min(
+                (stock.get((id_producto, ubicacion), 0) // cantidad for id_producto, cantidad in lista),
+                default=0,
+            ) if lista else 0
+            filas.append(DisponibilidadKit(id_kit_id=id_kit, ubicacion=ubicacion, disponible=max(disponible, 0)))
+
+    DisponibilidadKit.objects.bulk_create(
+        filas,
+        update_conflicts=True,
+        # MySQL no acepta unique_fields: su ON DUPLICATE KEY UPDATE usa el índice único (kit, ubicación)
+        unique_fields=['id_kit', 'ubicacion'] if connection.features.supports_update_conflicts_with_target else None,
+        update_fields=['disponible', 'fecha_actualizacion'],
+    )
+    return len(filas)
+
+
+def expandir_kits(unidades_por_producto):
+    """
+    Reemplaza los kits de {id_producto: unidades} por las unidades de sus
+    componentes, con una sola consulta. Los productos que no son kit se mantienen
+    """
+    resultado = defaultdict(int)
+    componentes = defaultdict(list)
+    for id_producto_kit, id_producto, cantidad in ComponenteKit.objects.filter(
+        id_kit__id_producto__in=list(unidades_por_producto), id_kit__activo=True
+    ).values_list('id_kit__id_producto', 'id_producto', 'cantidad'):
+        componentes[id_producto_kit].append((id_producto, cantidad))
+
+    for id_producto, unidades in unidades_por_producto.items():
+        if id_producto in componentes:
+            for id_componente, cantidad in componentes[id_producto]:
+                resultado[id_componente] += unidades * cantidad
+        else:
+            resultado[id_producto] += unidades
+    return dict(resultado)
+
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Kit',
+            fields=[
+                ('id_kit', models.AutoField(primary_key=True, serialize=False)),
+                ('activo', models.BooleanField(default=True, verbose_name='Activo')),
+                ('id_producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='kit', to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Kit',
+                'verbose_name_plural': 'Kits',
+                'db_table': 'kit',
+            },
+        ),
+        migrations.CreateModel(
+            name='DisponibilidadKit',
+            fields=[
+                ('id_disponibilidad', models.AutoField(primary_key=True, serialize=False)),
+                ('ubicacion', models.CharField(max_length=150, verbose_name='Ubicación')),
+                ('disponible', models.IntegerField(default=0, verbose_name='Disponible')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('id_kit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disponibilidad', to='kits.kit', verbose_name='Kit')),
+            ],
+            options={
+                'verbose_name': 'Disponibilidad de Kit',
+                'verbose_name_plural': 'Disponibilidad de Kits',
+                'db_table': 'disponibilidad_kit',
+                'unique_together': {('id_kit', 'ubicacion')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ComponenteKit',
+            fields=[
+                ('id_componente', models.AutoField(primary_key=True, serialize=False)),
+                ('cantidad', models.PositiveIntegerField(default=1, verbose_name='Cantidad por Kit')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kits_componente', to='productos.producto', verbose_name='Producto')),
+                ('id_kit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='componentes', to='kits.kit', verbose_name='Kit')),
+            ],
+            options={
+                'verbose_name': 'Componente de Kit',
+                'verbose_name_plural': 'Componentes de Kit',
+                'db_table': 'componente_kit',
+                'unique_together': {('id_kit', 'id_producto')},
+            },
+        ),
+    ]
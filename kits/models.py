@@ -0,0 +1,55 @@
+from django.db import models
+from productos.models import Producto
+
+class Kit(models.Model):
+    """Producto vendible armado con varios productos individuales (caja de regalo)"""
+    id_kit = models.AutoField(primary_key=True)
+    id_producto = models.OneToOneField(Producto, on_delete=models.CASCADE, related_name='kit', verbose_name="Producto")
+    activo = models.BooleanField(default=True, verbose_name="Activo")
+    
+    class Meta:
+        verbose_name = "Kit"
+        verbose_name_plural = "Kits"
+        db_table = "kit"
+    
+    def __str__(self):
+        return f"Kit {self.id_producto.nombre}"
+
+
+class ComponenteKit(models.Model):
+    id_componente = models.AutoField(primary_key=True)
+    id_kit = models.ForeignKey(Kit, on_delete=models.CASCADE, related_name='componentes', verbose_name="Kit")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='kits_componente', verbose_name="Producto")
+    cantidad = models.PositiveIntegerField(default=1, verbose_name="Cantidad por Kit")
+    
+    class Meta:
+        verbose_name = "Componente de Kit"
+        verbose_name_plural = "Componentes de Kit"
+        db_table = "componente_kit"
+        unique_together = ['id_kit', 'id_producto']
+    
+    def __str__(self):
+        return f"{self.cantidad} x {self.id_producto.nombre}"
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        if not self.cantidad:
+            raise ValidationError("La cantidad por kit debe ser mayor a cero.")
+
+
+class DisponibilidadKit(models.Model):
+    """Kits armables por ubicación, materializado desde el inventario de sus componentes"""
+    id_disponibilidad = models.AutoField(primary_key=True)
+    id_kit = models.ForeignKey(Kit, on_delete=models.CASCADE, related_name='disponibilidad', verbose_name="Kit")
+    ubicacion = models.CharField(max_length=150, verbose_name="Ubicación")
+    disponible = models.IntegerField(default=0, verbose_name="Disponible")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+    
+    class Meta:
+        verbose_name = "Disponibilidad de Kit"
+        verbose_name_plural = "Disponibilidad de Kits"
+        db_table = "disponibilidad_kit"
+        unique_together = ['id_kit', 'ubicacion']
+    
+    def __str__(self):
+        return f"{self.id_kit} - {self.ubicacion}: {self.disponible}"
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from inventarios.signals import stock_actualizado
+from .models import ComponenteKit
+from . import disponibilidad
+
+
+@receiver(stock_actualizado)
+def actualizar_disponibilidad(sender, pares, **kwargs):
+    disponibilidad.recalcular(pares=pares)
+
+
+@receiver([post_save, post_delete], sender=ComponenteKit)
+def actualizar_disponibilidad_kit(sender, instance, **kwargs):
+    disponibilidad.recalcular(kits={instance.id_kit_id})
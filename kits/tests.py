@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from inventarios.models import Inventario
+from inventarios.transferencias import transferir
+from productos.models import Producto
+from .models import ComponenteKit, DisponibilidadKit, Kit
+
+
+class DisponibilidadKitTest(TestCase):
+
+    def setUp(self):
+        self.caja = Producto.objects.create(nombre='Caja regalo', descripcion='Kit', precio_referencia=5000)
+        self.chocolate = Producto.objects.create(nombre='Chocolate', descripcion='Barra', precio_referencia=1000)
+        self.caramelo = Producto.objects.create(nombre='Caramelo', descripcion='Bolsa', precio_referencia=500)
+        self.kit = Kit.objects.create(id_producto=self.caja)
+        ComponenteKit.objects.create(id_kit=self.kit, id_producto=self.chocolate, cantidad=2)
+        ComponenteKit.objects.create(id_kit=self.kit, id_producto=self.caramelo, cantidad=1)
+
+    def disponibilidad(self):
+        return dict(DisponibilidadKit.objects.filter(id_kit=self.kit).values_list('ubicacion', 'disponible'))
+
+    def test_se_recalcula_con_cada_cambio_de_stock(self):
+        Inventario.objects.create(id_producto=self.chocolate, ubicacion='Sala', cantidad_actual=10)
+        Inventario.objects.create(id_producto=self.caramelo, ubicacion='Sala', cantidad_actual=3)
+        self.assertEqual(self.disponibilidad(), {'Sala': 3})
+
+        # Una escritura masiva avisa por stock_actualizado; las filas existentes se actualizan
+        transferir([(self.chocolate.pk, 6)], 'Sala', 'Bodega')
+        self.assertEqual(self.disponibilidad(), {'Sala': 2, 'Bodega': 0})
+        self.assertEqual(DisponibilidadKit.objects.filter(id_kit=self.kit).count(), 2)
+
+    def test_sin_unique_fields_en_motores_que_no_los_aceptan(self):
+        Inventario.objects.create(id_producto=self.chocolate, ubicacion='Sala', cantidad_actual=10)
+
+        # Como en MySQL: ON DUPLICATE KEY UPDATE no recibe las columnas del conflicto
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(DisponibilidadKit.objects, 'bulk_create') as crear:
+            Inventario.objects.filter(id_producto=self.chocolate).update(cantidad_actual=8)
+            Inventario.objects.get(id_producto=self.chocolate).save()
+
+        crear.assert_called_once()
+        self.assertIsNone(crear.call_args.kwargs['unique_fields'])
+        self.assertTrue(crear.call_args.kwargs['update_conflicts'])
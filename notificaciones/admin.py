@@ -0,0 +1,38 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import CorreoSaliente
+from roles.permisos import PoliticaAdminMixin
+
+@admin.register(CorreoSaliente)
+class CorreoSalienteAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_correo', 'asunto', 'destinatarios', 'estado', 'intentos', 'proximo_intento', 'vence', 'fecha_creacion', 'fecha_envio')
+    search_fields = ('asunto', 'destinatarios')
+    list_filter = ('estado', 'confidencial')
+    ordering = ('-fecha_creacion',)
+    readonly_fields = ('intentos', 'ultimo_error', 'fecha_creacion', 'fecha_envio')
+    
+    permiso_modulo = 'admin_completo'
+    permiso_cambiar = 'admin_completo'
+    
+    def has_add_permission(self, request):
+        """Los correos los encola la aplicación"""
+        return False
+    
+    def get_exclude(self, request, obj=None):
+        """El cuerpo de los correos confidenciales (credenciales, enlaces de acceso) no se muestra"""
+        if obj is not None and obj.confidencial:
+            return ('cuerpo', 'cuerpo_html')
+        return super().get_exclude(request, obj)
+    
+    def reintentar(self, request, queryset):
+        """
+        Volver a poner en cola los correos fallidos seleccionados. Los
+        confidenciales ya no tienen cuerpo y los vencidos ya no sirven
+        """
+        updated = queryset.filter(estado='fallido', confidencial=False).exclude(vence__lte=timezone.now()).update(
+            estado='pendiente', intentos=0, proximo_intento=timezone.now()
+        )
+        self.message_user(request, f'{updated} correos puestos nuevamente en cola.')
+    reintentar.short_description = "Reintentar correos fallidos"
+    
+    actions = ['reintentar']
@@ -0,0 +1,161 @@
+"""
+Bandeja de salida de correos.
+
+Las vistas no hablan con el servidor SMTP: encolar() guarda un CorreoSaliente
+en la misma transacción que los datos que lo originan (si la transacción se
+revierte, el correo no existe). El comando enviar_correos toma los pendientes
+por lotes y los envía por una sola conexión SMTP. Un correo que falla se
+reprograma con espera exponencial y, tras CORREO_MAX_INTENTOS, queda fallido.
+Un correo con fecha de vencimiento (un enlace que expira) queda fallido en
+cuanto vence, aunque le queden intentos.
+
+Cada lote se reserva adelantando su próximo intento en CORREO_PLAZO_RECLAMO
+segundos: otro worker no lo toma mientras se envía y, si el proceso muere a
+mitad de camino, los correos vuelven a quedar disponibles al vencer el plazo.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+from .models import CorreoSaliente
+
+# Tope de la espera entre reintentos
+MAX_ESPERA_SEGUNDOS = 6 * 60 * 60
+
+
+def encolar(asunto, destinatarios, cuerpo='', html='', remitente=None, confidencial=False, vence=None):
+    """
+    Deja un correo pendiente de envío y lo devuelve. Sin cuerpo de texto se
+    usa el HTML sin etiquetas. El cuerpo de un correo confidencial se borra al
+    terminar su envío (enviado o fallido); uno con `vence` no se envía después
+    de esa fecha
+    """
+    if isinstance(destinatarios, str):
+        destinatarios = [destinatarios]
+    return CorreoSaliente.objects.create(
+        asunto=asunto[:255],
+        destinatarios=', '.join(destinatarios),
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        cuerpo=cuerpo or strip_tags(html),
+        cuerpo_html=html,
+        confidencial=confidencial,
+        vence=vence,
+    )
+
+
+def encolar_lote(correos, confidencial=False, batch_size=500):
+    """
+    Como encolar() para muchos correos a la vez, con bulk_create. Recibe
+    tuplas (asunto, destinatarios, cuerpo, html)
+    """
+    remitente = settings.DEFAULT_FROM_EMAIL
+    return CorreoSaliente.objects.bulk_create([
+        CorreoSaliente(
+            asunto=asunto[:255],
+            destinatarios=destinatarios if isinstance(destinatarios, str) else ', '.join(destinatarios),
+            remitente=remitente,
+            cuerpo=cuerpo or strip_tags(html),
+            cuerpo_html=html,
+            confidencial=confidencial,
+        )
+        for asunto, destinatarios, cuerpo, html in correos
+    ], batch_size=batch_size)
+
+
+def espera_reintento(intentos):
+    """Segundos hasta el próximo intento tras `intentos` fallos"""
+    return min(settings.CORREO_REINTENTO_SEGUNDOS * 2 ** (intentos - 1), MAX_ESPERA_SEGUNDOS)
+
+
+def _vencer(ahora):
+    """Marca fallidos los pendientes cuyo plazo pasó; devuelve cuántos"""
+    vencidos = CorreoSaliente.objects.filter(estado='pendiente', vence__lte=ahora)
+    vencidos.filter(confidencial=True).update(cuerpo='', cuerpo_html='')
+    return vencidos.update(estado='fallido', ultimo_error='Venció antes de poder enviarse')
+
+
+def _reservar(lote):
+    ahora = timezone.now()
+    with transaction.atomic():
+        ids = list(CorreoSaliente.objects.select_for_update(skip_locked=True).filter(
+            estado='pendiente', proximo_intento__lte=ahora
+        ).order_by('proximo_intento').values_list('id_correo', flat=True)[:lote])
+        CorreoSaliente.objects.filter(id_correo__in=ids).update(
+            proximo_intento=ahora + timedelta(seconds=settings.CORREO_PLAZO_RECLAMO)
+        )
+    return list(CorreoSaliente.objects.filter(id_correo__in=ids).order_by('proximo_intento', 'id_correo'))
+
+
+def _mensaje(correo, conexion):
+    mensaje = EmailMultiAlternatives(
+        subject=correo.asunto,
+        body=correo.cuerpo,
+        from_email=correo.remitente or settings.DEFAULT_FROM_EMAIL,
+        to=correo.lista_destinatarios(),
+        connection=conexion,
+    )
+    if correo.cuerpo_html:
+        mensaje.attach_alternative(correo.cuerpo_html, 'text/html')
+    return mensaje
+
+
+def entregar(lote=None, max_intentos=None):
+    """
+    Envía un lote de correos pendientes por una conexión reutilizada y
+    devuelve (enviados, reprogramados, fallidos). Los fallidos incluyen los
+    que vencieron sin enviarse
+    """
+    lote = lote or settings.CORREO_LOTE
+    max_intentos = max_intentos or settings.CORREO_MAX_INTENTOS
+    vencidos = _vencer(timezone.now())
+    correos = _reservar(lote)
+    if not correos:
+        return 0, 0, vencidos
+
+    conexion = get_connection(fail_silently=False)
+    enviados = []
+    con_error = []
+    abierta = False
+    for correo in correos:
+        try:
+            if not abierta:
+                conexion.open()
+                abierta = True
+            conexion.send_messages([_mensaje(correo, conexion)])
+        except Exception as e:
+            correo.ultimo_error = f'{type(e).__name__}: {e}'[:2000]
+            con_error.append(correo)
+            # La conexión puede haber quedado en mal estado; se abre otra para el siguiente
+            try:
+                conexion.close()
+            except Exception:
+                pass
+            abierta = False
+        else:
+            enviados.append(correo.id_correo)
+    if abierta:
+        conexion.close()
+
+    ahora = timezone.now()
+    if enviados:
+        CorreoSaliente.objects.filter(id_correo__in=enviados).update(
+            estado='enviado', fecha_envio=ahora, ultimo_error=''
+        )
+    fallidos = 0
+    for correo in con_error:
+        correo.intentos += 1
+        proximo = ahora + timedelta(seconds=espera_reintento(correo.intentos))
+        if correo.intentos >= max_intentos or (correo.vence and proximo >= correo.vence):
+            correo.estado = 'fallido'
+            fallidos += 1
+        else:
+            correo.proximo_intento = proximo
+    CorreoSaliente.objects.bulk_update(con_error, ['intentos', 'estado', 'proximo_intento', 'ultimo_error'])
+    # Las credenciales no quedan guardadas una vez que el correo salió o se dio por perdido
+    CorreoSaliente.objects.filter(
+        id_correo__in=[correo.id_correo for correo in correos], confidencial=True, estado__in=['enviado', 'fallido']
+    ).update(cuerpo='', cuerpo_html='')
+    return len(enviados), len(con_error) - fallidos, fallidos + vencidos
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from notificaciones.correo import entregar
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía los correos pendientes de la bandeja de salida por lotes, reutilizando una conexión SMTP. '
+        'Ejecutarlo con cron cada minuto o dejarlo corriendo con --continuo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=None, help='Correos por lote (por defecto CORREO_LOTE)')
+        parser.add_argument('--max-intentos', type=int, default=None, help='Intentos antes de dejar un correo fallido')
+        parser.add_argument('--continuo', action='store_true', help='Seguir revisando la bandeja hasta interrumpirlo')
+        parser.add_argument('--pausa', type=float, default=5, help='Segundos de espera cuando la bandeja está vacía')
+
+    def handle(self, *args, **options):
+        total = [0, 0, 0]
+        try:
+            while True:
+                resultado = entregar(options['lote'], options['max_intentos'])
+                total = [a + b for a, b in zip(total, resultado)]
+                if any(resultado):
+                    enviados, reprogramados, fallidos = resultado
+                    self.stdout.write(
+                        f'{enviados} enviados, {reprogramados} reprogramados, {fallidos} fallidos'
+                    )
+                    # Puede haber más pendientes; se sigue hasta vaciar la bandeja
+                    continue
+                if not options['continuo']:
+                    break
+                time.sleep(options['pausa'])
+        except KeyboardInterrupt:
+            pass
+
+        enviados, reprogramados, fallidos = total
+        self.stdout.write(self.style.SUCCESS(
+            f'Total: {enviados} enviados, {reprogramados} reprogramados, {fallidos} fallidos'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSaliente',
+            fields=[
+                ('id_correo', models.AutoField(primary_key=True, serialize=False)),
+                ('asunto', models.CharField(max_length=255, verbose_name='Asunto')),
+                ('destinatarios', models.TextField(help_text='Separados por coma', verbose_name='Destinatarios')),
+                ('remitente', models.CharField(blank=True, max_length=255, verbose_name='Remitente')),
+                ('cuerpo', models.TextField(verbose_name='Cuerpo')),
+                ('cuerpo_html', models.TextField(blank=True, verbose_name='Cuerpo HTML')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo Intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último Error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Envío')),
+            ],
+            options={
+                'verbose_name': 'Correo Saliente',
+                'verbose_name_plural': 'Correos Salientes',
+                'db_table': 'correo_saliente',
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_intento_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correosaliente',
+            name='confidencial',
+            field=models.BooleanField(default=False, verbose_name='Confidencial'),
+        ),
+    ]
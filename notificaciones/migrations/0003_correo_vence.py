@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0002_correo_confidencial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correosaliente',
+            name='vence',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Vence'),
+        ),
+    ]
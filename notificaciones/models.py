@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class CorreoSaliente(models.Model):
+    """Correo en cola; lo envía el comando enviar_correos"""
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    id_correo = models.AutoField(primary_key=True)
+    asunto = models.CharField(max_length=255, verbose_name="Asunto")
+    destinatarios = models.TextField(verbose_name="Destinatarios", help_text="Separados por coma")
+    remitente = models.CharField(max_length=255, blank=True, verbose_name="Remitente")
+    cuerpo = models.TextField(verbose_name="Cuerpo")
+    cuerpo_html = models.TextField(blank=True, verbose_name="Cuerpo HTML")
+    # Credenciales o enlaces de acceso: el cuerpo se borra cuando el envío termina
+    confidencial = models.BooleanField(default=False, verbose_name="Confidencial")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', verbose_name="Estado")
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name="Intentos")
+    proximo_intento = models.DateTimeField(default=timezone.now, verbose_name="Próximo Intento")
+    # Después de esta fecha el correo ya no sirve (por ejemplo, un enlace que expiró) y no se envía
+    vence = models.DateTimeField(null=True, blank=True, verbose_name="Vence")
+    ultimo_error = models.TextField(blank=True, verbose_name="Último Error")
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    fecha_envio = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Envío")
+
+    class Meta:
+        verbose_name = "Correo Saliente"
+        verbose_name_plural = "Correos Salientes"
+        db_table = "correo_saliente"
+        indexes = [
+            # El worker busca los pendientes cuyo próximo intento ya llegó
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_intento_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {self.destinatarios} ({self.get_estado_display()})"
+
+    def lista_destinatarios(self):
+        return [correo.strip() for correo in self.destinatarios.split(',') if correo.strip()]
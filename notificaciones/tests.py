@@ -0,0 +1,143 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from roles.models import Rol
+from usuarios.models import PasswordResetToken, Usuario
+from .correo import _reservar, encolar, entregar, espera_reintento
+from .models import CorreoSaliente
+
+
+class ServidorCaido(BaseEmailBackend):
+    """Backend que falla siempre, como un servidor SMTP que rechaza la conexión"""
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('Conexión rechazada')
+
+
+@override_settings(
+    CORREO_LOTE=10, CORREO_MAX_INTENTOS=3, CORREO_REINTENTO_SEGUNDOS=60, CORREO_PLAZO_RECLAMO=600,
+)
+class BandejaSalidaTest(TestCase):
+
+    def test_reserva_adelanta_el_proximo_intento(self):
+        correo = encolar('Asunto', 'ana@dulceria.cl', 'Hola')
+        antes = timezone.now()
+
+        self.assertEqual([c.id_correo for c in _reservar(10)], [correo.id_correo])
+        correo.refresh_from_db()
+        self.assertGreaterEqual(correo.proximo_intento, antes + timedelta(seconds=600))
+        # Otro worker no vuelve a tomarlo mientras dura el plazo de reclamo
+        self.assertEqual(_reservar(10), [])
+
+    def test_reserva_respeta_el_tamano_del_lote(self):
+        for i in range(5):
+            encolar(f'Asunto {i}', 'ana@dulceria.cl', 'Hola')
+
+        self.assertEqual(len(_reservar(3)), 3)
+        self.assertEqual(len(_reservar(3)), 2)
+
+    def test_espera_exponencial_con_tope(self):
+        self.assertEqual([espera_reintento(n) for n in range(1, 5)], [60, 120, 240, 480])
+        self.assertEqual(espera_reintento(30), 6 * 60 * 60)
+
+    def test_envio_exitoso(self):
+        correo = encolar('Asunto', ['ana@dulceria.cl', 'luis@dulceria.cl'], html='<p>Hola</p>')
+
+        self.assertEqual(entregar(), (1, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ana@dulceria.cl', 'luis@dulceria.cl'])
+        self.assertEqual(mail.outbox[0].body, 'Hola')
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, 'enviado')
+        self.assertIsNotNone(correo.fecha_envio)
+
+    @override_settings(EMAIL_BACKEND='notificaciones.tests.ServidorCaido')
+    def test_fallo_reprograma_con_espera(self):
+        correo = encolar('Asunto', 'ana@dulceria.cl', 'Hola')
+        antes = timezone.now()
+
+        self.assertEqual(entregar(), (0, 1, 0))
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('pendiente', 1))
+        self.assertIn('ConnectionRefusedError', correo.ultimo_error)
+        self.assertGreaterEqual(correo.proximo_intento, antes + timedelta(seconds=60))
+        self.assertLess(correo.proximo_intento, antes + timedelta(seconds=600))
+
+    @override_settings(EMAIL_BACKEND='notificaciones.tests.ServidorCaido')
+    def test_fallido_tras_max_intentos(self):
+        correo = encolar('Asunto', 'ana@dulceria.cl', 'Hola')
+        CorreoSaliente.objects.filter(pk=correo.pk).update(intentos=2)
+
+        self.assertEqual(entregar(), (0, 0, 1))
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('fallido', 3))
+
+    def test_confidencial_se_borra_al_enviarse(self):
+        confidencial = encolar('Credenciales', 'ana@dulceria.cl', 'Tu contraseña: secreta', confidencial=True)
+        comun = encolar('Aviso', 'ana@dulceria.cl', 'Hola')
+
+        self.assertEqual(entregar(), (2, 0, 0))
+        self.assertIn('secreta', mail.outbox[0].body)
+        confidencial.refresh_from_db()
+        comun.refresh_from_db()
+        self.assertEqual((confidencial.cuerpo, confidencial.cuerpo_html), ('', ''))
+        self.assertEqual(comun.cuerpo, 'Hola')
+
+    def test_vencido_no_se_envia(self):
+        correo = encolar('Enlace', 'ana@dulceria.cl', 'Hola', confidencial=True, vence=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(entregar(), (0, 0, 1))
+        self.assertEqual(mail.outbox, [])
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.cuerpo), ('fallido', ''))
+
+    @override_settings(EMAIL_BACKEND='notificaciones.tests.ServidorCaido')
+    def test_no_se_reintenta_despues_del_vencimiento(self):
+        correo = encolar('Enlace', 'ana@dulceria.cl', 'Hola', vence=timezone.now() + timedelta(seconds=30))
+
+        self.assertEqual(entregar(), (0, 0, 1))
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('fallido', 1))
+
+
+@override_settings(CORREO_PLAZO_RECUPERACION=900)
+class RecuperacionContrasenaTest(TestCase):
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre='Vendedor', descripcion='Ventas en sala')
+        self.usuario = Usuario(username='ana@dulceria.cl', correo='ana@dulceria.cl', nombre='Ana', id_rol=rol)
+        self.usuario.set_password('Clave-segura-1')
+        self.usuario.save()
+
+    def test_token_y_correo_en_la_misma_transaccion(self):
+        respuesta = self.client.post(reverse('dashboard:forgot_password'), {'email': 'ana@dulceria.cl'})
+
+        self.assertEqual(respuesta.status_code, 302)
+        token = PasswordResetToken.objects.get(usuario=self.usuario)
+        correo = CorreoSaliente.objects.get()
+        self.assertIn(str(token.token), correo.cuerpo_html)
+        self.assertTrue(correo.confidencial)
+        self.assertLessEqual(correo.vence, token.expires_at)
+        self.assertLessEqual(correo.vence, timezone.now() + timedelta(seconds=900))
+        # La vista solo encola: el envío lo hace el comando enviar_correos
+        self.assertEqual(mail.outbox, [])
+
+    def test_sin_correo_no_queda_token(self):
+        with mock.patch('dashboard.views.encolar', side_effect=RuntimeError('Sin base de datos')):
+            respuesta = self.client.post(reverse('dashboard:forgot_password'), {'email': 'ana@dulceria.cl'})
+
+        # La vista informa el error y el token creado antes de encolar se revierte
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(PasswordResetToken.objects.exists())
+        self.assertFalse(CorreoSaliente.objects.exists())
+
+    def test_correo_desconocido_no_encola(self):
+        respuesta = self.client.post(reverse('dashboard:forgot_password'), {'email': 'nadie@dulceria.cl'})
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertFalse(CorreoSaliente.objects.exists())
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.db.models import Q
 from .models import Producto
 from inventarios.admin import InventarioInline
+from roles.permisos import PoliticaAdminMixin
 
 class PrecioFilter(admin.SimpleListFilter):
     title = 'Rango de Precio'
@@ -42,20 +43,17 @@ class LetraInicialFilter(admin.SimpleListFilter):
         return queryset
 
 @admin.register(Producto)
-class ProductoAdmin(admin.ModelAdmin):
+class ProductoAdmin(PoliticaAdminMixin, admin.ModelAdmin):
     list_display = ('id_producto', 'nombre', 'descripcion', 'precio_referencia')
     search_fields = ('nombre', 'descripcion')
     list_filter = (PrecioFilter, LetraInicialFilter)
     ordering = ('nombre',)
     list_select_related = ()
     
-    def has_module_permission(self, request):
-        """Controlar acceso al módulo de productos"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            # Administradores y Bodegueros pueden ver productos
-            return user_role in ['Administrador', 'Bodeguero']
-        return request.user.is_superuser
+    permiso_modulo = 'editar_productos'
+    permiso_agregar = 'editar_productos'
+    permiso_cambiar = 'editar_productos'
+    permiso_eliminar = 'eliminar_productos'
     
     fieldsets = (
         ('Información del Producto', {
@@ -64,25 +62,3 @@ class ProductoAdmin(admin.ModelAdmin):
     )
     
     inlines = [InventarioInline]
-    
-    def has_add_permission(self, request):
-        """Controlar permisos de agregar según rol"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            return user_role in ['Administrador', 'Bodeguero']
-        return request.user.is_superuser
-    
-    def has_change_permission(self, request, obj=None):
-        """Controlar permisos de editar según rol"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            # Solo administradores pueden modificar productos existentes
-            return user_role == 'Administrador'
-        return request.user.is_superuser
-    
-    def has_delete_permission(self, request, obj=None):
-        """Controlar permisos de eliminar según rol"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            return user_role == 'Administrador'
-        return request.user.is_superuser
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(default=0, verbose_name='Stock Mínimo'),
+        ),
+    ]
@@ -5,6 +5,8 @@ class Producto(models.Model):
     nombre = models.CharField(max_length=150, verbose_name="Nombre del Producto")
     descripcion = models.CharField(max_length=191, verbose_name="Descripción")
     precio_referencia = models.IntegerField(verbose_name="Precio de Referencia")
+    # Bajo este stock en una ubicación se genera una alerta; 0 desactiva las alertas
+    stock_minimo = models.PositiveIntegerField(default=0, verbose_name="Stock Mínimo")
     
     class Meta:
         verbose_name = "Producto"
@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from .models import Producto
+from usuarios import preferencias
 from django import forms
 
 class ProductoForm(forms.ModelForm):
@@ -64,16 +65,8 @@ def lista_productos(request):
     
     productos = productos.order_by(order_field)
     
-    # Paginación - obtener de sesión o de parámetro GET
-    per_page_param = request.GET.get('per_page')
-    if per_page_param:
-        per_page = int(per_page_param)
-        request.session['productos_per_page'] = per_page
-    else:
-        per_page = request.session.get('productos_per_page', 10)
-        # Asegurar que sea entero
-        if isinstance(per_page, str):
-            per_page = int(per_page)
+    # Paginación - parámetro GET o la última preferencia del usuario
+    per_page = preferencias.por_pagina(request, 'productos')
     
     paginator = Paginator(productos, per_page)
     page = request.GET.get('page', 1)
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from .models import Promocion, ComponenteCombo
+from roles.permisos import PoliticaAdminMixin
+
+class ComponenteComboInline(admin.TabularInline):
+    model = ComponenteCombo
+    extra = 1
+    fields = ('id_producto', 'cantidad')
+
+@admin.register(Promocion)
+class PromocionAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_promocion', 'nombre', 'tipo', 'activa', 'fecha_inicio', 'fecha_fin')
+    search_fields = ('nombre', 'id_producto__nombre', 'id_cliente__nombre')
+    list_filter = ('tipo', 'activa')
+    ordering = ('nombre',)
+    list_select_related = ('id_producto', 'id_cliente')
+    
+    permiso_modulo = 'gestionar_promociones'
+    
+    fieldsets = (
+        ('Información de la Promoción', {
+            'fields': ('nombre', 'tipo', 'activa', 'fecha_inicio', 'fecha_fin')
+        }),
+        ('Regla', {
+            'fields': ('id_producto', 'lleva', 'paga', 'id_cliente', 'precio')
+        }),
+    )
+    
+    inlines = [ComponenteComboInline]
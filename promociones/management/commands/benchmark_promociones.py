@@ -0,0 +1,75 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from promociones.motor import Combo, ReglasCompiladas, _reparto_combo, compilar, cotizar
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de cotizar carros aleatorios con las promociones compiladas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carros', type=int, default=5000, help='Cantidad de carros a cotizar')
+        parser.add_argument('--lineas', type=int, default=50, help='Líneas por carro')
+        parser.add_argument('--sinteticas', type=int, default=0,
+                            help='Usar N productos con reglas sintéticas en memoria en vez de la base de datos')
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def _reglas_sinteticas(self, productos, rnd):
+        precios = {p: rnd.randrange(100, 20000, 10) for p in range(1, productos + 1)}
+        ids = list(precios)
+        nxm = {p: (3, 2, 1) for p in rnd.sample(ids, max(1, productos // 10))}
+        precios_cliente = {
+            cliente: {p: (precios[p] * 9 // 10, 2) for p in rnd.sample(ids, max(1, productos // 20))}
+            for cliente in range(1, 51)
+        }
+        combos = []
+        for indice in range(max(1, productos // 25)):
+            componentes = tuple((p, rnd.randint(1, 2)) for p in rnd.sample(ids, 3))
+            normal = sum(precios[p] * n for p, n in componentes)
+            precio = normal * 8 // 10
+            combos.append(Combo(1000 + indice, componentes, precio, _reparto_combo(componentes, precio, precios)))
+        return ReglasCompiladas(precios, nxm, precios_cliente, combos)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['semilla'])
+
+        inicio = time.perf_counter()
+        if options['sinteticas']:
+            reglas = self._reglas_sinteticas(options['sinteticas'], rnd)
+            origen = f'{options["sinteticas"]} productos sintéticos'
+        else:
+            reglas = compilar()
+            origen = f'{len(reglas.precios)} productos de la base de datos'
+        compilacion = (time.perf_counter() - inicio) * 1000
+
+        productos = list(reglas.precios)
+        if not productos:
+            raise CommandError('No hay productos; usa --sinteticas N para generar reglas en memoria')
+        clientes = list(reglas.precios_cliente) or [None]
+
+        carros = [
+            (
+                [(rnd.choice(productos), rnd.randint(1, 6)) for _ in range(options['lineas'])],
+                rnd.choice(clientes + [None]),
+            )
+            for _ in range(options['carros'])
+        ]
+
+        tiempos = []
+        for lineas, cliente in carros:
+            t0 = time.perf_counter()
+            cotizar(lineas, cliente, reglas=reglas)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+
+        tiempos.sort()
+        p99 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))]
+        self.stdout.write(f'Reglas: {origen}, {len(reglas.nxm)} N x M, {len(reglas.combos)} combos, '
+                          f'{sum(len(v) for v in reglas.precios_cliente.values())} precios por cliente')
+        self.stdout.write(f'Compilación: {compilacion:.1f} ms')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(tiempos)} carros de {options["lineas"]} líneas: '
+            f'media {statistics.mean(tiempos):.3f} ms, p50 {statistics.median(tiempos):.3f} ms, '
+            f'p99 {p99:.3f} ms, máx {tiempos[-1]:.3f} ms'
+        ))
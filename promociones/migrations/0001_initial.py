@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Promocion',
+            fields=[
+                ('id_promocion', models.AutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=150, verbose_name='Nombre')),
+                ('tipo', models.CharField(choices=[('nxm', 'Lleva N paga M'), ('combo', 'Combo'), ('precio_cliente', 'Precio por cliente')], max_length=20, verbose_name='Tipo')),
+                ('activa', models.BooleanField(default=True, verbose_name='Activa')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Vigente desde')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Vigente hasta')),
+                ('lleva', models.PositiveIntegerField(blank=True, null=True, verbose_name='Lleva (N)')),
+                ('paga', models.PositiveIntegerField(blank=True, null=True, verbose_name='Paga (M)')),
+                ('precio', models.IntegerField(blank=True, null=True, verbose_name='Precio')),
+                ('id_cliente', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='dashboard.cliente', verbose_name='Cliente')),
+                ('id_producto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Promoción',
+                'verbose_name_plural': 'Promociones',
+                'db_table': 'promocion',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ComponenteCombo',
+            fields=[
+                ('id_componente', models.AutoField(primary_key=True, serialize=False)),
+                ('cantidad', models.PositiveIntegerField(default=1, verbose_name='Cantidad')),
+                ('id_producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='productos.producto', verbose_name='Producto')),
+                ('id_promocion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='componentes', to='promociones.promocion', verbose_name='Combo')),
+            ],
+            options={
+                'verbose_name': 'Componente de Combo',
+                'verbose_name_plural': 'Componentes de Combo',
+                'db_table': 'componente_combo',
+                'unique_together': {('id_promocion', 'id_producto')},
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import models
+from productos.models import Producto
+from dashboard.models import Cliente
+
+class Promocion(models.Model):
+    TIPOS = [
+        ('nxm', 'Lleva N paga M'),
+        ('combo', 'Combo'),
+        ('precio_cliente', 'Precio por cliente'),
+    ]
+    
+    id_promocion = models.AutoField(primary_key=True)
+    nombre = models.CharField(max_length=150, verbose_name="Nombre")
+    tipo = models.CharField(max_length=20, choices=TIPOS, verbose_name="Tipo")
+    activa = models.BooleanField(default=True, verbose_name="Activa")
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Vigente desde")
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name="Vigente hasta")
+    
+    # Lleva N paga M y precio por cliente
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Producto")
+    lleva = models.PositiveIntegerField(null=True, blank=True, verbose_name="Lleva (N)")
+    paga = models.PositiveIntegerField(null=True, blank=True, verbose_name="Paga (M)")
+    
+    # Precio por cliente y precio del combo
+    id_cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Cliente")
+    precio = models.IntegerField(null=True, blank=True, verbose_name="Precio")
+    
+    class Meta:
+        verbose_name = "Promoción"
+        verbose_name_plural = "Promociones"
+        db_table = "promocion"
+        ordering = ['nombre']
+    
+    def __str__(self):
+        return f"{self.nombre} ({self.get_tipo_display()})"
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        if self.tipo == 'nxm':
+            if not self.id_producto_id or not self.lleva or self.paga is None:
+                raise ValidationError("Las promociones N x M requieren producto, N y M.")
+            if self.paga >= self.lleva:
+                raise ValidationError("M debe ser menor que N.")
+        elif self.tipo == 'precio_cliente':
+            if not self.id_producto_id or not self.id_cliente_id or self.precio is None:
+                raise ValidationError("El precio por cliente requiere producto, cliente y precio.")
+        elif self.tipo == 'combo':
+            if self.precio is None:
+                raise ValidationError("El combo requiere un precio.")
+        if self.precio is not None and self.precio < 0:
+            raise ValidationError("El precio no puede ser negativo.")
+        if self.fecha_inicio and self.fecha_fin and self.fecha_fin <= self.fecha_inicio:
+            raise ValidationError("La fecha de término debe ser posterior a la de inicio.")
+
+
+class ComponenteCombo(models.Model):
+    id_componente = models.AutoField(primary_key=True)
+    id_promocion = models.ForeignKey(Promocion, on_delete=models.CASCADE, related_name='componentes', verbose_name="Combo")
+    id_producto = models.ForeignKey(Producto, on_delete=models.CASCADE, verbose_name="Producto")
+    cantidad = models.PositiveIntegerField(default=1, verbose_name="Cantidad")
+    
+    class Meta:
+        verbose_name = "Componente de Combo"
+        verbose_name_plural = "Componentes de Combo"
+        db_table = "componente_combo"
+        unique_together = ['id_promocion', 'id_producto']
+    
+    def __str__(self):
+        return f"{self.cantidad} x {self.id_producto.nombre}"
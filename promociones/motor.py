@@ -0,0 +1,231 @@
+"""
+Motor de precios y promociones para el cobro.
+
+Las promociones activas se compilan en diccionarios por producto (y por
+cliente) una sola vez, cuando cambian las reglas o los precios base; cotizar
+un carro solo hace búsquedas en esos diccionarios. Un cambio en otro proceso
+se detecta por un número de versión guardado en el cache de Django.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Min, Q
+from django.utils import timezone
+from productos.models import Producto
+from .models import Promocion
+
+CLAVE_VERSION = 'promociones:version'
+
+# Cada cuánto se consulta la versión compartida en el cache (segundos)
+REVISION_VERSION = 1.0
+
+LineaPrecio = namedtuple('LineaPrecio', ['id_producto', 'cantidad', 'precio_unitario', 'id_promocion'])
+
+Combo = namedtuple('Combo', ['id_promocion', 'componentes', 'precio', 'reparto'])
+
+
+class ReglasCompiladas:
+    """Estructuras de búsqueda generadas a partir de las promociones vigentes"""
+
+    def __init__(self, precios, nxm=None, precios_cliente=None, combos=None, vigente_hasta=None):
+        # {id_producto: precio_referencia}
+        self.precios = precios
+        # {id_producto: (lleva, paga, id_promocion)}
+        self.nxm = nxm or {}
+        # {id_cliente: {id_producto: (precio, id_promocion)}}
+        self.precios_cliente = precios_cliente or {}
+        self.combos = combos or []
+        # {id_producto: [índices de combos que lo incluyen]}
+        self.combos_por_producto = {}
+        for indice, combo in enumerate(self.combos):
+            for id_producto, _ in combo.componentes:
+                self.combos_por_producto.setdefault(id_producto, []).append(indice)
+        self.vigente_hasta = vigente_hasta
+
+
+def _reparto_combo(componentes, precio, precios):
+    """Reparte el precio del combo entre sus componentes según su precio base"""
+    pesos = [precios.get(id_producto, 0) * cantidad for id_producto, cantidad in componentes]
+    if not any(pesos):
+        pesos = [1] * len(componentes)
+    suma = sum(pesos)
+    reparto = []
+    for peso in pesos[:-1]:
+        reparto.append(precio * peso // suma)
+    # El último componente absorbe el redondeo
+    reparto.append(precio - sum(reparto))
+    return tuple(reparto)
+
+
+def compilar(ahora=None):
+    """Lee las promociones vigentes y construye las estructuras de búsqueda"""
+    ahora = ahora or timezone.now()
+    precios = dict(Producto.objects.values_list('id_producto', 'precio_referencia'))
+
+    vigentes = Promocion.objects.filter(activa=True).filter(
+        Q(fecha_inicio__isnull=True) | Q(fecha_inicio__lte=ahora),
+        Q(fecha_fin__isnull=True) | Q(fecha_fin__gt=ahora),
+    ).prefetch_related('componentes')
+
+    nxm = {}
+    precios_cliente = {}
+    combos = []
+    vigente_hasta = None
+
+    for promocion in vigentes:
+        if promocion.fecha_fin and (vigente_hasta is None or promocion.fecha_fin < vigente_hasta):
+            vigente_hasta = promocion.fecha_fin
+
+        if promocion.tipo == 'nxm':
+            actual = nxm.get(promocion.id_producto_id)
+            # Con varias promociones sobre el mismo producto gana la de mayor descuento
+            if actual is None or promocion.paga / promocion.lleva < actual[1] / actual[0]:
+                nxm[promocion.id_producto_id] = (promocion.lleva, promocion.paga, promocion.id_promocion)
+        elif promocion.tipo == 'precio_cliente':
+            por_cliente = precios_cliente.setdefault(promocion.id_cliente_id, {})
+            actual = por_cliente.get(promocion.id_producto_id)
+            if actual is None or promocion.precio < actual[0]:
+                por_cliente[promocion.id_producto_id] = (promocion.precio, promocion.id_promocion)
+        elif promocion.tipo == 'combo':
+            componentes = tuple((c.id_producto_id, c.cantidad) for c in promocion.componentes.all() if c.cantidad)
+            if componentes:
+                combos.append(Combo(
+                    promocion.id_promocion,
+                    componentes,
+                    promocion.precio,
+                    _reparto_combo(componentes, promocion.precio, precios),
+                ))
+
+    # La próxima promoción que empieza también obliga a recompilar
+    proxima = Promocion.objects.filter(activa=True, fecha_inicio__gt=ahora).aggregate(inicio=Min('fecha_inicio'))['inicio']
+    if proxima and (vigente_hasta is None or proxima < vigente_hasta):
+        vigente_hasta = proxima
+
+    return ReglasCompiladas(precios, nxm, precios_cliente, combos, vigente_hasta)
+
+
+_lock = threading.Lock()
+_reglas = None
+_version = None
+_expira = 0.0
+_proxima_revision = 0.0
+
+
+def invalidar():
+    """Descarta las reglas compiladas en este proceso y avisa a los demás"""
+    global _reglas
+    _reglas = None
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, 1, timeout=None)
+
+
+def obtener_reglas():
+    """Reglas compiladas vigentes, recompilando solo si algo cambió"""
+    global _reglas, _version, _expira, _proxima_revision
+    reglas = _reglas
+    ahora = time.monotonic()
+
+    if reglas is not None and ahora < _expira:
+        if ahora < _proxima_revision:
+            return reglas
+        _proxima_revision = ahora + REVISION_VERSION
+        if cache.get(CLAVE_VERSION) == _version:
+            return reglas
+
+    with _lock:
+        if _reglas is not None and _reglas is not reglas:
+            return _reglas
+        version = cache.get(CLAVE_VERSION)
+        reglas = compilar()
+        ahora = time.monotonic()
+        _expira = float('inf')
+        if reglas.vigente_hasta is not None:
+            _expira = ahora + max((reglas.vigente_hasta - timezone.now()).total_seconds(), 0)
+        _version = version
+        _proxima_revision = ahora + REVISION_VERSION
+        _reglas = reglas
+    return reglas
+
+
+def _repartir(id_producto, unidades, importe, id_promocion, salida):
+    """Agrega 1 o 2 líneas con precio unitario entero que suman exactamente el importe"""
+    base, resto = divmod(importe, unidades)
+    if resto:
+        salida.append(LineaPrecio(id_producto, resto, base + 1, id_promocion))
+    if unidades > resto:
+        salida.append(LineaPrecio(id_producto, unidades - resto, base, id_promocion))
+
+
+def cotizar(lineas, id_cliente=None, reglas=None):
+    """
+    Calcula el precio de un carro. lineas es un iterable de (id_producto,
+    cantidad); devuelve una lista de LineaPrecio cuyo total es el del carro
+    """
+    reglas = reglas or obtener_reglas()
+    cantidades = {}
+    for id_producto, cantidad in lineas:
+        if id_producto not in reglas.precios:
+            raise ValueError(f'El producto {id_producto} no existe')
+        cantidades[id_producto] = cantidades.get(id_producto, 0) + cantidad
+
+    especiales = reglas.precios_cliente.get(id_cliente, {}) if id_cliente is not None else {}
+    salida = []
+
+    # Combos: se aplican primero los de mayor ahorro mientras alcancen las unidades
+    if reglas.combos_por_producto:
+        candidatos = set()
+        for id_producto in cantidades:
+            candidatos.update(reglas.combos_por_producto.get(id_producto, ()))
+        aplicables = []
+        for indice in candidatos:
+            combo = reglas.combos[indice]
+            if all(cantidades.get(p, 0) >= n for p, n in combo.componentes):
+                normal = sum(
+                    especiales[p][0] * n if p in especiales else reglas.precios[p] * n
+                    for p, n in combo.componentes
+                )
+                if normal > combo.precio:
+                    aplicables.append((normal - combo.precio, combo))
+        aplicables.sort(key=lambda item: item[0], reverse=True)
+        for _, combo in aplicables:
+            veces = min(cantidades.get(p, 0) // n for p, n in combo.componentes)
+            if not veces:
+                continue
+            for (id_producto, n), parte in zip(combo.componentes, combo.reparto):
+                cantidades[id_producto] -= veces * n
+                _repartir(id_producto, veces * n, veces * parte, combo.id_promocion, salida)
+
+    # Precio unitario (especial del cliente o de referencia) y N x M
+    for id_producto, cantidad in cantidades.items():
+        if cantidad <= 0:
+            continue
+        if id_producto in especiales:
+            precio, id_promocion = especiales[id_producto]
+        else:
+            precio, id_promocion = reglas.precios[id_producto], None
+
+        regla = reglas.nxm.get(id_producto)
+        if regla is not None and cantidad >= regla[0]:
+            lleva, paga, id_nxm = regla
+            grupos, cantidad = divmod(cantidad, lleva)
+            _repartir(id_producto, grupos * lleva, grupos * paga * precio, id_nxm, salida)
+            if not cantidad:
+                continue
+
+        salida.append(LineaPrecio(id_producto, cantidad, precio, id_promocion))
+
+    return salida
+
+
+def detalles_para_venta(lineas, id_cliente=None):
+    """Convierte un carro en DetalleVenta sin guardar, listos para crear_lote"""
+    from detalle_ventas.models import DetalleVenta
+
+    return [
+        DetalleVenta(id_producto_id=linea.id_producto, cantidad=linea.cantidad, precio_unitario=linea.precio_unitario)
+        for linea in cotizar(lineas, id_cliente)
+    ]
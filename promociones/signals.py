@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from productos.models import Producto
+from .models import ComponenteCombo, Promocion
+from . import motor
+
+
+@receiver([post_save, post_delete], sender=Promocion)
+@receiver([post_save, post_delete], sender=ComponenteCombo)
+@receiver([post_save, post_delete], sender=Producto)
+def invalidar_reglas(sender, **kwargs):
+    """Cualquier cambio en promociones o precios base obliga a recompilar"""
+    motor.invalidar()
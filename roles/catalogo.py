@@ -0,0 +1,59 @@
+"""
+Catálogo de roles en memoria del proceso.
+
+La tabla rol tiene unas pocas filas y casi nunca cambia, así que se carga
+completa una vez y se sirve desde un diccionario. Un cambio en otro proceso
+se detecta por un número de versión guardado en el cache de Django.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from .models import Rol
+
+CLAVE_VERSION = 'roles:version'
+
+# Cada cuánto se consulta la versión compartida en el cache (segundos)
+REVISION_VERSION = 5.0
+
+_lock = threading.Lock()
+_roles = None
+_version = None
+_proxima_revision = 0.0
+
+
+def invalidar():
+    """Descarta los roles cargados en este proceso y avisa a los demás"""
+    global _roles
+    _roles = None
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, 1, timeout=None)
+
+
+def roles():
+    """Diccionario {id_rol: Rol} con todos los roles"""
+    global _roles, _version, _proxima_revision
+    actuales = _roles
+    ahora = time.monotonic()
+
+    if actuales is not None:
+        if ahora < _proxima_revision:
+            return actuales
+        _proxima_revision = ahora + REVISION_VERSION
+        if cache.get(CLAVE_VERSION) == _version:
+            return actuales
+
+    with _lock:
+        if _roles is not None and _roles is not actuales:
+            return _roles
+        _version = cache.get(CLAVE_VERSION)
+        _roles = Rol.objects.in_bulk()
+        _proxima_revision = time.monotonic() + REVISION_VERSION
+    return _roles
+
+
+def obtener(id_rol):
+    """Rol con ese id, o None si no existe"""
+    return roles().get(id_rol)
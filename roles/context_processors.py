@@ -0,0 +1,6 @@
+from .permisos import PermisosUsuario
+
+
+def permisos(request):
+    """Expone los permisos del usuario a las plantillas como `permisos`"""
+    return {'permisos': PermisosUsuario(request.user)}
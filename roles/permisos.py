@@ -0,0 +1,185 @@
+"""
+Política de permisos por rol.
+
+La tabla POLITICA declara qué roles tienen cada permiso y RUTAS qué permiso
+exige cada prefijo de URL. Ambas se compilan al importar el módulo: cada
+permiso pasa a ser un bit, cada rol una máscara con sus bits y las rutas un
+árbol por segmentos. Revisar un permiso es una búsqueda en diccionario y un
+AND de bits, sin comparar nombres de rol en cada vista.
+"""
+from functools import wraps
+
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+ADMINISTRADOR = 'Administrador'
+BODEGUERO = 'Bodeguero'
+VENDEDOR = 'Vendedor'
+
+# permiso -> roles que lo tienen (el superusuario los tiene todos)
+POLITICA = {
+    # Panel
+    'ver_resumen': [ADMINISTRADOR],
+    'ver_ventas': [ADMINISTRADOR],
+    'gestionar_usuarios': [ADMINISTRADOR],
+    'gestionar_proveedores': [ADMINISTRADOR],
+    'gestionar_promociones': [ADMINISTRADOR],
+    'editar_productos': [ADMINISTRADOR, BODEGUERO],
+    'eliminar_productos': [ADMINISTRADOR],
+    'exportar_productos': [ADMINISTRADOR],
+    # Inventario
+    'mover_stock': [ADMINISTRADOR, BODEGUERO],
+    'editar_inventario': [ADMINISTRADOR],
+    'ver_inventario_sin_stock': [ADMINISTRADOR, BODEGUERO],
+    'ver_valorizacion': [ADMINISTRADOR],
+    'auditar_inventario': [ADMINISTRADOR],
+    # Ventas
+    'vender': [ADMINISTRADOR, VENDEDOR],
+    # Sitio de administración
+    'admin_sitio': [ADMINISTRADOR, BODEGUERO, VENDEDOR],
+    'admin_completo': [ADMINISTRADOR],
+}
+
+# Prefijo de URL -> permiso exigido; None deja la ruta libre. Gana el prefijo
+# más largo. Un prefijo terminado en '$' aplica solo a la ruta exacta.
+RUTAS = {
+    '/admin/': 'admin_completo',
+    '/admin/$': 'admin_sitio',
+    '/admin/login/': None,
+    '/admin/logout/': None,
+    '/admin/jsi18n/': 'admin_sitio',
+    '/admin/productos/': 'admin_sitio',
+    '/admin/inventarios/': 'admin_sitio',
+    '/admin/kits/': 'mover_stock',
+}
+
+_SIN_REGLA = object()
+
+
+def _compilar(politica):
+    bits = {permiso: 1 << indice for indice, permiso in enumerate(politica)}
+    mascaras = {}
+    for permiso, roles in politica.items():
+        for rol in roles:
+            mascaras[rol] = mascaras.get(rol, 0) | bits[permiso]
+    return bits, mascaras, (1 << len(politica)) - 1
+
+
+def _compilar_rutas(rutas):
+    """Árbol {segmento: nodo}; cada nodo guarda la regla de su subárbol y la de la ruta exacta"""
+    raiz = {'hijos': {}, 'regla': _SIN_REGLA, 'exacta': _SIN_REGLA}
+    for prefijo, permiso in rutas.items():
+        exacta = prefijo.endswith('$')
+        nodo = raiz
+        for segmento in filter(None, prefijo.rstrip('$').split('/')):
+            nodo = nodo['hijos'].setdefault(segmento, {'hijos': {}, 'regla': _SIN_REGLA, 'exacta': _SIN_REGLA})
+        nodo['exacta' if exacta else 'regla'] = None if permiso is None else PERMISOS[permiso]
+    return raiz
+
+
+PERMISOS, MASCARAS, TODOS = _compilar(POLITICA)
+ARBOL_RUTAS = _compilar_rutas(RUTAS)
+
+
+def mascara(user):
+    """Bits de permiso del usuario; se calculan una vez por objeto de usuario"""
+    if not user.is_authenticated:
+        return 0
+    try:
+        return user._mascara_permisos
+    except AttributeError:
+        user._mascara_permisos = TODOS if user.is_superuser else MASCARAS.get(user.nombre_rol, 0)
+        return user._mascara_permisos
+
+
+def tiene_permiso(user, permiso):
+    return bool(mascara(user) & PERMISOS[permiso])
+
+
+def permiso_para_ruta(ruta):
+    """
+    Bit exigido por la ruta según el prefijo más largo de RUTAS, None si es
+    libre o no tiene regla
+    """
+    segmentos = [segmento for segmento in ruta.split('/') if segmento]
+    nodo = ARBOL_RUTAS
+    regla = nodo['regla']
+    for segmento in segmentos:
+        nodo = nodo['hijos'].get(segmento)
+        if nodo is None:
+            break
+        if nodo['regla'] is not _SIN_REGLA:
+            regla = nodo['regla']
+    else:
+        if nodo['exacta'] is not _SIN_REGLA:
+            regla = nodo['exacta']
+    return None if regla is _SIN_REGLA else regla
+
+
+def requiere_permiso(permiso, mensaje='No tienes permisos', json=False, redirigir=None):
+    """
+    Decorador de vistas. Sin el permiso responde 403 en JSON (json=True),
+    redirige con un mensaje de error (redirigir='app:vista') o lanza
+    PermissionDenied
+    """
+    bit = PERMISOS[permiso]
+
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if mascara(request.user) & bit:
+                return vista(request, *args, **kwargs)
+            if json:
+                return JsonResponse({'success': False, 'message': mensaje}, status=403)
+            if redirigir:
+                messages.error(request, mensaje)
+                return redirect(redirigir)
+            raise PermissionDenied(mensaje)
+        return envoltura
+    return decorador
+
+
+class PermisosUsuario:
+    """Acceso de solo lectura a los permisos para las plantillas: {% if permisos.ver_resumen %}"""
+
+    def __init__(self, user):
+        self._user = user
+
+    def __getitem__(self, permiso):
+        return bool(mascara(self._user) & PERMISOS[permiso])
+
+    def __contains__(self, permiso):
+        return permiso in PERMISOS and self[permiso]
+
+
+class PoliticaAdminMixin:
+    """
+    Permisos de un ModelAdmin tomados de la política. Los atributos en None
+    dejan el comportamiento por defecto de Django
+    """
+    permiso_modulo = None
+    permiso_agregar = None
+    permiso_cambiar = None
+    permiso_eliminar = None
+
+    def has_module_permission(self, request):
+        if self.permiso_modulo is None:
+            return super().has_module_permission(request)
+        return tiene_permiso(request.user, self.permiso_modulo)
+
+    def has_add_permission(self, request, *args):
+        if self.permiso_agregar is None:
+            return super().has_add_permission(request, *args)
+        return tiene_permiso(request.user, self.permiso_agregar)
+
+    def has_change_permission(self, request, obj=None):
+        if self.permiso_cambiar is None:
+            return super().has_change_permission(request, obj)
+        return tiene_permiso(request.user, self.permiso_cambiar)
+
+    def has_delete_permission(self, request, obj=None):
+        if self.permiso_eliminar is None:
+            return super().has_delete_permission(request, obj)
+        return tiene_permiso(request.user, self.permiso_eliminar)
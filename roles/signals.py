@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Rol
+from . import catalogo
+
+
+@receiver([post_save, post_delete], sender=Rol)
+def invalidar_catalogo(sender, **kwargs):
+    """Un rol creado, renombrado o eliminado obliga a recargar el catálogo"""
+    catalogo.invalidar()
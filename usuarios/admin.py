@@ -2,7 +2,12 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import UserChangeForm, UserCreationForm
 from django import forms
-from .models import Usuario
+from .forms import AdminLoginForm
+from .models import ImportacionUsuarios, Usuario
+from roles.permisos import PoliticaAdminMixin
+
+# El login del admin también respeta el límite de intentos
+admin.site.login_form = AdminLoginForm
 
 class CustomUserChangeForm(UserChangeForm):
     class Meta(UserChangeForm.Meta):
@@ -15,7 +20,7 @@ class CustomUserCreationForm(UserCreationForm):
         fields = ('username', 'correo', 'nombre')
 
 @admin.register(Usuario)
-class UsuarioAdmin(UserAdmin):
+class UsuarioAdmin(PoliticaAdminMixin, UserAdmin):
     list_display = ('id_usuario', 'nombre', 'correo', 'id_rol', 'is_active', 'is_staff')
     search_fields = ('nombre', 'correo', 'username')
     list_filter = ('id_rol', 'is_active', 'is_staff', 'is_superuser')
@@ -26,13 +31,7 @@ class UsuarioAdmin(UserAdmin):
     form = CustomUserChangeForm
     add_form = CustomUserCreationForm
     
-    def has_module_permission(self, request):
-        """Controlar acceso al módulo de usuarios"""
-        if hasattr(request.user, 'id_rol'):
-            user_role = request.user.id_rol.nombre
-            # Solo administradores pueden ver usuarios
-            return user_role == 'Administrador'
-        return request.user.is_superuser
+    permiso_modulo = 'gestionar_usuarios'
     
     fieldsets = (
         ('Información Personal', {
@@ -58,3 +57,23 @@ class UsuarioAdmin(UserAdmin):
             'fields': ('nombre', 'correo', 'username', 'password1', 'password2', 'id_rol'),
         }),
     )
+
+
+@admin.register(ImportacionUsuarios)
+class ImportacionUsuariosAdmin(PoliticaAdminMixin, admin.ModelAdmin):
+    list_display = ('id_importacion', 'archivo', 'id_usuario', 'estado', 'creados', 'fecha_carga', 'fecha_proceso')
+    search_fields = ('archivo', 'id_usuario__correo')
+    list_filter = ('estado',)
+    ordering = ('-fecha_carga',)
+    list_select_related = ('id_usuario',)
+    # La planilla trae datos personales; se guarda solo hasta procesarla
+    exclude = ('contenido',)
+    readonly_fields = ('archivo', 'id_usuario', 'activo', 'url_login', 'estado', 'creados', 'errores', 'fecha_carga', 'fecha_proceso')
+    
+    permiso_modulo = 'gestionar_usuarios'
+    permiso_cambiar = 'gestionar_usuarios'
+    permiso_eliminar = 'gestionar_usuarios'
+    
+    def has_add_permission(self, request):
+        """Las planillas se cargan desde el panel"""
+        return False
@@ -0,0 +1,253 @@
+"""
+Alta masiva de usuarios desde una planilla.
+
+La planilla (CSV o XLSX con columnas correo, nombre, rol y opcionalmente
+telefono) se valida completa antes de crear nada: cada fila pasa por las
+mismas validaciones del modelo y los correos se comparan con los existentes
+con una consulta IN por tramo. Si alguna fila es inválida no se crea ningún
+usuario.
+
+Cada hash de contraseña temporal cuesta decenas de milisegundos de CPU; el
+comando alta_usuarios los reparte entre núcleos con un pool de procesos. La
+carga desde el panel no hashea en la petición: guarda la planilla como una
+ImportacionUsuarios pendiente que procesa alta_usuarios --pendientes, y el
+resultado le llega por correo a quien la cargó. Los
+usuarios se insertan con bulk_create y los correos con sus credenciales
+quedan en la bandeja de salida en la misma transacción, marcados como
+confidenciales para que su cuerpo se borre al enviarse.
+"""
+import io
+import os
+import secrets
+import string
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.template.loader import render_to_string
+from inventarios.conteos import MAX_ERRORES, _normalizar, leer_planilla
+from notificaciones.correo import encolar, encolar_lote
+from roles import catalogo
+from .models import ImportacionUsuarios, Usuario
+
+COLUMNAS = ['correo', 'nombre', 'rol']
+OPCIONALES = ['telefono']
+
+TAMANO_TRAMO = 1000
+
+# Con menos contraseñas no compensa levantar procesos
+MIN_PARA_PROCESOS = 16
+
+ALFABETO_TEMPORAL = string.ascii_letters + string.digits + "!@#$%&*"
+
+
+def contrasena_temporal(largo=12):
+    """Contraseña aleatoria con letras, números y símbolos"""
+    return ''.join(secrets.choice(ALFABETO_TEMPORAL) for _ in range(largo))
+
+
+def _iniciar_proceso():
+    # Con 'spawn' (Windows, macOS) el proceso hijo parte sin Django configurado
+    import django
+    django.setup()
+
+
+def _hashear(contrasenas):
+    return [make_password(contrasena) for contrasena in contrasenas]
+
+
+def hashear(contrasenas, procesos=None):
+    """Hashes de las contraseñas, en el mismo orden, repartidos entre `procesos`"""
+    procesos = procesos or os.cpu_count() or 1
+    if procesos < 2 or len(contrasenas) < MIN_PARA_PROCESOS:
+        return _hashear(contrasenas)
+    tamano = -(-len(contrasenas) // procesos)
+    trozos = [contrasenas[i:i + tamano] for i in range(0, len(contrasenas), tamano)]
+    with ProcessPoolExecutor(max_workers=len(trozos), initializer=_iniciar_proceso) as pool:
+        return [hash_ for trozo in pool.map(_hashear, trozos) for hash_ in trozo]
+
+
+def _resolver_roles():
+    """Clave de planilla -> Rol, aceptando el id o el nombre del rol"""
+    roles = {}
+    for rol in catalogo.roles().values():
+        roles[str(rol.id_rol)] = rol
+        roles[_normalizar(rol.nombre)] = rol
+    return roles
+
+
+def _validar_tramo(tramo, roles, vistos, errores):
+    """Usuarios válidos del tramo; los errores se agregan a `errores`"""
+    candidatos = []
+    for numero, correo, nombre, rol, telefono in tramo:
+        # En minúsculas para comparar y guardar igual en cualquier motor de base de datos
+        correo = str(correo).strip().lower()
+        telefono = str(telefono).strip()
+        usuario = Usuario(
+            username=correo,
+            email=correo,
+            correo=correo,
+            nombre=str(nombre).strip(),
+            telefono=telefono or None,
+            id_rol=roles.get(_normalizar(rol)),
+            forzar_cambio_contrasena=True,
+        )
+        try:
+            validate_email(correo)
+            if usuario.id_rol_id is None:
+                raise ValidationError('El rol no existe')
+            if correo in vistos:
+                raise ValidationError('Correo repetido en la planilla')
+            usuario.clean()
+        except ValidationError as e:
+            errores.append((numero, ' '.join(e.messages)))
+            continue
+        vistos.add(correo)
+        candidatos.append((numero, usuario))
+
+    # Una consulta por tramo sobre los índices únicos; Usuario.save guarda ambos en minúsculas
+    correos = [usuario.correo for _, usuario in candidatos]
+    existentes = {
+        valor
+        for par in Usuario.objects.filter(
+            Q(correo__in=correos) | Q(username__in=correos)
+        ).values_list('correo', 'username')
+        for valor in par
+    }
+    validos = []
+    for numero, usuario in candidatos:
+        if usuario.correo in existentes:
+            errores.append((numero, 'Este correo electrónico ya está registrado'))
+        else:
+            validos.append(usuario)
+    return validos
+
+
+def provisionar(archivo, nombre, activo=True, url_login='', procesos=1, tamano_tramo=TAMANO_TRAMO):
+    """
+    Crea los usuarios de la planilla y encola un correo con la contraseña
+    temporal de cada uno (confidencial: su cuerpo se borra al enviarse).
+    Devuelve (creados, errores) con los primeros errores de fila; si hay
+    errores no se crea ninguno. Lanza ValidationError si faltan columnas.
+    Con procesos > 1 los hashes se calculan en un pool de procesos; con
+    None, uno por núcleo
+    """
+    roles = _resolver_roles()
+    filas = leer_planilla(archivo, nombre, COLUMNAS, OPCIONALES)
+    errores = []
+    vistos = set()
+    usuarios = []
+    while True:
+        tramo = list(islice(filas, tamano_tramo))
+        if not tramo:
+            break
+        usuarios.extend(_validar_tramo(tramo, roles, vistos, errores))
+
+    if errores:
+        errores.sort()
+        mensajes = [f'Fila {numero}: {mensaje}' for numero, mensaje in errores[:MAX_ERRORES]]
+        if len(errores) > MAX_ERRORES:
+            mensajes.append(f'... y {len(errores) - MAX_ERRORES} filas más con errores')
+        return 0, mensajes
+    if not usuarios:
+        return 0, []
+
+    contrasenas = [contrasena_temporal() for _ in usuarios]
+    for usuario, hash_ in zip(usuarios, hashear(contrasenas, procesos)):
+        usuario.password = hash_
+        usuario.is_active = activo
+
+    correos = [
+        (
+            'Tu cuenta en Dulcería Lilis',
+            [usuario.correo],
+            render_to_string('dashboard/credenciales_email.txt', {
+                'usuario': usuario,
+                'contrasena': contrasena,
+                'url_login': url_login,
+            }),
+            '',
+        )
+        for usuario, contrasena in zip(usuarios, contrasenas)
+    ]
+    try:
+        with transaction.atomic():
+            Usuario.objects.bulk_create(usuarios, batch_size=500)
+            encolar_lote(correos, confidencial=True)
+    except IntegrityError:
+        # Otro usuario con el mismo correo se creó mientras se procesaba la planilla
+        raise ValidationError('Algunos correos se registraron mientras se procesaba la planilla. Vuelve a cargarla.')
+    return len(usuarios), []
+
+
+def encolar_importacion(archivo, nombre, usuario, activo=True, url_login=''):
+    """
+    Guarda la planilla como importación pendiente para alta_usuarios
+    --pendientes y la devuelve. Solo revisa el encabezado: lanza
+    ValidationError si faltan columnas
+    """
+    contenido = archivo.read()
+    next(leer_planilla(io.BytesIO(contenido), nombre, COLUMNAS, OPCIONALES), None)
+    return ImportacionUsuarios.objects.create(
+        archivo=nombre[:255],
+        contenido=contenido,
+        id_usuario=usuario,
+        activo=activo,
+        url_login=url_login,
+    )
+
+
+def _reservar_importacion():
+    """Toma la importación pendiente más antigua; otro worker no la vuelve a tomar"""
+    with transaction.atomic():
+        importacion = ImportacionUsuarios.objects.select_for_update(skip_locked=True).filter(
+            estado='pendiente'
+        ).order_by('fecha_carga', 'id_importacion').select_related('id_usuario').first()
+        if importacion is not None:
+            importacion.estado = 'procesando'
+            importacion.save(update_fields=['estado'])
+    return importacion
+
+
+def procesar_pendiente(procesos=None):
+    """
+    Procesa la importación pendiente más antigua, le avisa el resultado por
+    correo a quien la cargó y la devuelve; None si no hay pendientes
+    """
+    importacion = _reservar_importacion()
+    if importacion is None:
+        return None
+    try:
+        creados, errores = provisionar(
+            io.BytesIO(bytes(importacion.contenido)),
+            importacion.archivo,
+            activo=importacion.activo,
+            url_login=importacion.url_login,
+            procesos=procesos,
+        )
+    except ValidationError as e:
+        creados, errores = 0, e.messages
+
+    importacion.estado = 'con_errores' if errores else 'completada'
+    importacion.creados = creados
+    importacion.errores = '\n'.join(errores)
+    importacion.contenido = b''
+    importacion.fecha_proceso = timezone.now()
+    if errores:
+        cuerpo = '\n'.join([
+            f'La planilla {importacion.archivo} tiene errores; no se creó ningún usuario.', '', *errores
+        ])
+    else:
+        cuerpo = (
+            f'Se crearon {creados} usuarios desde la planilla {importacion.archivo}. '
+            'Recibirán su contraseña temporal por correo.'
+        )
+    with transaction.atomic():
+        importacion.save(update_fields=['estado', 'creados', 'errores', 'contenido', 'fecha_proceso'])
+        encolar('Alta masiva de usuarios', importacion.id_usuario.correo, cuerpo)
+    return importacion
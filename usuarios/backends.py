@@ -0,0 +1,68 @@
+"""
+Backend de autenticación que carga el usuario junto con su rol.
+
+Los permisos se deciden por el rol de request.user en el middleware, en
+las vistas y en las plantillas; con ModelBackend cada acceso al rol del
+usuario de la sesión era una consulta más. Aquí el usuario se lee con un JOIN
+a rol, de modo que una petición hace una sola consulta de usuario. El nombre
+de usuario se busca en minúsculas, como lo guarda Usuario.save. Las
+variantes asíncronas calculan el hash fuera del event loop (ver hashers).
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from .hashers import ahacer_hash, averificar
+
+Usuario = get_user_model()
+
+
+class UsuarioBackend(ModelBackend):
+
+    def _usuarios(self):
+        return Usuario._default_manager.select_related('id_rol')
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(Usuario.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        # Usuario.save guarda el nombre de usuario en minúsculas
+        username = username.lower()
+        try:
+            usuario = self._usuarios().get(**{Usuario.USERNAME_FIELD: username})
+        except Usuario.DoesNotExist:
+            # Igualar el tiempo de respuesta con el de un usuario existente
+            Usuario().set_password(password)
+            return None
+        if usuario.check_password(password) and self.user_can_authenticate(usuario):
+            return usuario
+        return None
+
+    def get_user(self, user_id):
+        try:
+            usuario = self._usuarios().get(pk=user_id)
+        except Usuario.DoesNotExist:
+            return None
+        return usuario if self.user_can_authenticate(usuario) else None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(Usuario.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        # Usuario.save guarda el nombre de usuario en minúsculas
+        username = username.lower()
+        try:
+            usuario = await self._usuarios().aget(**{Usuario.USERNAME_FIELD: username})
+        except Usuario.DoesNotExist:
+            await ahacer_hash(password)
+            return None
+        if await averificar(usuario, password) and self.user_can_authenticate(usuario):
+            return usuario
+        return None
+
+    async def aget_user(self, user_id):
+        try:
+            usuario = await self._usuarios().aget(pk=user_id)
+        except Usuario.DoesNotExist:
+            return None
+        return usuario if self.user_can_authenticate(usuario) else None
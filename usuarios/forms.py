@@ -0,0 +1,16 @@
+from django.contrib.admin.forms import AdminAuthenticationForm
+from django.core.exceptions import ValidationError
+from . import limite_login
+
+
+class AdminLoginForm(AdminAuthenticationForm):
+    """Login del admin que respeta el límite de intentos antes de autenticar"""
+
+    def clean(self):
+        espera = limite_login.esperar(self.request, self.cleaned_data.get('username'))
+        if espera:
+            raise ValidationError(
+                f'Demasiados intentos fallidos. Intenta de nuevo en {espera} segundos.',
+                code='limite_intentos',
+            )
+        return super().clean()
@@ -0,0 +1,63 @@
+"""
+Hash de contraseñas con costo calibrado para el servidor.
+
+PBKDF2Calibrado toma las iteraciones de HASH_ITERACIONES, que se miden en cada
+servidor con el comando calibrar_hash. Como conserva el nombre de algoritmo
+pbkdf2_sha256, los hashes existentes siguen siendo válidos y al cambiar la
+configuración se recalculan en el siguiente login correcto.
+
+En modo asíncrono (ASGI) el cálculo se envía a un pool de hilos de tamaño
+HASH_HILOS: hashlib libera el GIL durante PBKDF2, así que el event loop sigue
+atendiendo otras peticiones mientras tanto. Con HASH_HILOS = 0 se calcula en
+el mismo hilo, como hace Django.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password, verify_password
+
+
+class PBKDF2Calibrado(PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return settings.HASH_ITERACIONES
+
+
+_lock = threading.Lock()
+_pool = None
+
+
+def _ejecutor():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=settings.HASH_HILOS, thread_name_prefix='hash')
+    return _pool
+
+
+async def _en_hilo(funcion, *args):
+    if not settings.HASH_HILOS:
+        return funcion(*args)
+    return await asyncio.get_running_loop().run_in_executor(_ejecutor(), partial(funcion, *args))
+
+
+async def ahacer_hash(password):
+    """make_password sin bloquear el event loop"""
+    return await _en_hilo(make_password, password)
+
+
+async def averificar(usuario, password):
+    """
+    Como Usuario.check_password, sin bloquear el event loop. Si el hash quedó
+    con otro costo se recalcula y se guarda solo la columna password
+    """
+    correcto, actualizar = await _en_hilo(verify_password, password, usuario.password)
+    if correcto and actualizar:
+        usuario.password = await ahacer_hash(password)
+        await type(usuario)._default_manager.filter(pk=usuario.pk).aupdate(password=usuario.password)
+    return correcto
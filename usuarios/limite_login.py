@@ -0,0 +1,90 @@
+"""
+Límite de intentos de login por IP y por nombre de usuario.
+
+Cada intento fallido suma en un contador del cache por intervalo de
+LOGIN_VENTANA_SEGUNDOS. El total de la ventana deslizante se estima con el
+contador del intervalo actual más la parte del anterior que aún cae dentro de
+la ventana, así basta leer cuatro claves (IP y usuario, intervalo actual y
+anterior) en un get_many antes de autenticar. Un intento rechazado no llega a
+calcular el hash de la contraseña. Con varios procesos de aplicación el
+cache configurado debe ser compartido (base de datos, Redis o Memcached).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PREFIJO = 'login'
+
+
+def _ip(request):
+    return request.META.get('REMOTE_ADDR') or 'desconocida'
+
+
+def _usuario(username):
+    # Los nombres pueden ser largos o tener caracteres no válidos para memcached
+    return hashlib.sha256((username or '').strip().lower().encode()).hexdigest()[:32]
+
+
+def _claves(request, username, intervalo):
+    claves = {}
+    for tipo, valor, limite in (
+        ('ip', _ip(request), settings.LOGIN_INTENTOS_IP),
+        ('usuario', _usuario(username), settings.LOGIN_INTENTOS_USUARIO),
+    ):
+        claves[(tipo, limite)] = (
+            f'{PREFIJO}:{tipo}:{valor}:{intervalo}',
+            f'{PREFIJO}:{tipo}:{valor}:{intervalo - 1}',
+        )
+    return claves
+
+
+def esperar(request, username, ahora=None):
+    """
+    Segundos que faltan para poder intentar de nuevo; 0 si el intento está
+    permitido
+    """
+    ventana = settings.LOGIN_VENTANA_SEGUNDOS
+    ahora = time.time() if ahora is None else ahora
+    intervalo, transcurrido = divmod(ahora, ventana)
+    intervalo = int(intervalo)
+    claves = _claves(request, username, intervalo)
+    contadores = cache.get_many([clave for par in claves.values() for clave in par])
+
+    espera = 0.0
+    for (_, limite), (actual, anterior) in claves.items():
+        actual = contadores.get(actual, 0)
+        anterior = contadores.get(anterior, 0)
+        if actual + anterior * (1 - transcurrido / ventana) < limite:
+            continue
+        if actual >= limite:
+            # Hay que esperar a que termine el intervalo y a que el actual pese menos
+            falta = ventana - transcurrido + ventana * (1 - limite / actual)
+        else:
+            # Esperar a que el peso del intervalo anterior baje lo suficiente
+            falta = ventana * (1 - (limite - actual) / anterior) - transcurrido
+        espera = max(espera, falta)
+    return int(espera) + 1 if espera > 0 else 0
+
+
+def registrar_fallo(request, username, ahora=None):
+    """Suma un intento fallido a los contadores de la IP y del usuario"""
+    ventana = settings.LOGIN_VENTANA_SEGUNDOS
+    ahora = time.time() if ahora is None else ahora
+    for actual, _ in _claves(request, username, int(ahora // ventana)).values():
+        try:
+            cache.incr(actual)
+        except ValueError:
+            # Dura dos intervalos: el actual y el siguiente, donde es el anterior
+            if not cache.add(actual, 1, timeout=ventana * 2):
+                cache.incr(actual)
+
+
+def limpiar(request, username, ahora=None):
+    """Olvida los fallos del usuario tras un login correcto (los de la IP se mantienen)"""
+    ventana = settings.LOGIN_VENTANA_SEGUNDOS
+    ahora = time.time() if ahora is None else ahora
+    for (tipo, _), par in _claves(request, username, int(ahora // ventana)).items():
+        if tipo == 'usuario':
+            cache.delete_many(par)
@@ -0,0 +1,79 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+from usuarios.alta_masiva import procesar_pendiente, provisionar
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea usuarios en lote desde una planilla CSV o XLSX (columnas correo, nombre, rol y '
+        'opcionalmente telefono) y encola un correo con la contraseña temporal de cada uno. '
+        'Con --pendientes procesa las planillas cargadas desde el panel; ejecutarlo con cron '
+        'cada minuto o dejarlo corriendo con --continuo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('planilla', nargs='?', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument('--procesos', type=int, default=os.cpu_count(), help='Procesos para calcular los hashes')
+        parser.add_argument('--inactivos', action='store_true', help='Crear los usuarios desactivados')
+        parser.add_argument('--url-login', default='', help='Enlace de inicio de sesión incluido en el correo')
+        parser.add_argument('--pendientes', action='store_true', help='Procesar las planillas cargadas desde el panel')
+        parser.add_argument('--continuo', action='store_true', help='Con --pendientes, seguir revisando hasta interrumpirlo')
+        parser.add_argument('--pausa', type=float, default=5, help='Segundos de espera cuando no hay planillas pendientes')
+
+    def handle(self, *args, **options):
+        if options['pendientes']:
+            return self.procesar_pendientes(options)
+        ruta = options['planilla']
+        if not ruta:
+            raise CommandError('Indica la planilla o usa --pendientes')
+        if not ruta.lower().endswith(('.csv', '.xlsx')):
+            raise CommandError('La planilla debe ser un archivo CSV o XLSX')
+
+        inicio = time.perf_counter()
+        try:
+            with open(ruta, 'rb') as archivo:
+                creados, errores = provisionar(
+                    archivo,
+                    ruta,
+                    activo=not options['inactivos'],
+                    url_login=options['url_login'],
+                    procesos=options['procesos'],
+                )
+        except OSError as e:
+            raise CommandError(f'No se pudo leer la planilla: {e}')
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        if errores:
+            for error in errores:
+                self.stderr.write(error)
+            raise CommandError('La planilla tiene errores; no se creó ningún usuario')
+        self.stdout.write(self.style.SUCCESS(
+            f'{creados} usuarios creados en {time.perf_counter() - inicio:.2f}s; '
+            'sus correos quedaron en la bandeja de salida'
+        ))
+
+    def procesar_pendientes(self, options):
+        procesadas = 0
+        try:
+            while True:
+                inicio = time.perf_counter()
+                importacion = procesar_pendiente(options['procesos'])
+                if importacion is not None:
+                    procesadas += 1
+                    self.stdout.write(
+                        f'{importacion}: {importacion.creados} usuarios creados '
+                        f'en {time.perf_counter() - inicio:.2f}s'
+                    )
+                    # Puede haber más pendientes; se sigue hasta vaciar la cola
+                    continue
+                if not options['continuo']:
+                    break
+                time.sleep(options['pausa'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Total: {procesadas} planillas procesadas'))
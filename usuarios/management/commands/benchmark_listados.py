@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from roles.models import Rol
+from usuarios.models import Usuario
+
+LISTADOS = ['/dashboard/productos/', '/dashboard/proveedores/', '/dashboard/usuarios/']
+
+MOTORES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia de las vistas de listado y las consultas a la tabla de sesiones con cada '
+        'motor de sesiones. "antes" reproduce la escritura de la sesión en cada petición que hacían '
+        'los listados al guardar per_page. Los datos de prueba se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por escenario')
+        parser.add_argument('--motores', nargs='+', default=['antes', *MOTORES], choices=['antes', *MOTORES])
+
+    def _medir(self, usuario, peticiones):
+        cliente = Client(SERVER_NAME='localhost')
+        cliente.force_login(usuario)
+        for url in LISTADOS:
+            cliente.get(url, {'per_page': 10})
+
+        tiempos = []
+        lecturas = escrituras = 0
+        for i in range(peticiones):
+            url = LISTADOS[i % len(LISTADOS)]
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                respuesta = cliente.get(url, {'page': 1 + i % 3})
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            if respuesta.status_code != 200:
+                raise CommandError(f'{url} respondió {respuesta.status_code}')
+            for consulta in consultas.captured_queries:
+                if 'django_session' in consulta['sql']:
+                    if consulta['sql'].lstrip().upper().startswith('SELECT'):
+                        lecturas += 1
+                    else:
+                        escrituras += 1
+        return tiempos, lecturas, escrituras
+
+    def handle(self, *args, **options):
+        peticiones = options['peticiones']
+        with transaction.atomic():
+            rol, _ = Rol.objects.get_or_create(nombre='Administrador', defaults={'descripcion': 'Administrador'})
+            usuario = Usuario(
+                username='benchmark@listados.local',
+                correo='benchmark@listados.local',
+                nombre='Benchmark',
+                id_rol=rol,
+                is_superuser=True,
+                is_staff=True,
+                forzar_cambio_contrasena=False,
+            )
+            usuario.set_unusable_password()
+            usuario.save()
+
+            for escenario in options['motores']:
+                motor = MOTORES['db' if escenario == 'antes' else escenario]
+                with override_settings(SESSION_ENGINE=motor, SESSION_SAVE_EVERY_REQUEST=escenario == 'antes'):
+                    tiempos, lecturas, escrituras = self._medir(usuario, peticiones)
+                tiempos.sort()
+                p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+                self.stdout.write(
+                    f'{escenario:>15}: media {statistics.mean(tiempos):.2f} ms, p50 {statistics.median(tiempos):.2f} ms, '
+                    f'p95 {p95:.2f} ms; sesión: {lecturas / peticiones:.2f} lecturas y '
+                    f'{escrituras / peticiones:.2f} escrituras por petición'
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS(f'{peticiones} peticiones por escenario sobre {len(LISTADOS)} listados'))
@@ -0,0 +1,60 @@
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from usuarios import limite_login
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula un ataque de credenciales contra el login y compara el CPU usado '
+        'con y sin el límite de intentos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intentos', type=int, default=200, help='Intentos de login del ataque')
+        parser.add_argument('--ips', type=int, default=2, help='Direcciones IP de origen')
+        parser.add_argument('--usuarios', type=int, default=20, help='Nombres de usuario probados')
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def _atacar(self, intentos, con_limite):
+        """Devuelve (segundos de CPU, intentos que llegaron a autenticar)"""
+        cache.delete_many([
+            clave for request, username in intentos
+            for par in limite_login._claves(request, username, int(time.time() // settings.LOGIN_VENTANA_SEGUNDOS)).values()
+            for clave in par
+        ])
+        autenticados = 0
+        inicio = time.process_time()
+        for request, username in intentos:
+            if con_limite and limite_login.esperar(request, username):
+                continue
+            autenticados += 1
+            authenticate(request, username=username, password='clave-incorrecta')
+        return time.process_time() - inicio, autenticados
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['semilla'])
+        fabrica = RequestFactory()
+        ips = [f'203.0.113.{i % 254 + 1}' for i in range(options['ips'])]
+        usuarios = [f'ataque{i}@ejemplo.cl' for i in range(options['usuarios'])]
+        intentos = []
+        for _ in range(options['intentos']):
+            request = fabrica.post('/dashboard/login/', REMOTE_ADDR=rnd.choice(ips))
+            intentos.append((request, rnd.choice(usuarios)))
+
+        self.stdout.write(
+            f'{len(intentos)} intentos desde {len(ips)} IPs contra {len(usuarios)} usuarios; '
+            f'límites: {settings.LOGIN_INTENTOS_IP} por IP y {settings.LOGIN_INTENTOS_USUARIO} por usuario '
+            f'cada {settings.LOGIN_VENTANA_SEGUNDOS} s'
+        )
+        for nombre, con_limite in (('Sin límite', False), ('Con límite', True)):
+            cpu, autenticados = self._atacar(intentos, con_limite)
+            self.stdout.write(self.style.SUCCESS(
+                f'{nombre}: {cpu:.2f} s de CPU, {autenticados} hashes calculados, '
+                f'{cpu / len(intentos) * 1000:.2f} ms de CPU por intento'
+            ))
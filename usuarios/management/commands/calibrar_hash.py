@@ -0,0 +1,58 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.management.base import BaseCommand, CommandError
+
+# Iteraciones con las que se hace la primera medición
+ITERACIONES_MUESTRA = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide cuánto tarda el hash de contraseñas en este servidor y sugiere el valor de '
+        'HASH_ITERACIONES para alcanzar la latencia objetivo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objetivo-ms', type=float, default=250, help='Latencia deseada por hash en milisegundos')
+        parser.add_argument('--muestras', type=int, default=5, help='Mediciones por paso (se usa la mediana)')
+
+    def _medir(self, hasher, iteraciones, muestras):
+        """Mediana en milisegundos de calcular un hash con esas iteraciones"""
+        sal = hasher.salt()
+        tiempos = []
+        for _ in range(muestras):
+            inicio = time.perf_counter()
+            hasher.encode('calibracion-de-hash', sal, iteraciones)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
+
+    def handle(self, *args, **options):
+        objetivo = options['objetivo_ms']
+        muestras = max(1, options['muestras'])
+        if objetivo <= 0:
+            raise CommandError('--objetivo-ms debe ser positivo')
+
+        hasher = get_hasher()
+        if not isinstance(hasher, PBKDF2PasswordHasher):
+            raise CommandError(f'El hasher por defecto ({hasher.algorithm}) no usa iteraciones de PBKDF2')
+
+        actual = settings.HASH_ITERACIONES
+        self.stdout.write(f'Actual: {actual} iteraciones, {self._medir(hasher, actual, muestras):.1f} ms por hash')
+
+        # El costo de PBKDF2 es lineal en las iteraciones: estimar y corregir con una segunda medición
+        base = self._medir(hasher, ITERACIONES_MUESTRA, muestras)
+        iteraciones = max(ITERACIONES_MUESTRA, int(ITERACIONES_MUESTRA * objetivo / base))
+        medido = self._medir(hasher, iteraciones, muestras)
+        iteraciones = max(ITERACIONES_MUESTRA, int(round(iteraciones * objetivo / medido, -4)))
+        medido = self._medir(hasher, iteraciones, muestras)
+
+        self.stdout.write(self.style.SUCCESS(f'Sugerido: {iteraciones} iteraciones, {medido:.1f} ms por hash'))
+        if iteraciones < PBKDF2PasswordHasher.iterations:
+            self.stdout.write(self.style.WARNING(
+                f'Queda bajo el mínimo recomendado por Django ({PBKDF2PasswordHasher.iterations}); '
+                'considera un objetivo mayor'
+            ))
+        self.stdout.write(f'Agregar al archivo .env:\nHASH_ITERACIONES={iteraciones}')
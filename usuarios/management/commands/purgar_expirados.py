@@ -0,0 +1,57 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from usuarios.models import PasswordResetToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra los tokens de recuperación y las sesiones expiradas por lotes acotados, '
+        'para no bloquear las tablas. Pensado para ejecutarse con cron cada noche.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Filas borradas por consulta')
+        parser.add_argument('--pausa', type=float, default=0, help='Segundos de espera entre lotes')
+
+    def _purgar(self, queryset, campo_pk, lote, pausa):
+        """Borra por lotes de claves primarias; cada DELETE es una transacción corta"""
+        total = 0
+        while True:
+            claves = list(queryset.order_by().values_list(campo_pk, flat=True)[:lote])
+            if not claves:
+                return total
+            total += queryset.model._default_manager.filter(**{f'{campo_pk}__in': claves}).delete()[0]
+            if len(claves) < lote:
+                return total
+            if pausa:
+                time.sleep(pausa)
+
+    def handle(self, *args, **options):
+        lote, pausa = options['lote'], options['pausa']
+        inicio = time.perf_counter()
+
+        # Usa el índice sobre expires_at
+        tokens = self._purgar(PasswordResetToken.objects.expirados(), 'id', lote, pausa)
+
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if hasattr(store, 'get_model_class'):
+            # Sesiones en base de datos (db y cached_db): expire_date tiene índice
+            modelo = store.get_model_class()
+            sesiones = self._purgar(
+                modelo.objects.filter(expire_date__lt=timezone.now()), 'session_key', lote, pausa
+            )
+        else:
+            # Archivos o cache: el backend se encarga (en cache expiran solas)
+            store.clear_expired()
+            sesiones = None
+
+        resumen = f'{tokens} tokens de recuperación'
+        if sesiones is not None:
+            resumen += f' y {sesiones} sesiones'
+        self.stdout.write(self.style.SUCCESS(
+            f'Borrados {resumen} expirados en {time.perf_counter() - inicio:.2f}s'
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0005_usuario_forzar_cambio_contrasena'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['expires_at'], name='reset_token_expira_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0006_passwordresettoken_expira_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PreferenciaUsuario',
+            fields=[
+                ('id_preferencia', models.AutoField(primary_key=True, serialize=False)),
+                ('clave', models.CharField(max_length=50, verbose_name='Clave')),
+                ('valor', models.CharField(max_length=255, verbose_name='Valor')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('id_usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preferencias', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Preferencia de Usuario',
+                'verbose_name_plural': 'Preferencias de Usuario',
+                'db_table': 'preferencia_usuario',
+                'unique_together': {('id_usuario', 'clave')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0007_preferenciausuario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacionUsuarios',
+            fields=[
+                ('id_importacion', models.AutoField(primary_key=True, serialize=False)),
+                ('archivo', models.CharField(max_length=255, verbose_name='Archivo')),
+                ('contenido', models.BinaryField(verbose_name='Contenido')),
+                ('activo', models.BooleanField(default=True, verbose_name='Crear Activos')),
+                ('url_login', models.CharField(blank=True, max_length=255, verbose_name='Enlace de Inicio de Sesión')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('completada', 'Completada'), ('con_errores', 'Con Errores')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('creados', models.IntegerField(default=0, verbose_name='Usuarios Creados')),
+                ('errores', models.TextField(blank=True, verbose_name='Errores')),
+                ('fecha_carga', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Carga')),
+                ('fecha_proceso', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Proceso')),
+                ('id_usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importaciones', to=settings.AUTH_USER_MODEL, verbose_name='Solicitada por')),
+            ],
+            options={
+                'verbose_name': 'Importación de Usuarios',
+                'verbose_name_plural': 'Importaciones de Usuarios',
+                'db_table': 'importacion_usuarios',
+                'ordering': ['fecha_carga'],
+                'indexes': [models.Index(fields=['estado', 'fecha_carga'], name='importacion_estado_idx')],
+            },
+        ),
+    ]
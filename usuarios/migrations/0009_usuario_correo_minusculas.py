@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Q
+
+
+def a_minusculas(apps, schema_editor):
+    """
+    Correo, usuario y email en minúsculas, como los guarda ahora Usuario.save.
+    Si otra cuenta ya usa la versión en minúsculas la fila se deja igual, para
+    no violar los índices únicos; esos duplicados se resuelven a mano
+    """
+    Usuario = apps.get_model('usuarios', 'Usuario')
+    for usuario in Usuario.objects.only('id_usuario', 'correo', 'username', 'email').iterator(chunk_size=1000):
+        correo, username, email = usuario.correo.lower(), usuario.username.lower(), usuario.email.lower()
+        if (correo, username, email) == (usuario.correo, usuario.username, usuario.email):
+            continue
+        if Usuario.objects.exclude(pk=usuario.pk).filter(Q(correo=correo) | Q(username=username)).exists():
+            continue
+        Usuario.objects.filter(pk=usuario.pk).update(correo=correo, username=username, email=email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0008_importacionusuarios'),
+    ]
+
+    operations = [
+        migrations.RunPython(a_minusculas, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.hashers import check_password
 from django.utils import timezone
 from datetime import timedelta
 from django.core.exceptions import ValidationError
 import uuid
 import re
 from roles.models import Rol
+from roles import catalogo
 
 class Usuario(AbstractUser):
     id_usuario = models.AutoField(primary_key=True)
@@ -33,7 +35,15 @@ class Usuario(AbstractUser):
         ordering = ['nombre']
     
     def __str__(self):
-        return f"{self.nombre} ({self.id_rol.nombre})"
+        return f"{self.nombre} ({self.nombre_rol})"
+    
+    @property
+    def nombre_rol(self):
+        """Nombre del rol; si no se cargó con el usuario se toma del catálogo en memoria"""
+        if Usuario.id_rol.is_cached(self):
+            return self.id_rol.nombre
+        rol = catalogo.obtener(self.id_rol_id)
+        return rol.nombre if rol else ''
     
     def clean(self):
         super().clean()
@@ -56,9 +66,22 @@ class Usuario(AbstractUser):
             if len(telefono_limpio) < 7 or len(telefono_limpio) > 15:
                 raise ValidationError({'telefono': 'El teléfono debe tener entre 7 y 15 dígitos'})
     
+    def check_password(self, raw_password):
+        """
+        Si el hash tiene otro costo que el configurado se recalcula al acertar
+        la contraseña. Se guarda solo la columna password, sin pasar por save()
+        y sus validaciones de perfil
+        """
+        def actualizar(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            Usuario.objects.filter(pk=self.pk).update(password=self.password)
+        
+        return check_password(raw_password, self.password, actualizar)
+    
     def is_admin(self):
         """Verifica si el usuario es administrador"""
-        return self.is_superuser or (self.id_rol and self.id_rol.nombre.lower() == 'administrador')
+        return self.is_superuser or self.nombre_rol.lower() == 'administrador'
     
     def can_be_deleted(self):
         """Verifica si el usuario puede ser eliminado"""
@@ -79,8 +102,9 @@ class Usuario(AbstractUser):
         return True
     
     def save(self, *args, **kwargs):
-        if not self.username:
-            self.username = self.correo
+        # En minúsculas para que las búsquedas por igualdad usen los índices únicos en cualquier motor
+        self.correo = self.correo.lower()
+        self.username = (self.username or self.correo).lower()
         if not self.email:
             self.email = self.correo
         
@@ -90,6 +114,15 @@ class Usuario(AbstractUser):
         super().save(*args, **kwargs)
 
 
+class PasswordResetTokenManager(models.Manager):
+    def validos(self):
+        """Tokens sin usar y sin expirar, filtrados en la consulta"""
+        return self.filter(is_used=False, expires_at__gt=timezone.now())
+    
+    def expirados(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
 class PasswordResetToken(models.Model):
     """Modelo para almacenar tokens de recuperación de contraseña"""
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='password_reset_tokens')
@@ -98,11 +131,17 @@ class PasswordResetToken(models.Model):
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
     
+    objects = PasswordResetTokenManager()
+    
     class Meta:
         verbose_name = "Token de Recuperación"
         verbose_name_plural = "Tokens de Recuperación"
         db_table = "password_reset_token"
         ordering = ['-created_at']
+        indexes = [
+            # Para purgar los expirados sin recorrer la tabla
+            models.Index(fields=['expires_at'], name='reset_token_expira_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.expires_at:
@@ -116,3 +155,57 @@ class PasswordResetToken(models.Model):
     
     def __str__(self):
         return f"Token para {self.usuario.correo} - {'Válido' if self.is_valid() else 'Expirado/Usado'}"
+
+
+class PreferenciaUsuario(models.Model):
+    """Preferencias de interfaz por usuario (registros por página, etc.); ver usuarios.preferencias"""
+    id_preferencia = models.AutoField(primary_key=True)
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='preferencias', verbose_name="Usuario")
+    clave = models.CharField(max_length=50, verbose_name="Clave")
+    valor = models.CharField(max_length=255, verbose_name="Valor")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+    
+    class Meta:
+        verbose_name = "Preferencia de Usuario"
+        verbose_name_plural = "Preferencias de Usuario"
+        db_table = "preferencia_usuario"
+        unique_together = ['id_usuario', 'clave']
+    
+    def __str__(self):
+        return f"{self.id_usuario} - {self.clave}: {self.valor}"
+
+
+class ImportacionUsuarios(models.Model):
+    """
+    Planilla de alta masiva cargada desde el panel. La petición solo la guarda;
+    el comando alta_usuarios --pendientes la procesa fuera del servidor web
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completada', 'Completada'),
+        ('con_errores', 'Con Errores'),
+    ]
+    
+    id_importacion = models.AutoField(primary_key=True)
+    archivo = models.CharField(max_length=255, verbose_name="Archivo")
+    # Se guarda en la base para que el comando la lea desde cualquier servidor; se vacía al procesarla
+    contenido = models.BinaryField(verbose_name="Contenido")
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='importaciones', verbose_name="Solicitada por")
+    activo = models.BooleanField(default=True, verbose_name="Crear Activos")
+    url_login = models.CharField(max_length=255, blank=True, verbose_name="Enlace de Inicio de Sesión")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente', verbose_name="Estado")
+    creados = models.IntegerField(default=0, verbose_name="Usuarios Creados")
+    errores = models.TextField(blank=True, verbose_name="Errores")
+    fecha_carga = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Carga")
+    fecha_proceso = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Proceso")
+    
+    class Meta:
+        verbose_name = "Importación de Usuarios"
+        verbose_name_plural = "Importaciones de Usuarios"
+        db_table = "importacion_usuarios"
+        ordering = ['fecha_carga']
+        indexes = [models.Index(fields=['estado', 'fecha_carga'], name='importacion_estado_idx')]
+    
+    def __str__(self):
+        return f"Importación {self.id_importacion} - {self.archivo} ({self.get_estado_display()})"
@@ -0,0 +1,77 @@
+"""
+Preferencias de interfaz por usuario (por ejemplo, registros por página).
+
+Se guardan en PreferenciaUsuario y se leen del cache compartido entre
+procesos (CACHES en settings), todas las de un usuario bajo una misma clave,
+con una copia en el objeto usuario para el resto de la petición. Solo se
+escribe en la base de datos cuando un valor cambia, así que ver un listado no
+genera escrituras ni modifica la sesión.
+"""
+from django.core.cache import cache
+from .models import PreferenciaUsuario
+
+PREFIJO = 'preferencias'
+
+# Segundos que las preferencias de un usuario permanecen en el cache
+DURACION = 24 * 60 * 60
+
+POR_PAGINA_DEFECTO = 10
+MAX_POR_PAGINA = 100
+
+
+def _clave(id_usuario):
+    return f'{PREFIJO}:{id_usuario}'
+
+
+def todas(usuario):
+    """Diccionario {clave: valor} con las preferencias del usuario"""
+    try:
+        return usuario._preferencias
+    except AttributeError:
+        pass
+    preferencias = cache.get(_clave(usuario.pk))
+    if preferencias is None:
+        preferencias = dict(PreferenciaUsuario.objects.filter(id_usuario=usuario.pk).values_list('clave', 'valor'))
+        cache.set(_clave(usuario.pk), preferencias, DURACION)
+    usuario._preferencias = preferencias
+    return preferencias
+
+
+def obtener(usuario, clave, defecto=None):
+    return todas(usuario).get(clave, defecto)
+
+
+def guardar(usuario, clave, valor):
+    """Guarda la preferencia si cambió; devuelve True si hubo que escribirla"""
+    valor = str(valor)
+    preferencias = todas(usuario)
+    if preferencias.get(clave) == valor:
+        return False
+    PreferenciaUsuario.objects.update_or_create(id_usuario_id=usuario.pk, clave=clave, defaults={'valor': valor})
+    usuario._preferencias = {**preferencias, clave: valor}
+    # Otro proceso pudo cambiar otra clave del mismo usuario: se recarga desde la base de datos
+    cache.delete(_clave(usuario.pk))
+    return True
+
+
+def por_pagina(request, listado, defecto=POR_PAGINA_DEFECTO):
+    """
+    Registros por página del listado: el parámetro per_page si viene (y se
+    recuerda para la próxima vez) o el último elegido por el usuario
+    """
+    clave = f'por_pagina_{listado}'
+    usuario = request.user
+    try:
+        valor = int(request.GET['per_page'])
+    except (KeyError, ValueError):
+        valor = None
+    if valor is not None and 1 <= valor <= MAX_POR_PAGINA:
+        if usuario.is_authenticated:
+            guardar(usuario, clave, valor)
+        return valor
+    if usuario.is_authenticated:
+        try:
+            return int(obtener(usuario, clave, defecto))
+        except ValueError:
+            pass
+    return defecto
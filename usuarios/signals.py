@@ -0,0 +1,16 @@
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.dispatch import receiver
+from . import limite_login
+
+
+@receiver(user_login_failed)
+def contar_fallo(sender, credentials, request=None, **kwargs):
+    """Cada login fallido, desde el panel o desde el admin, cuenta para el límite"""
+    if request is not None:
+        limite_login.registrar_fallo(request, credentials.get('username'))
+
+
+@receiver(user_logged_in)
+def limpiar_fallos(sender, request, user, **kwargs):
+    if request is not None:
+        limite_login.limpiar(request, user.get_username())
@@ -1,3 +1,344 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from notificaciones.models import CorreoSaliente
+from roles.models import Rol
+from . import limite_login, preferencias
+from .alta_masiva import procesar_pendiente, provisionar
+from .hashers import averificar
+from .models import ImportacionUsuarios, PasswordResetToken, PreferenciaUsuario, Usuario
+
+VENTANA = 300
+# Inicio de un intervalo de la ventana, para que las cuentas sean exactas
+INICIO = 1_000_000 * VENTANA
+
+
+def crear_usuario(correo='ana@dulceria.cl', password='Clave-segura-1', **campos):
+    rol = Rol.objects.get_or_create(nombre='Vendedor', defaults={'descripcion': 'Ventas en sala'})[0]
+    usuario = Usuario(username=correo, correo=correo, nombre='Ana', id_rol=rol, **campos)
+    usuario.set_password(password)
+    usuario.save()
+    return usuario
+
+
+@override_settings(LOGIN_VENTANA_SEGUNDOS=VENTANA, LOGIN_INTENTOS_IP=30, LOGIN_INTENTOS_USUARIO=5)
+class LimiteLoginTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+
+    def fallar(self, veces, ahora, username='ana@dulceria.cl'):
+        for _ in range(veces):
+            limite_login.registrar_fallo(self.request, username, ahora=ahora)
+
+    def test_bajo_el_limite_no_espera(self):
+        self.fallar(4, INICIO)
+        self.assertEqual(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO + 10), 0)
+
+    def test_limite_en_el_intervalo_actual(self):
+        self.fallar(5, INICIO + 150)
+        # Termina el intervalo (150 s) y el peso del actual ya no alcanza el límite
+        self.assertEqual(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO + 150), 151)
+        self.assertEqual(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO + VENTANA + 60), 0)
+
+    def test_ventana_deslizante_pondera_el_intervalo_anterior(self):
+        self.fallar(3, INICIO + 200)
+        self.fallar(3, INICIO + VENTANA + 10)
+        # 3 + 3 * (1 - t / 300) < 5 recién con t > 100
+        self.assertEqual(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO + VENTANA + 40), 61)
+        self.assertEqual(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO + VENTANA + 101), 0)
+
+    def test_el_usuario_no_distingue_mayusculas(self):
+        self.fallar(5, INICIO, username='Ana@Dulceria.cl ')
+        self.assertGreater(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO), 0)
+        self.assertEqual(limite_login.esperar(self.request, 'luis@dulceria.cl', ahora=INICIO), 0)
+
+    def test_limite_por_ip_con_distintos_usuarios(self):
+        for i in range(30):
+            limite_login.registrar_fallo(self.request, f'usuario{i}@dulceria.cl', ahora=INICIO)
+        self.assertGreater(limite_login.esperar(self.request, 'nuevo@dulceria.cl', ahora=INICIO), 0)
+        otra_ip = RequestFactory().post('/', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(limite_login.esperar(otra_ip, 'nuevo@dulceria.cl', ahora=INICIO), 0)
+
+    def test_login_correcto_limpia_el_usuario(self):
+        self.fallar(5, INICIO)
+        limite_login.limpiar(self.request, 'ana@dulceria.cl', ahora=INICIO)
+        self.assertEqual(limite_login.esperar(self.request, 'ana@dulceria.cl', ahora=INICIO), 0)
+
+
+@override_settings(LOGIN_VENTANA_SEGUNDOS=VENTANA, LOGIN_INTENTOS_USUARIO=3, HASH_ITERACIONES=1000)
+class LoginBloqueadoTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = crear_usuario(forzar_cambio_contrasena=False, is_staff=True, is_superuser=True)
+
+    def test_panel_responde_429_sin_autenticar(self):
+        for _ in range(3):
+            respuesta = self.client.post(reverse('dashboard:login'), {'username': 'ana@dulceria.cl', 'password': 'mala'})
+            self.assertEqual(respuesta.status_code, 200)
+
+        with mock.patch('dashboard.views.authenticate') as autenticar:
+            respuesta = self.client.post(
+                reverse('dashboard:login'), {'username': 'ana@dulceria.cl', 'password': 'Clave-segura-1'}
+            )
+        self.assertEqual(respuesta.status_code, 429)
+        autenticar.assert_not_called()
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_admin_rechaza_con_el_limite(self):
+        for _ in range(3):
+            self.client.post(reverse('admin:login'), {'username': 'ana@dulceria.cl', 'password': 'mala'})
+
+        respuesta = self.client.post(
+            reverse('admin:login'), {'username': 'ana@dulceria.cl', 'password': 'Clave-segura-1'}
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, 'Demasiados intentos fallidos')
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+
+    def test_login_sin_distinguir_mayusculas(self):
+        respuesta = self.client.post(
+            reverse('dashboard:login'), {'username': 'Ana@Dulceria.cl', 'password': 'Clave-segura-1'}
+        )
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.usuario.pk)
+
+
+class RehashContrasenaTest(TestCase):
+
+    @override_settings(HASH_ITERACIONES=1000)
+    def setUp(self):
+        self.usuario = crear_usuario()
+
+    def iteraciones(self):
+        self.usuario.refresh_from_db()
+        return int(self.usuario.password.split('$')[1])
+
+    def test_hash_con_las_iteraciones_configuradas(self):
+        self.assertEqual(self.iteraciones(), 1000)
+
+    @override_settings(HASH_ITERACIONES=2000)
+    def test_login_correcto_recalcula_el_hash(self):
+        self.assertTrue(self.usuario.check_password('Clave-segura-1'))
+        self.assertEqual(self.iteraciones(), 2000)
+
+    @override_settings(HASH_ITERACIONES=2000)
+    def test_contrasena_incorrecta_no_recalcula(self):
+        self.assertFalse(self.usuario.check_password('otra'))
+        self.assertEqual(self.iteraciones(), 1000)
+
+    @override_settings(HASH_ITERACIONES=2000, HASH_HILOS=0)
+    def test_verificacion_asincrona_recalcula(self):
+        self.assertTrue(async_to_sync(averificar)(self.usuario, 'Clave-segura-1'))
+        self.assertEqual(self.iteraciones(), 2000)
+
+
+@override_settings(HASH_ITERACIONES=1000)
+class TokenRecuperacionTest(TestCase):
+
+    def setUp(self):
+        self.usuario = crear_usuario()
+        ahora = timezone.now()
+        self.vigente = PasswordResetToken.objects.create(usuario=self.usuario)
+        self.usado = PasswordResetToken.objects.create(usuario=self.usuario, is_used=True)
+        self.expirado = PasswordResetToken.objects.create(usuario=self.usuario, expires_at=ahora - timedelta(minutes=1))
+
+    def test_validos_y_expirados(self):
+        self.assertEqual(list(PasswordResetToken.objects.validos()), [self.vigente])
+        self.assertEqual(list(PasswordResetToken.objects.expirados()), [self.expirado])
+
+    def test_token_expirado_no_sirve(self):
+        respuesta = self.client.get(reverse('dashboard:reset_password'), {'token': str(self.expirado.token)})
+        self.assertRedirects(respuesta, reverse('dashboard:forgot_password'), fetch_redirect_response=False)
+
+    def test_token_se_usa_una_sola_vez(self):
+        datos = {'token': str(self.vigente.token), 'password': 'Nueva-clave-1', 'password_confirm': 'Nueva-clave-1'}
+        respuesta = self.client.post(reverse('dashboard:reset_password'), datos)
+        self.assertRedirects(respuesta, reverse('dashboard:login'), fetch_redirect_response=False)
+        self.usuario.refresh_from_db()
+        self.assertTrue(self.usuario.check_password('Nueva-clave-1'))
+
+        datos.update(password='Otra-clave-2', password_confirm='Otra-clave-2')
+        respuesta = self.client.post(reverse('dashboard:reset_password'), datos)
+        self.assertRedirects(respuesta, reverse('dashboard:forgot_password'), fetch_redirect_response=False)
+        self.usuario.refresh_from_db()
+        self.assertTrue(self.usuario.check_password('Nueva-clave-1'))
+
+    def test_purga_solo_expirados_por_lotes(self):
+        PasswordResetToken.objects.bulk_create([
+            PasswordResetToken(usuario=self.usuario, expires_at=timezone.now() - timedelta(days=1))
+            for _ in range(4)
+        ])
+        call_command('purgar_expirados', lote=2, stdout=mock.MagicMock())
+        self.assertFalse(PasswordResetToken.objects.expirados().exists())
+        self.assertEqual(set(PasswordResetToken.objects.all()), {self.vigente, self.usado})
+
+
+@override_settings(HASH_ITERACIONES=1000)
+class AltaMasivaTest(TestCase):
+
+    def setUp(self):
+        Rol.objects.create(nombre='Bodeguero', descripcion='Bodega')
+
+    def planilla(self, *filas):
+        contenido = '\n'.join(['correo,nombre,rol', *filas]).encode()
+        return SimpleUploadedFile('usuarios.csv', contenido)
+
+    def test_crea_usuarios_y_encola_credenciales(self):
+        creados, errores = provisionar(
+            self.planilla('Pepe@Dulceria.cl,Pepe Soto,Bodeguero', 'luis@dulceria.cl,Luis Rojas,bodeguero'),
+            'usuarios.csv',
+        )
+        self.assertEqual((creados, errores), (2, []))
+        self.assertEqual(
+            set(Usuario.objects.values_list('correo', flat=True)), {'pepe@dulceria.cl', 'luis@dulceria.cl'}
+        )
+        self.assertTrue(all(Usuario.objects.values_list('forzar_cambio_contrasena', flat=True)))
+        self.assertEqual(CorreoSaliente.objects.filter(confidencial=True).count(), 2)
+
+    def test_una_fila_invalida_no_crea_ninguno(self):
+        creados, errores = provisionar(
+            self.planilla('pepe@dulceria.cl,Pepe Soto,Bodeguero', 'no-es-correo,Luis Rojas,Bodeguero',
+                          'ana@dulceria.cl,Ana Díaz,Gerente'),
+            'usuarios.csv',
+        )
+        self.assertEqual(creados, 0)
+        self.assertEqual([e.split(':')[0] for e in errores], ['Fila 3', 'Fila 4'])
+        self.assertFalse(Usuario.objects.exists())
+        self.assertFalse(CorreoSaliente.objects.exists())
+
+    def test_correo_existente_sin_distinguir_mayusculas(self):
+        crear_usuario(correo='Pepe@Dulceria.cl')
+        creados, errores = provisionar(self.planilla('PEPE@dulceria.cl,Pepe Soto,Bodeguero'), 'usuarios.csv')
+        self.assertEqual(creados, 0)
+        self.assertEqual(errores, ['Fila 2: Este correo electrónico ya está registrado'])
+
+    def test_correos_existentes_en_una_consulta_sobre_el_indice(self):
+        crear_usuario(correo='Pepe@Dulceria.cl')
+        self.assertEqual(Usuario.objects.get().correo, 'pepe@dulceria.cl')
+
+        with CaptureQueriesContext(connection) as consultas:
+            provisionar(self.planilla('PEPE@dulceria.cl,Pepe Soto,Bodeguero'), 'usuarios.csv')
+        sql = next(c['sql'] for c in consultas if 'FROM "usuario"' in c['sql'])
+        self.assertNotIn('LOWER', sql.upper())
+
+    def test_conflicto_al_insertar_revierte_todo(self):
+        with mock.patch('usuarios.alta_masiva.encolar_lote', side_effect=IntegrityError):
+            with self.assertRaises(ValidationError):
+                provisionar(self.planilla('pepe@dulceria.cl,Pepe Soto,Bodeguero'), 'usuarios.csv')
+        self.assertFalse(Usuario.objects.exists())
+
+
+
+@override_settings(HASH_ITERACIONES=1000)
+class ImportacionUsuariosTest(TestCase):
+
+    def setUp(self):
+        Rol.objects.create(nombre='Bodeguero', descripcion='Bodega')
+        self.admin = crear_usuario(correo='admin@dulceria.cl', is_superuser=True, forzar_cambio_contrasena=False)
+        self.client.force_login(self.admin)
+
+    def cargar(self, *filas, encabezado='correo,nombre,rol'):
+        contenido = '\n'.join([encabezado, *filas]).encode()
+        return self.client.post(reverse('dashboard:importar_usuarios'), {
+            'archivo': SimpleUploadedFile('usuarios.csv', contenido),
+        }).json()
+
+    def test_la_peticion_solo_encola_la_planilla(self):
+        with mock.patch('usuarios.alta_masiva.hashear') as hashear:
+            respuesta = self.cargar('pepe@dulceria.cl,Pepe Soto,Bodeguero')
+
+        self.assertTrue(respuesta['success'])
+        hashear.assert_not_called()
+        self.assertFalse(Usuario.objects.filter(correo='pepe@dulceria.cl').exists())
+        importacion = ImportacionUsuarios.objects.get(pk=respuesta['id_importacion'])
+        self.assertEqual((importacion.estado, importacion.id_usuario), ('pendiente', self.admin))
+
+    def test_encabezado_incompleto_se_rechaza_al_cargar(self):
+        respuesta = self.cargar('pepe@dulceria.cl,Pepe Soto', encabezado='correo,nombre')
+
+        self.assertFalse(respuesta['success'])
+        self.assertIn('rol', respuesta['message'])
+        self.assertFalse(ImportacionUsuarios.objects.exists())
+
+    def test_el_comando_crea_los_usuarios_y_avisa(self):
+        self.cargar('pepe@dulceria.cl,Pepe Soto,Bodeguero', 'luis@dulceria.cl,Luis Rojas,Bodeguero')
+        call_command('alta_usuarios', pendientes=True, procesos=1, stdout=mock.MagicMock())
+
+        importacion = ImportacionUsuarios.objects.get()
+        self.assertEqual((importacion.estado, importacion.creados), ('completada', 2))
+        self.assertEqual(bytes(importacion.contenido), b'')
+        self.assertTrue(Usuario.objects.filter(correo='luis@dulceria.cl', forzar_cambio_contrasena=True).exists())
+        self.assertEqual(CorreoSaliente.objects.filter(confidencial=True).count(), 2)
+        self.assertTrue(CorreoSaliente.objects.filter(destinatarios='admin@dulceria.cl', confidencial=False).exists())
+        self.assertIsNone(procesar_pendiente(1))
+
+    def test_errores_de_fila_quedan_en_la_importacion(self):
+        self.cargar('pepe@dulceria.cl,Pepe Soto,Gerente')
+
+        importacion = procesar_pendiente(1)
+        self.assertEqual(importacion.estado, 'con_errores')
+        self.assertEqual(importacion.errores, 'Fila 2: El rol no existe')
+        self.assertFalse(Usuario.objects.filter(correo='pepe@dulceria.cl').exists())
+        aviso = CorreoSaliente.objects.get(destinatarios='admin@dulceria.cl')
+        self.assertIn('Fila 2: El rol no existe', aviso.cuerpo)
+
+
+@override_settings(HASH_ITERACIONES=1000)
+class PreferenciasTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = crear_usuario()
+        self.factory = RequestFactory()
+
+    def request(self, **params):
+        request = self.factory.get('/', params)
+        request.user = self.usuario
+        return request
+
+    def test_per_page_se_recuerda(self):
+        self.assertEqual(preferencias.por_pagina(self.request(per_page=25), 'productos'), 25)
+        self.assertEqual(preferencias.por_pagina(self.request(), 'productos'), 25)
+        self.assertEqual(preferencias.por_pagina(self.request(), 'proveedores'), 10)
+
+    def test_valores_invalidos_se_ignoran(self):
+        for valor in ('0', '500', 'abc'):
+            self.assertEqual(preferencias.por_pagina(self.request(per_page=valor), 'productos'), 10)
+        self.assertFalse(PreferenciaUsuario.objects.exists())
+
+    def test_solo_escribe_si_cambia(self):
+        self.assertTrue(preferencias.guardar(self.usuario, 'por_pagina_productos', 25))
+        self.assertFalse(preferencias.guardar(self.usuario, 'por_pagina_productos', 25))
+        with self.assertNumQueries(0):
+            self.assertEqual(preferencias.obtener(self.usuario, 'por_pagina_productos'), '25')
+
+    def test_otra_peticion_lee_el_cache(self):
+        preferencias.guardar(self.usuario, 'por_pagina_productos', 25)
+        preferencias.todas(Usuario.objects.get(pk=self.usuario.pk))
+
+        # Otra petición (otro objeto usuario) no vuelve a consultar la tabla de preferencias
+        otro = Usuario.objects.get(pk=self.usuario.pk)
+        with mock.patch.object(PreferenciaUsuario.objects, 'filter') as filtrar:
+            self.assertEqual(preferencias.obtener(otro, 'por_pagina_productos'), '25')
+        filtrar.assert_not_called()
+
+    def test_cambio_invalida_el_cache(self):
+        preferencias.guardar(self.usuario, 'por_pagina_productos', 25)
+        preferencias.todas(Usuario.objects.get(pk=self.usuario.pk))
+
+        preferencias.guardar(Usuario.objects.get(pk=self.usuario.pk), 'por_pagina_productos', 50)
+        self.assertEqual(preferencias.obtener(Usuario.objects.get(pk=self.usuario.pk), 'por_pagina_productos'), '50')
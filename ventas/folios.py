@@ -0,0 +1,109 @@
+"""
+Asignación de folios de boleta por caja.
+
+Cada proceso reserva bloques de folios con un único UPDATE sobre folio_caja
+y los entrega desde memoria, de modo que las ventas no compiten por la misma
+fila en cada inserción. Los folios que quedan sin emitir se registran en
+folio_no_usado para que la numeración pueda auditarse sin huecos.
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from .models import FolioCaja, FolioBloque, FolioNoUsado
+
+
+class _BloqueEnMemoria:
+    def __init__(self, desde, hasta):
+        self.siguiente = desde
+        self.hasta = hasta
+
+    def agotado(self):
+        return self.siguiente > self.hasta
+
+
+class AsignadorFolios:
+    """Entrega folios correlativos por caja reservándolos por bloques"""
+
+    def __init__(self, tamano_bloque=None):
+        self.tamano_bloque = tamano_bloque or getattr(settings, 'FOLIO_TAMANO_BLOQUE', 50)
+        self._bloques = {}
+        self._locks = {}
+        self._lock_global = threading.Lock()
+
+    def _lock_caja(self, caja):
+        with self._lock_global:
+            lock = self._locks.get(caja)
+            if lock is None:
+                lock = self._locks[caja] = threading.Lock()
+            return lock
+
+    def _reservar_bloque(self, caja):
+        """
+        Reserva el próximo rango de folios de la caja en la base de datos. La
+        transacción es propia (durable): si la reserva quedara dentro de la de una
+        venta y esta se revirtiera, el bloque en memoria repetiría folios
+        """
+        with transaction.atomic(durable=True):
+            FolioCaja.objects.get_or_create(caja=caja)
+            fila = FolioCaja.objects.select_for_update().get(caja=caja)
+            desde = fila.siguiente_folio
+            hasta = desde + self.tamano_bloque - 1
+            fila.siguiente_folio = hasta + 1
+            fila.save(update_fields=['siguiente_folio'])
+            FolioBloque.objects.create(caja=caja, desde=desde, hasta=hasta)
+        return _BloqueEnMemoria(desde, hasta)
+
+    def siguiente(self, caja):
+        """
+        Devuelve el siguiente folio de la caja. Debe pedirse fuera de la
+        transacción de la venta; si la venta falla, el folio se anula
+        """
+        with self._lock_caja(caja):
+            bloque = self._bloques.get(caja)
+            if bloque is None or bloque.agotado():
+                bloque = self._bloques[caja] = self._reservar_bloque(caja)
+            folio = bloque.siguiente
+            bloque.siguiente += 1
+            return folio
+
+    def anular(self, caja, folio, motivo='Venta anulada'):
+        """Registra un folio entregado que finalmente no se usó"""
+        FolioNoUsado.objects.get_or_create(caja=caja, folio=folio, defaults={'motivo': motivo})
+
+    def liberar(self, caja=None, motivo='Cierre de bloque'):
+        """
+        Descarta los bloques en memoria (de una caja o de todas) y registra sus
+        folios pendientes como no usados. Devuelve la cantidad registrada.
+        """
+        cajas = [caja] if caja is not None else list(self._bloques)
+        pendientes = []
+        for nombre in cajas:
+            with self._lock_caja(nombre):
+                bloque = self._bloques.pop(nombre, None)
+                if bloque is None or bloque.agotado():
+                    continue
+                pendientes.extend(
+                    FolioNoUsado(caja=nombre, folio=folio, motivo=motivo)
+                    for folio in range(bloque.siguiente, bloque.hasta + 1)
+                )
+        FolioNoUsado.objects.bulk_create(pendientes, ignore_conflicts=True)
+        return len(pendientes)
+
+
+def folios_sin_registrar(caja):
+    """
+    Folios de bloques reservados que no aparecen en ninguna venta ni en
+    folio_no_usado (por ejemplo, bloques de un proceso que terminó sin liberar)
+    """
+    from .models import Venta
+
+    reservados = set()
+    for desde, hasta in FolioBloque.objects.filter(caja=caja).values_list('desde', 'hasta'):
+        reservados.update(range(desde, hasta + 1))
+    usados = set(Venta.objects.filter(caja=caja, folio__isnull=False).values_list('folio', flat=True))
+    anulados = set(FolioNoUsado.objects.filter(caja=caja).values_list('folio', flat=True))
+    return sorted(reservados - usados - anulados)
+
+
+asignador = AsignadorFolios()
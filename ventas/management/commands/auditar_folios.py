@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from ventas.models import FolioBloque, FolioNoUsado
+from ventas.folios import folios_sin_registrar
+
+
+class Command(BaseCommand):
+    help = (
+        'Lista los folios reservados que no están en ninguna venta ni registrados como no usados. '
+        'Ejecutar con las cajas cerradas: los bloques en uso aparecen como pendientes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--caja', help='Auditar solo esta caja')
+        parser.add_argument('--registrar', action='store_true', help='Registrar los folios encontrados como no usados')
+
+    def handle(self, *args, **options):
+        if options['caja']:
+            cajas = [options['caja']]
+        else:
+            cajas = FolioBloque.objects.values_list('caja', flat=True).distinct().order_by('caja')
+
+        for caja in cajas:
+            faltantes = folios_sin_registrar(caja)
+            if not faltantes:
+                self.stdout.write(self.style.SUCCESS(f'{caja}: numeración completa'))
+                continue
+
+            self.stdout.write(self.style.WARNING(f'{caja}: {len(faltantes)} folios sin registrar'))
+            if options['registrar']:
+                FolioNoUsado.objects.bulk_create(
+                    [FolioNoUsado(caja=caja, folio=folio, motivo='Auditoría') for folio in faltantes],
+                    ignore_conflicts=True,
+                )
+                self.stdout.write(f'{caja}: folios registrados como no usados')
@@ -0,0 +1,257 @@
+import csv
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from dashboard.models import Cliente
+from productos.models import Producto
+from usuarios.models import Usuario
+from ventas.models import Venta
+from detalle_ventas.models import DetalleVenta
+
+# Namespace fijo: la misma venta del sistema antiguo siempre genera el mismo UUID
+NAMESPACE_LEGADO = uuid.UUID('7d0c5c1e-3f43-4c8e-9a55-4a3c1b2f6e10')
+
+COLUMNAS = ['venta', 'fecha', 'cliente', 'usuario', 'producto', 'cantidad', 'precio_unitario']
+
+
+class Command(BaseCommand):
+    help = (
+        'Carga ventas históricas desde un CSV con una fila por línea de detalle '
+        f'(columnas: {", ".join(COLUMNAS)}). Las filas de una misma venta deben ser consecutivas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV exportado del sistema antiguo')
+        parser.add_argument('--chunk', type=int, default=2000, help='Ventas insertadas por transacción')
+        parser.add_argument('--checkpoint', help='Archivo de avance (por defecto <archivo>.checkpoint)')
+        parser.add_argument('--reiniciar', action='store_true', help='Ignorar el checkpoint y empezar desde el inicio')
+        parser.add_argument('--delimitador', default=',', help='Separador de columnas')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Codificación del archivo')
+        parser.add_argument('--formato-fecha', help='Formato strptime de la fecha (por defecto ISO 8601)')
+
+    # ------------------------------------------------------------------
+    # Referencias precargadas
+    # ------------------------------------------------------------------
+
+    def _cargar_referencias(self):
+        """Diccionarios clave -> id para resolver referencias sin consultar por fila"""
+        productos = {}
+        for id_producto, nombre in Producto.objects.values_list('id_producto', 'nombre'):
+            productos[str(id_producto)] = id_producto
+            productos[nombre.strip().lower()] = id_producto
+
+        clientes = {}
+        for id_cliente, nombre in Cliente.objects.values_list('id_cliente', 'nombre'):
+            clientes[str(id_cliente)] = id_cliente
+            clientes[nombre.strip().lower()] = id_cliente
+
+        usuarios = {}
+        for id_usuario, username, correo in Usuario.objects.values_list('id_usuario', 'username', 'correo'):
+            usuarios[str(id_usuario)] = id_usuario
+            usuarios[username.strip().lower()] = id_usuario
+            usuarios[correo.strip().lower()] = id_usuario
+
+        return productos, clientes, usuarios
+
+    def _parsear_fecha(self, valor, formato):
+        valor = (valor or '').strip()
+        if formato:
+            fecha = datetime.strptime(valor, formato)
+        else:
+            fecha = parse_datetime(valor)
+            if fecha is None:
+                dia = parse_date(valor)
+                if dia is None:
+                    raise ValueError(f'Fecha inválida: {valor!r}')
+                fecha = datetime(dia.year, dia.month, dia.day)
+        if timezone.is_naive(fecha):
+            fecha = timezone.make_aware(fecha)
+        return fecha
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def _leer_checkpoint(self, ruta):
+        if not ruta.exists():
+            return {'filas': 0, 'ventas': 0}
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _guardar_checkpoint(self, ruta, avance):
+        # Escritura atómica: un corte a mitad de escritura no corrompe el avance
+        temporal = ruta.with_suffix(ruta.suffix + '.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(avance, f)
+        temporal.replace(ruta)
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _carga_masiva(self):
+        """
+        En MySQL desactiva la verificación de claves foráneas de la sesión
+        mientras dura la carga; las referencias ya se validaron en Python. Las
+        claves únicas se siguen verificando: el índice único de venta.uuid es lo
+        que hace idempotente reanudar o repetir una carga
+        """
+        if connection.vendor != 'mysql':
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('SET SESSION foreign_key_checks = 0')
+        self.stdout.write('Verificación de claves foráneas desactivada durante la carga')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SET SESSION foreign_key_checks = 1')
+
+    def _leer_ventas(self, lector, saltar, referencias, formato_fecha):
+        """
+        Agrupa las filas consecutivas de cada venta. Entrega (filas_consumidas,
+        venta o None si alguna referencia no se pudo resolver)
+        """
+        productos, clientes, usuarios = referencias
+        actual = None
+        filas = []
+
+        def construir():
+            primera = filas[0]
+            try:
+                venta = {
+                    'uuid': uuid.uuid5(NAMESPACE_LEGADO, primera['venta'].strip()),
+                    'fecha': self._parsear_fecha(primera['fecha'], formato_fecha),
+                    'cliente': clientes[primera['cliente'].strip().lower()],
+                    'usuario': usuarios[primera['usuario'].strip().lower()],
+                    'lineas': [
+                        (productos[fila['producto'].strip().lower()], int(fila['cantidad']), int(fila['precio_unitario']))
+                        for fila in filas
+                    ],
+                }
+            except (KeyError, ValueError, AttributeError) as e:
+                self.stderr.write(f'Venta {primera.get("venta")!r} omitida: referencia o valor inválido ({e})')
+                return None
+            return venta
+
+        for numero, fila in enumerate(lector, 1):
+            if numero <= saltar:
+                continue
+            if actual is not None and fila['venta'] != actual:
+                yield len(filas), construir()
+                filas = []
+            actual = fila['venta']
+            filas.append(fila)
+
+        if filas:
+            yield len(filas), construir()
+
+    def _insertar_bloque(self, bloque):
+        """Inserta un bloque de ventas; las ya cargadas (mismo UUID) se omiten"""
+        existentes = set(Venta.objects.filter(uuid__in=[v['uuid'] for v in bloque]).values_list('uuid', flat=True))
+        bloque = [v for v in bloque if v['uuid'] not in existentes]
+        if not bloque:
+            return 0, 0
+
+        ventas = []
+        for datos in bloque:
+            lineas = [DetalleVenta(cantidad=c, precio_unitario=p) for _, c, p in datos['lineas']]
+            total, items, unidades = Venta.calcular_totales(lineas)
+            ventas.append(Venta(
+                uuid=datos['uuid'],
+                fecha=datos['fecha'],
+                id_usuario_id=datos['usuario'],
+                id_cliente_id=datos['cliente'],
+                total=total,
+                items_count=items,
+                units_count=unidades,
+            ))
+
+        with transaction.atomic():
+            Venta.objects.bulk_create(ventas, batch_size=1000)
+            if connection.features.can_return_rows_from_bulk_insert:
+                ids = {venta.uuid: venta.id_venta for venta in ventas}
+            else:
+                ids = dict(Venta.objects.filter(uuid__in=[v.uuid for v in ventas]).values_list('uuid', 'id_venta'))
+
+            detalles = [
+                DetalleVenta(
+                    id_venta_id=ids[datos['uuid']],
+                    id_producto_id=producto_id,
+                    cantidad=cantidad,
+                    precio_unitario=precio,
+                )
+                for datos in bloque
+                for producto_id, cantidad, precio in datos['lineas']
+            ]
+            DetalleVenta.objects.bulk_create(detalles, batch_size=2000)
+
+        return len(ventas), len(detalles)
+
+    def handle(self, *args, **options):
+        archivo = Path(options['archivo'])
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo {archivo}')
+
+        ruta_checkpoint = Path(options['checkpoint'] or f'{archivo}.checkpoint')
+        avance = {'filas': 0, 'ventas': 0} if options['reiniciar'] else self._leer_checkpoint(ruta_checkpoint)
+        if avance['filas']:
+            self.stdout.write(f'Retomando desde la fila {avance["filas"]} ({avance["ventas"]} ventas ya cargadas)')
+
+        referencias = self._cargar_referencias()
+        chunk = options['chunk']
+        inicio = time.monotonic()
+        filas_sesion = 0
+        omitidas = 0
+
+        with open(archivo, newline='', encoding=options['encoding']) as f, self._carga_masiva():
+            lector = csv.DictReader(f, delimiter=options['delimitador'])
+            faltantes = set(COLUMNAS) - set(lector.fieldnames or [])
+            if faltantes:
+                raise CommandError(f'Faltan columnas en el CSV: {", ".join(sorted(faltantes))}')
+
+            bloque = []
+            filas_bloque = 0
+
+            def volcar():
+                nonlocal filas_sesion
+                ventas, detalles = self._insertar_bloque(bloque)
+                avance['filas'] += filas_bloque
+                avance['ventas'] += ventas
+                self._guardar_checkpoint(ruta_checkpoint, avance)
+                filas_sesion += filas_bloque
+                transcurrido = max(time.monotonic() - inicio, 1e-6)
+                self.stdout.write(
+                    f'{avance["ventas"]} ventas / {avance["filas"]} filas cargadas '
+                    f'({filas_sesion / transcurrido:,.0f} filas/s)'
+                )
+
+            for filas, venta in self._leer_ventas(lector, avance['filas'], referencias, options['formato_fecha']):
+                filas_bloque += filas
+                if venta is None:
+                    omitidas += 1
+                else:
+                    bloque.append(venta)
+                if len(bloque) >= chunk:
+                    volcar()
+                    bloque = []
+                    filas_bloque = 0
+
+            if bloque or filas_bloque:
+                volcar()
+
+        transcurrido = max(time.monotonic() - inicio, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Carga terminada: {avance["ventas"]} ventas, {filas_sesion} filas en {transcurrido:.1f}s '
+            f'({filas_sesion / transcurrido:,.0f} filas/s), {omitidas} ventas omitidas'
+        ))
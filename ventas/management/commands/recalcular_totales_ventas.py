@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from ventas.models import Venta
+from detalle_ventas.models import DetalleVenta
+
+
+class Command(BaseCommand):
+    help = 'Recalcula total, items_count y units_count de las ventas existentes por bloques'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk', type=int, default=1000, help='Ventas procesadas por bloque')
+        parser.add_argument('--desde', type=int, default=0, help='Retomar desde este id_venta (exclusivo)')
+
+    def handle(self, *args, **options):
+        chunk = options['chunk']
+        ultimo_id = options['desde']
+        procesadas = 0
+
+        while True:
+            # Paginación por clave: cada bloque parte del último id procesado
+            ids = list(
+                Venta.objects.filter(id_venta__gt=ultimo_id)
+                .order_by('id_venta')
+                .values_list('id_venta', flat=True)[:chunk]
+            )
+            if not ids:
+                break
+
+            agregados = {
+                fila['id_venta']: fila
+                for fila in DetalleVenta.objects.filter(id_venta__in=ids)
+                .values('id_venta')
+                .annotate(
+                    total=Sum(F('cantidad') * F('precio_unitario')),
+                    items=Count('id_detalle'),
+                    unidades=Sum('cantidad'),
+                )
+            }
+
+            ventas = []
+            for id_venta in ids:
+                fila = agregados.get(id_venta, {})
+                ventas.append(Venta(
+                    id_venta=id_venta,
+                    total=fila.get('total') or 0,
+                    items_count=fila.get('items') or 0,
+                    units_count=fila.get('unidades') or 0,
+                ))
+
+            with transaction.atomic():
+                Venta.objects.bulk_update(ventas, ['total', 'items_count', 'units_count'])
+
+            procesadas += len(ids)
+            ultimo_id = ids[-1]
+            self.stdout.write(f'{procesadas} ventas recalculadas (último id_venta: {ultimo_id})')
+
+        self.stdout.write(self.style.SUCCESS(f'Totales recalculados para {procesadas} ventas'))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('ventas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venta',
+            name='items_count',
+            field=models.IntegerField(default=0, verbose_name='Cantidad de Líneas'),
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='total',
+            field=models.IntegerField(default=0, verbose_name='Total'),
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='units_count',
+            field=models.IntegerField(default=0, verbose_name='Cantidad de Unidades'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['total'], name='venta_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['id_cliente', 'total'], name='venta_cliente_total_idx'),
+        ),
+    ]
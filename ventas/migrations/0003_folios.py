@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ventas', '0002_venta_totales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FolioCaja',
+            fields=[
+                ('caja', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Caja')),
+                ('siguiente_folio', models.IntegerField(default=1, verbose_name='Siguiente Folio')),
+            ],
+            options={
+                'verbose_name': 'Folio de Caja',
+                'verbose_name_plural': 'Folios de Caja',
+                'db_table': 'folio_caja',
+            },
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='caja',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='Caja'),
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='folio',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Folio'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='venta',
+            unique_together={('caja', 'folio')},
+        ),
+        migrations.CreateModel(
+            name='FolioBloque',
+            fields=[
+                ('id_bloque', models.AutoField(primary_key=True, serialize=False)),
+                ('caja', models.CharField(max_length=50, verbose_name='Caja')),
+                ('desde', models.IntegerField(verbose_name='Desde')),
+                ('hasta', models.IntegerField(verbose_name='Hasta')),
+                ('reservado_en', models.DateTimeField(auto_now_add=True, verbose_name='Reservado en')),
+            ],
+            options={
+                'verbose_name': 'Bloque de Folios',
+                'verbose_name_plural': 'Bloques de Folios',
+                'db_table': 'folio_bloque',
+                'ordering': ['caja', 'desde'],
+                'indexes': [models.Index(fields=['caja', 'desde'], name='folio_bloque_caja_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FolioNoUsado',
+            fields=[
+                ('id_folio_no_usado', models.AutoField(primary_key=True, serialize=False)),
+                ('caja', models.CharField(max_length=50, verbose_name='Caja')),
+                ('folio', models.IntegerField(verbose_name='Folio')),
+                ('motivo', models.CharField(max_length=150, verbose_name='Motivo')),
+                ('registrado_en', models.DateTimeField(auto_now_add=True, verbose_name='Registrado en')),
+            ],
+            options={
+                'verbose_name': 'Folio No Usado',
+                'verbose_name_plural': 'Folios No Usados',
+                'db_table': 'folio_no_usado',
+                'ordering': ['caja', 'folio'],
+                'unique_together': {('caja', 'folio')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ventas', '0003_folios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venta',
+            name='ubicacion',
+            field=models.CharField(blank=True, default='', max_length=150, verbose_name='Ubicación'),
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='UUID de Caja'),
+        ),
+        migrations.AlterField(
+            model_name='venta',
+            name='fecha',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
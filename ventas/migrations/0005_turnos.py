@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('ventas', '0004_venta_sincronizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Turno',
+            fields=[
+                ('id_turno', models.AutoField(primary_key=True, serialize=False)),
+                ('apertura', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Apertura')),
+                ('cierre', models.DateTimeField(blank=True, null=True, verbose_name='Cierre')),
+                ('cantidad_ventas', models.IntegerField(default=0, verbose_name='Cantidad de Ventas')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Turno',
+                'verbose_name_plural': 'Turnos',
+                'db_table': 'turno',
+                'ordering': ['-apertura'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TurnoMedioPago',
+            fields=[
+                ('id_turno_medio_pago', models.AutoField(primary_key=True, serialize=False)),
+                ('medio_pago', models.CharField(choices=[('efectivo', 'Efectivo'), ('debito', 'Débito'), ('credito', 'Crédito'), ('transferencia', 'Transferencia')], max_length=20, verbose_name='Medio de Pago')),
+                ('cantidad_ventas', models.IntegerField(default=0, verbose_name='Cantidad de Ventas')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Total por Medio de Pago',
+                'verbose_name_plural': 'Totales por Medio de Pago',
+                'db_table': 'turno_medio_pago',
+            },
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='medio_pago',
+            field=models.CharField(choices=[('efectivo', 'Efectivo'), ('debito', 'Débito'), ('credito', 'Crédito'), ('transferencia', 'Transferencia')], default='efectivo', max_length=20, verbose_name='Medio de Pago'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['id_usuario', 'fecha'], name='venta_usuario_fecha_idx'),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='id_usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Vendedor'),
+        ),
+        migrations.AddField(
+            model_name='turnomediopago',
+            name='id_turno',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medios_pago', to='ventas.turno', verbose_name='Turno'),
+        ),
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(fields=['id_usuario', 'cierre'], name='turno_usuario_cierre_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='turnomediopago',
+            unique_together={('id_turno', 'medio_pago')},
+        ),
+    ]
@@ -1,12 +1,270 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
 from usuarios.models import Usuario
 from dashboard.models import Cliente
 
 class Venta(models.Model):
+    MEDIOS_PAGO = [
+        ('efectivo', 'Efectivo'),
+        ('debito', 'Débito'),
+        ('credito', 'Crédito'),
+        ('transferencia', 'Transferencia'),
+    ]
+    
     id_venta = models.AutoField(primary_key=True)
-    fecha = models.DateTimeField(auto_now_add=True)
+    # default en lugar de auto_now_add para conservar la hora de las ventas offline
+    fecha = models.DateTimeField(default=timezone.now)
     id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
     id_cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE)
+    
+    # Totales desnormalizados, se mantienen al escribir el detalle
+    total = models.IntegerField(default=0, verbose_name="Total")
+    items_count = models.IntegerField(default=0, verbose_name="Cantidad de Líneas")
+    units_count = models.IntegerField(default=0, verbose_name="Cantidad de Unidades")
+    
+    # Boleta: folio correlativo por caja, asignado por ventas.folios
+    caja = models.CharField(max_length=50, blank=True, default='', verbose_name="Caja")
+    folio = models.IntegerField(null=True, blank=True, verbose_name="Folio")
+    
+    # Sincronización offline: UUID generado por la caja y ubicación descontada
+    uuid = models.UUIDField(unique=True, null=True, blank=True, editable=False, verbose_name="UUID de Caja")
+    ubicacion = models.CharField(max_length=150, blank=True, default='', verbose_name="Ubicación")
+    
+    medio_pago = models.CharField(max_length=20, choices=MEDIOS_PAGO, default='efectivo', verbose_name="Medio de Pago")
 
     class Meta:
         db_table = 'venta'
+        unique_together = ['caja', 'folio']
+        indexes = [
+            models.Index(fields=['total'], name='venta_total_idx'),
+            models.Index(fields=['id_cliente', 'total'], name='venta_cliente_total_idx'),
+            models.Index(fields=['id_usuario', 'fecha'], name='venta_usuario_fecha_idx'),
+        ]
+
+    @staticmethod
+    def calcular_totales(detalles):
+        """Calcula (total, líneas, unidades) para una lista de detalles"""
+        total = 0
+        unidades = 0
+        for detalle in detalles:
+            total += detalle.cantidad * detalle.precio_unitario
+            unidades += detalle.cantidad
+        return total, len(detalles), unidades
+
+
+class Turno(models.Model):
+    """Turno de caja de un vendedor con totales acumulados al registrar cada venta"""
+    id_turno = models.AutoField(primary_key=True)
+    id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, verbose_name="Vendedor")
+    apertura = models.DateTimeField(default=timezone.now, verbose_name="Apertura")
+    cierre = models.DateTimeField(null=True, blank=True, verbose_name="Cierre")
+    cantidad_ventas = models.IntegerField(default=0, verbose_name="Cantidad de Ventas")
+    total = models.IntegerField(default=0, verbose_name="Total")
+
+    class Meta:
+        verbose_name = "Turno"
+        verbose_name_plural = "Turnos"
+        db_table = 'turno'
+        ordering = ['-apertura']
+        indexes = [
+            models.Index(fields=['id_usuario', 'cierre'], name='turno_usuario_cierre_idx'),
+        ]
+
+    def __str__(self):
+        estado = 'abierto' if self.cierre is None else 'cerrado'
+        return f"Turno {self.id_turno} de {self.id_usuario.nombre} ({estado})"
+
+    @classmethod
+    def abrir(cls, usuario):
+        """Abre un turno para el usuario, o devuelve el que ya tiene abierto"""
+        with transaction.atomic():
+            # Bloquear la fila del usuario serializa dos aperturas simultáneas
+            list(Usuario.objects.select_for_update().filter(pk=usuario.pk).values_list('pk', flat=True))
+            turno = cls.objects.filter(id_usuario=usuario, cierre__isnull=True).first()
+            if turno is not None:
+                return turno
+            turno = cls.objects.create(id_usuario=usuario)
+            # Una fila por medio de pago: al vender solo se hacen UPDATE
+            TurnoMedioPago.objects.bulk_create([
+                TurnoMedioPago(id_turno=turno, medio_pago=medio) for medio, _ in Venta.MEDIOS_PAGO
+            ])
+        return turno
+
+    @classmethod
+    def acumular(cls, movimientos):
+        """
+        Suma ventas a los turnos abiertos de sus vendedores. movimientos es un
+        iterable de (id_usuario, medio_pago, cantidad_ventas, total, fecha). Solo
+        se acumulan las ventas con fecha dentro del turno abierto, que es el rango
+        que concilia cerrar(); las de usuarios sin turno abierto o con fecha
+        anterior a la apertura (ventas offline sincronizadas tarde) no se suman
+        """
+        movimientos = list(movimientos)
+        if not movimientos:
+            return
+
+        turnos = {
+            id_usuario: (id_turno, apertura)
+            for id_usuario, id_turno, apertura in cls.objects.filter(
+                id_usuario__in={movimiento[0] for movimiento in movimientos},
+                cierre__isnull=True,
+            ).values_list('id_usuario', 'id_turno', 'apertura')
+        }
+
+        agrupado = defaultdict(lambda: [0, 0])
+        for id_usuario, medio_pago, cantidad, total, fecha in movimientos:
+            id_turno, apertura = turnos.get(id_usuario, (None, None))
+            if id_turno is None or fecha < apertura:
+                continue
+            agrupado[(id_turno, medio_pago)][0] += cantidad
+            agrupado[(id_turno, medio_pago)][1] += total
+
+        por_turno = defaultdict(lambda: [0, 0])
+        for (id_turno, medio_pago), (cantidad, total) in agrupado.items():
+            TurnoMedioPago.objects.filter(id_turno=id_turno, medio_pago=medio_pago).update(
+                cantidad_ventas=F('cantidad_ventas') + cantidad,
+                total=F('total') + total,
+            )
+            por_turno[id_turno][0] += cantidad
+            por_turno[id_turno][1] += total
+
+        for id_turno, (cantidad, total) in por_turno.items():
+            cls.objects.filter(pk=id_turno).update(
+                cantidad_ventas=F('cantidad_ventas') + cantidad,
+                total=F('total') + total,
+            )
+
+    def cerrar(self):
+        """
+        Cierra el turno y devuelve el resumen acumulado junto con la conciliación
+        contra las ventas del vendedor en el rango del turno
+        """
+        with transaction.atomic():
+            turno = Turno.objects.select_for_update().get(pk=self.pk)
+            if turno.cierre is None:
+                turno.cierre = timezone.now()
+                turno.save(update_fields=['cierre'])
+            self.cierre = turno.cierre
+            self.cantidad_ventas = turno.cantidad_ventas
+            self.total = turno.total
+
+        acumulado = {
+            fila['medio_pago']: fila
+            for fila in self.medios_pago.values('medio_pago', 'cantidad_ventas', 'total')
+        }
+
+        # Servida por el índice (id_usuario, fecha) de venta
+        conciliado = {
+            fila['medio_pago']: fila
+            for fila in Venta.objects.filter(
+                id_usuario=self.id_usuario_id,
+                fecha__gte=self.apertura,
+                fecha__lte=self.cierre,
+            ).values('medio_pago').annotate(
+                cantidad_ventas=Count('id_venta'),
+                total=Sum('total'),
+            ).order_by()
+        }
+
+        medios = []
+        cuadrado = True
+        for medio, nombre in Venta.MEDIOS_PAGO:
+            registrado = acumulado.get(medio, {})
+            calculado = conciliado.get(medio, {})
+            fila = {
+                'medio_pago': medio,
+                'nombre': nombre,
+                'cantidad_ventas': registrado.get('cantidad_ventas', 0),
+                'total': registrado.get('total', 0),
+                'cantidad_ventas_conciliada': calculado.get('cantidad_ventas', 0),
+                'total_conciliado': calculado.get('total') or 0,
+            }
+            fila['diferencia'] = fila['total'] - fila['total_conciliado']
+            if fila['diferencia'] or fila['cantidad_ventas'] != fila['cantidad_ventas_conciliada']:
+                cuadrado = False
+            medios.append(fila)
+
+        return {
+            'id_turno': self.id_turno,
+            'apertura': self.apertura,
+            'cierre': self.cierre,
+            'cantidad_ventas': self.cantidad_ventas,
+            'total': self.total,
+            'medios_pago': medios,
+            'cuadrado': cuadrado,
+        }
+
+
+class TurnoMedioPago(models.Model):
+    """Totales acumulados de un turno para un medio de pago"""
+    id_turno_medio_pago = models.AutoField(primary_key=True)
+    id_turno = models.ForeignKey(Turno, on_delete=models.CASCADE, related_name='medios_pago', verbose_name="Turno")
+    medio_pago = models.CharField(max_length=20, choices=Venta.MEDIOS_PAGO, verbose_name="Medio de Pago")
+    cantidad_ventas = models.IntegerField(default=0, verbose_name="Cantidad de Ventas")
+    total = models.IntegerField(default=0, verbose_name="Total")
+
+    class Meta:
+        verbose_name = "Total por Medio de Pago"
+        verbose_name_plural = "Totales por Medio de Pago"
+        db_table = 'turno_medio_pago'
+        unique_together = ['id_turno', 'medio_pago']
+
+    def __str__(self):
+        return f"{self.id_turno_id} - {self.medio_pago}: {self.total}"
+
+
+class FolioCaja(models.Model):
+    """Próximo folio sin reservar de cada caja; solo se bloquea al reservar un bloque"""
+    caja = models.CharField(max_length=50, primary_key=True, verbose_name="Caja")
+    siguiente_folio = models.IntegerField(default=1, verbose_name="Siguiente Folio")
+
+    class Meta:
+        verbose_name = "Folio de Caja"
+        verbose_name_plural = "Folios de Caja"
+        db_table = 'folio_caja'
+
+    def __str__(self):
+        return f"{self.caja}: {self.siguiente_folio}"
+
+
+class FolioBloque(models.Model):
+    """Rango de folios reservado por un proceso para entregarlo desde memoria"""
+    id_bloque = models.AutoField(primary_key=True)
+    caja = models.CharField(max_length=50, verbose_name="Caja")
+    desde = models.IntegerField(verbose_name="Desde")
+    hasta = models.IntegerField(verbose_name="Hasta")
+    reservado_en = models.DateTimeField(auto_now_add=True, verbose_name="Reservado en")
+
+    class Meta:
+        verbose_name = "Bloque de Folios"
+        verbose_name_plural = "Bloques de Folios"
+        db_table = 'folio_bloque'
+        ordering = ['caja', 'desde']
+        indexes = [
+            models.Index(fields=['caja', 'desde'], name='folio_bloque_caja_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.caja}: {self.desde}-{self.hasta}"
+
+
+class FolioNoUsado(models.Model):
+    """Folio reservado que nunca se emitió, registrado para auditoría"""
+    id_folio_no_usado = models.AutoField(primary_key=True)
+    caja = models.CharField(max_length=50, verbose_name="Caja")
+    folio = models.IntegerField(verbose_name="Folio")
+    motivo = models.CharField(max_length=150, verbose_name="Motivo")
+    registrado_en = models.DateTimeField(auto_now_add=True, verbose_name="Registrado en")
+
+    class Meta:
+        verbose_name = "Folio No Usado"
+        verbose_name_plural = "Folios No Usados"
+        db_table = 'folio_no_usado'
+        ordering = ['caja', 'folio']
+        unique_together = ['caja', 'folio']
+
+    def __str__(self):
+        return f"{self.caja} #{self.folio} ({self.motivo})"
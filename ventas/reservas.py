@@ -0,0 +1,61 @@
+"""
+Cobro de pedidos reservados.
+
+Convierte las líneas de una reserva vigente en una venta con los precios del
+motor de promociones, descuenta el stock y elimina la reserva, todo en una
+misma transacción. El folio se toma antes y, si la venta no se completa,
+queda registrado como no usado.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from inventarios.models import Reserva
+from promociones.motor import detalles_para_venta
+from detalle_ventas.models import DetalleVenta
+from .folios import asignador
+from .models import Venta
+from .sincronizacion import _descontar_stock
+
+
+def cobrar_reserva(pedido, usuario, medio_pago='efectivo', caja=''):
+    """Registra la venta de un pedido reservado y devuelve la Venta creada"""
+    if medio_pago not in dict(Venta.MEDIOS_PAGO):
+        raise ValidationError("Medio de pago inválido.")
+
+    # El folio se reserva fuera de la transacción: el bloque del asignador debe
+    # quedar confirmado aunque la venta se revierta
+    folio = asignador.siguiente(caja) if caja else None
+    try:
+        with transaction.atomic():
+            lineas = list(Reserva.objects.select_for_update().filter(
+                pedido=pedido, expira_en__gt=timezone.now()
+            ).order_by('id_reserva'))
+            if not lineas:
+                raise ValidationError("La reserva no existe o ya venció.")
+
+            primera = lineas[0]
+            venta = Venta.objects.create(
+                id_usuario=usuario,
+                id_cliente_id=primera.id_cliente_id,
+                ubicacion=primera.ubicacion,
+                medio_pago=medio_pago,
+                caja=caja,
+                folio=folio,
+            )
+            DetalleVenta.objects.crear_lote(
+                venta,
+                detalles_para_venta([(linea.id_producto_id, linea.cantidad) for linea in lineas], primera.id_cliente_id),
+            )
+
+            unidades = defaultdict(int)
+            for linea in lineas:
+                unidades[linea.id_producto_id] += linea.cantidad
+            _descontar_stock({primera.ubicacion: unidades})
+            Reserva.objects.filter(pedido=pedido).delete()
+    except Exception:
+        if folio is not None:
+            asignador.anular(caja, folio, 'Cobro de reserva fallido')
+        raise
+    return venta
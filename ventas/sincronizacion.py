@@ -0,0 +1,275 @@
+"""
+Ingesta por lotes de ventas registradas offline por las cajas.
+
+Cada venta trae un UUID generado por la caja; el índice único de venta.uuid
+hace que reenviar un lote sea idempotente. Las ventas nuevas se insertan con
+bulk_create y el stock se descuenta con un UPDATE agrupado por ubicación.
+"""
+import uuid as uuid_lib
+from collections import defaultdict
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from dashboard.models import Cliente
+from productos.models import Producto
+from inventarios import ajustes
+from inventarios.models import Inventario
+from inventarios.lotes import asignar_carro
+from inventarios.signals import stock_actualizado
+from kits.disponibilidad import expandir_kits
+from detalle_ventas.models import DetalleVenta
+from .models import Venta, Turno
+
+MAX_VENTAS_POR_LOTE = 1000
+
+
+def _entero(valor):
+    if isinstance(valor, bool):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _validar_venta(datos, ubicacion_defecto):
+    """Normaliza una venta del lote; devuelve (venta, errores)"""
+    errores = []
+    try:
+        venta_uuid = uuid_lib.UUID(str(datos.get('uuid')))
+    except (ValueError, AttributeError):
+        return None, ['UUID inválido']
+
+    cliente_id = _entero(datos.get('cliente'))
+    if cliente_id is None:
+        errores.append('Cliente inválido')
+
+    fecha = timezone.now()
+    if datos.get('fecha'):
+        try:
+            fecha = parse_datetime(str(datos['fecha']))
+        except ValueError:
+            # Bien formada pero inexistente, por ejemplo 2024-02-30T10:00:00
+            fecha = None
+        if fecha is None:
+            errores.append('Fecha inválida')
+        elif timezone.is_naive(fecha):
+            fecha = timezone.make_aware(fecha)
+
+    medio_pago = str(datos.get('medio_pago') or 'efectivo')
+    if medio_pago not in dict(Venta.MEDIOS_PAGO):
+        errores.append('Medio de pago inválido')
+
+    folio = None
+    if datos.get('folio') is not None:
+        folio = _entero(datos['folio'])
+        if folio is None or folio <= 0:
+            errores.append('Folio inválido')
+
+    lineas = []
+    detalles = datos.get('detalles')
+    if not isinstance(detalles, list) or not detalles:
+        errores.append('La venta no tiene detalles')
+        detalles = []
+    for detalle in detalles:
+        if not isinstance(detalle, dict):
+            errores.append('Detalle inválido')
+            continue
+        producto_id = _entero(detalle.get('producto'))
+        cantidad = _entero(detalle.get('cantidad'))
+        precio = _entero(detalle.get('precio_unitario'))
+        if producto_id is None or cantidad is None or cantidad <= 0 or precio is None or precio < 0:
+            errores.append('Detalle inválido')
+            continue
+        lineas.append((producto_id, cantidad, precio))
+
+    venta = {
+        'uuid': venta_uuid,
+        'cliente': cliente_id,
+        'fecha': fecha,
+        'caja': str(datos.get('caja') or '')[:50],
+        'folio': folio,
+        'ubicacion': str(datos.get('ubicacion') or ubicacion_defecto)[:150],
+        'medio_pago': medio_pago,
+        'lineas': lineas,
+    }
+    return venta, errores
+
+
+def _descontar_stock(unidades_por_ubicacion):
+    """
+    Un UPDATE por ubicación con las unidades vendidas de cada producto; los
+    kits se descuentan como sus componentes y los lotes en orden FEFO.
+
+    Una venta offline ya ocurrió y no se rechaza por falta de stock: el stock
+    queda en cero y las unidades que faltaban se registran como un ajuste
+    'faltante' (de la cantidad que habría quedado, negativa, a cero)
+    """
+    ahora = timezone.now()
+    pares = set()
+    faltantes = []
+    for ubicacion, por_producto in unidades_por_ubicacion.items():
+        if not ubicacion:
+            continue
+        por_producto = expandir_kits(por_producto)
+        # Las mismas filas que actualiza el UPDATE, bloqueadas para que el faltante sea exacto
+        actuales = {
+            producto_id: (id_inventario, cantidad)
+            for id_inventario, producto_id, cantidad in Inventario.objects.select_for_update().filter(
+                ubicacion=ubicacion, id_producto__in=list(por_producto)
+            ).values_list('id_inventario', 'id_producto', 'cantidad_actual')
+        }
+        for producto_id, unidades in por_producto.items():
+            id_inventario, cantidad = actuales.get(producto_id, (None, 0))
+            if cantidad < unidades:
+                faltantes.append((id_inventario, producto_id, ubicacion, cantidad - unidades, 0))
+        descuento = Case(
+            *[When(id_producto=producto_id, then=Value(unidades)) for producto_id, unidades in por_producto.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        Inventario.objects.filter(
+            ubicacion=ubicacion, id_producto__in=list(por_producto)
+        ).update(
+            cantidad_actual=Greatest(F('cantidad_actual') - descuento, Value(0)),
+            fecha_ultima_actualizacion=ahora,
+        )
+        asignar_carro(por_producto, ubicacion)
+        pares.update((producto_id, ubicacion) for producto_id in por_producto)
+    if faltantes:
+        ajustes.registrar(faltantes, 'faltante')
+    if pares:
+        stock_actualizado.send(sender=Inventario, pares=pares)
+
+
+def _insertar(validas, usuario):
+    """Inserta las ventas validadas y su detalle; devuelve {uuid: id_venta}"""
+    ventas = []
+    for datos in validas:
+        lineas = [DetalleVenta(cantidad=c, precio_unitario=p) for _, c, p in datos['lineas']]
+        total, items, unidades = Venta.calcular_totales(lineas)
+        ventas.append(Venta(
+            uuid=datos['uuid'],
+            fecha=datos['fecha'],
+            id_usuario=usuario,
+            id_cliente_id=datos['cliente'],
+            caja=datos['caja'],
+            folio=datos['folio'],
+            ubicacion=datos['ubicacion'],
+            medio_pago=datos['medio_pago'],
+            total=total,
+            items_count=items,
+            units_count=unidades,
+        ))
+
+    with transaction.atomic():
+        Venta.objects.bulk_create(ventas, batch_size=500)
+        if connection.features.can_return_rows_from_bulk_insert:
+            ids = {venta.uuid: venta.id_venta for venta in ventas}
+        else:
+            ids = dict(Venta.objects.filter(uuid__in=[v.uuid for v in ventas]).values_list('uuid', 'id_venta'))
+
+        detalles = []
+        unidades_por_ubicacion = defaultdict(lambda: defaultdict(int))
+        for datos in validas:
+            id_venta = ids[datos['uuid']]
+            for producto_id, cantidad, precio in datos['lineas']:
+                detalles.append(DetalleVenta(
+                    id_venta_id=id_venta,
+                    id_producto_id=producto_id,
+                    cantidad=cantidad,
+                    precio_unitario=precio,
+                ))
+                unidades_por_ubicacion[datos['ubicacion']][producto_id] += cantidad
+
+        DetalleVenta.objects.bulk_create(detalles, batch_size=1000)
+        _descontar_stock(unidades_por_ubicacion)
+        Turno.acumular((venta.id_usuario_id, venta.medio_pago, 1, venta.total, venta.fecha) for venta in ventas)
+    return ids
+
+
+def sincronizar_ventas(lote, usuario, ubicacion_defecto='', _reintentar=True):
+    """
+    Registra un lote de ventas offline y devuelve un resultado por venta, en el
+    mismo orden del lote, con estado 'creada', 'duplicada' o 'rechazada'
+    """
+    resultados = []
+    candidatas = []
+    vistos = set()
+
+    for datos in lote:
+        if not isinstance(datos, dict):
+            datos = {}
+        venta, errores = _validar_venta(datos, ubicacion_defecto)
+        if venta is None:
+            resultados.append({'uuid': str(datos.get('uuid', '')), 'estado': 'rechazada', 'errores': errores})
+            continue
+        resultado = {'uuid': str(venta['uuid'])}
+        resultados.append(resultado)
+        if errores:
+            resultado.update(estado='rechazada', errores=errores)
+        elif venta['uuid'] in vistos:
+            resultado.update(estado='duplicada')
+        else:
+            vistos.add(venta['uuid'])
+            candidatas.append((venta, resultado))
+
+    # Reenvíos de ventas ya registradas: una consulta sobre el índice único
+    existentes = dict(Venta.objects.filter(
+        uuid__in=[v['uuid'] for v, _ in candidatas]
+    ).values_list('uuid', 'id_venta'))
+    nuevas = []
+    for venta, resultado in candidatas:
+        if venta['uuid'] in existentes:
+            resultado.update(estado='duplicada', id_venta=existentes[venta['uuid']])
+        else:
+            nuevas.append((venta, resultado))
+
+    # Referencias válidas: una consulta por tabla para todo el lote
+    clientes = set(Cliente.objects.filter(
+        id_cliente__in={v['cliente'] for v, _ in nuevas}
+    ).values_list('id_cliente', flat=True))
+    productos = set(Producto.objects.filter(
+        id_producto__in={l[0] for v, _ in nuevas for l in v['lineas']}
+    ).values_list('id_producto', flat=True))
+    folios_ocupados = set(Venta.objects.filter(
+        caja__in={v['caja'] for v, _ in nuevas if v['folio']},
+        folio__in={v['folio'] for v, _ in nuevas if v['folio']},
+    ).values_list('caja', 'folio'))
+
+    pendientes = []
+    folios_lote = set()
+    for venta, resultado in nuevas:
+        errores = []
+        if venta['cliente'] not in clientes:
+            errores.append('El cliente no existe')
+        if any(producto_id not in productos for producto_id, _, _ in venta['lineas']):
+            errores.append('Producto inexistente en el detalle')
+        if venta['folio']:
+            clave = (venta['caja'], venta['folio'])
+            if clave in folios_ocupados or clave in folios_lote:
+                errores.append('Folio ya utilizado en la caja')
+            folios_lote.add(clave)
+        if errores:
+            resultado.update(estado='rechazada', errores=errores)
+        else:
+            pendientes.append((venta, resultado))
+
+    if not pendientes:
+        return resultados
+
+    try:
+        ids = _insertar([v for v, _ in pendientes], usuario)
+    except IntegrityError:
+        # Otra sincronización insertó alguno de estos UUID en paralelo: el
+        # índice único abortó el lote completo y se reintenta una sola vez
+        if not _reintentar:
+            raise
+        return sincronizar_ventas(lote, usuario, ubicacion_defecto, _reintentar=False)
+
+    for venta, resultado in pendientes:
+        resultado.update(estado='creada', id_venta=ids[venta['uuid']])
+    return resultados
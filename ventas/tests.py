@@ -1,3 +1,84 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from roles.models import Rol
+from usuarios.models import Usuario
+from .folios import AsignadorFolios, folios_sin_registrar
+from .models import FolioBloque, FolioNoUsado
+
+
+class AsignadorFoliosConcurrenciaTest(TransactionTestCase):
+    """El asignador no debe repetir ni saltarse folios bajo concurrencia"""
+
+    HILOS = 8
+    FOLIOS_POR_HILO = 150
+
+    def _emitir_en_paralelo(self, asignador, caja):
+        resultados = []
+        errores = []
+        lock = threading.Lock()
+        barrera = threading.Barrier(self.HILOS)
+
+        def trabajar():
+            try:
+                barrera.wait()
+                propios = [asignador.siguiente(caja) for _ in range(self.FOLIOS_POR_HILO)]
+                with lock:
+                    resultados.extend(propios)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=trabajar) for _ in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        return resultados
+
+    def test_folios_sin_duplicados_ni_huecos(self):
+        asignador = AsignadorFolios(tamano_bloque=25)
+        folios = self._emitir_en_paralelo(asignador, 'CAJA-1')
+
+        total = self.HILOS * self.FOLIOS_POR_HILO
+        self.assertEqual(len(folios), total)
+        self.assertEqual(len(set(folios)), total)
+        self.assertEqual(sorted(folios), list(range(1, total + 1)))
+
+    def test_folios_liberados_quedan_registrados(self):
+        asignador = AsignadorFolios(tamano_bloque=40)
+        folios = self._emitir_en_paralelo(asignador, 'CAJA-2')
+
+        liberados = asignador.liberar('CAJA-2')
+        reservados = FolioBloque.objects.filter(caja='CAJA-2').count() * 40
+
+        self.assertEqual(len(folios) + liberados, reservados)
+        no_usados = set(FolioNoUsado.objects.filter(caja='CAJA-2').values_list('folio', flat=True))
+        self.assertTrue(no_usados.isdisjoint(folios))
+        # Sin ventas registradas, todo lo emitido aparece pendiente de auditar
+        self.assertEqual(folios_sin_registrar('CAJA-2'), sorted(folios))
+
+        # Al volver a pedir folios se reserva un bloque nuevo a continuación
+        self.assertEqual(asignador.siguiente('CAJA-2'), reservados + 1)
+
+
+class TurnoPermisosTest(TestCase):
+
+    def test_turnos_exigen_permiso_de_venta(self):
+        rol = Rol.objects.create(nombre='Bodeguero', descripcion='Bodega')
+        usuario = Usuario(
+            username='ana@dulceria.cl', correo='ana@dulceria.cl', nombre='Ana', id_rol=rol, forzar_cambio_contrasena=False
+        )
+        usuario.set_unusable_password()
+        usuario.save()
+        self.client.force_login(usuario)
+
+        for vista in ('ventas:abrir_turno', 'ventas:cerrar_turno'):
+            respuesta = self.client.post(reverse(vista), {'caja': 'Caja 1'})
+            self.assertEqual(respuesta.status_code, 403)
+            self.assertFalse(respuesta.json()['success'])
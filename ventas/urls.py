@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'ventas'
+
+urlpatterns = [
+    path('sincronizar/', views.sincronizar_ventas_view, name='sincronizar_ventas'),
+    path('turnos/abrir/', views.abrir_turno, name='abrir_turno'),
+    path('turnos/cerrar/', views.cerrar_turno, name='cerrar_turno'),
+    path('reservas/', views.reservar_pedido, name='reservar_pedido'),
+    path('reservas/<uuid:pedido>/cobrar/', views.cobrar_pedido, name='cobrar_pedido'),
+]
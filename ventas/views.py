@@ -1,3 +1,133 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+from roles.permisos import requiere_permiso
+from inventarios.reservas import reservar
+from .models import Turno
+from .reservas import cobrar_reserva
+from .sincronizacion import MAX_VENTAS_POR_LOTE, sincronizar_ventas, _entero
+
+
+@login_required
+@require_POST
+@requiere_permiso('vender', json=True)
+def sincronizar_ventas_view(request):
+    """API para que las cajas suban en lote las ventas registradas offline"""
+    user = request.user
+    
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'success': False, 'message': 'JSON inválido'}, status=400)
+    
+    lote = payload.get('ventas') if isinstance(payload, dict) else None
+    if not isinstance(lote, list):
+        return JsonResponse({'success': False, 'message': 'Se esperaba una lista "ventas"'}, status=400)
+    
+    if len(lote) > MAX_VENTAS_POR_LOTE:
+        return JsonResponse({
+            'success': False,
+            'message': f'El lote no puede superar {MAX_VENTAS_POR_LOTE} ventas'
+        }, status=400)
+    
+    resultados = sincronizar_ventas(lote, user, ubicacion_defecto=str(payload.get('ubicacion') or ''))
+    
+    return JsonResponse({
+        'success': True,
+        'creadas': sum(1 for r in resultados if r['estado'] == 'creada'),
+        'duplicadas': sum(1 for r in resultados if r['estado'] == 'duplicada'),
+        'rechazadas': sum(1 for r in resultados if r['estado'] == 'rechazada'),
+        'resultados': resultados,
+    })
+
+
+@login_required
+@require_POST
+@requiere_permiso('vender', json=True)
+def abrir_turno(request):
+    """API para abrir el turno de caja del usuario actual"""
+    turno = Turno.abrir(request.user)
+    return JsonResponse({
+        'success': True,
+        'turno': {
+            'id': turno.id_turno,
+            'apertura': turno.apertura.isoformat(),
+            'cantidad_ventas': turno.cantidad_ventas,
+            'total': turno.total,
+        }
+    })
+
+
+@login_required
+@require_POST
+@requiere_permiso('vender', json=True)
+def cerrar_turno(request):
+    """API para cerrar el turno abierto del usuario actual con su conciliación"""
+    turno = Turno.objects.filter(id_usuario=request.user, cierre__isnull=True).first()
+    if turno is None:
+        return JsonResponse({'success': False, 'message': 'No tienes un turno abierto'}, status=404)
+    
+    resumen = turno.cerrar()
+    resumen['apertura'] = resumen['apertura'].isoformat()
+    resumen['cierre'] = resumen['cierre'].isoformat()
+    return JsonResponse({'success': True, 'turno': resumen})
+
+
+@login_required
+@require_POST
+@requiere_permiso('vender', json=True)
+def reservar_pedido(request):
+    """API para apartar el stock de un pedido telefónico hasta que se pague"""
+    user = request.user
+    
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'success': False, 'message': 'JSON inválido'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'success': False, 'message': 'JSON inválido'}, status=400)
+    
+    cliente = _entero(payload.get('cliente'))
+    ubicacion = str(payload.get('ubicacion') or '')
+    lineas = []
+    for linea in payload.get('lineas') or []:
+        producto = _entero(linea.get('producto')) if isinstance(linea, dict) else None
+        cantidad = _entero(linea.get('cantidad')) if isinstance(linea, dict) else None
+        if producto is None or cantidad is None:
+            return JsonResponse({'success': False, 'message': 'Línea inválida'}, status=400)
+        lineas.append((producto, cantidad))
+    if cliente is None or not ubicacion:
+        return JsonResponse({'success': False, 'message': 'Cliente y ubicación son obligatorios'}, status=400)
+    
+    try:
+        pedido = reservar(lineas, ubicacion, cliente, user, minutos=_entero(payload.get('minutos')))
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'message': ' '.join(e.messages)}, status=409)
+    
+    return JsonResponse({'success': True, 'pedido': str(pedido)})
+
+
+@login_required
+@require_POST
+@requiere_permiso('vender', json=True)
+def cobrar_pedido(request, pedido):
+    """API para registrar como venta un pedido reservado"""
+    user = request.user
+    
+    try:
+        venta = cobrar_reserva(
+            pedido,
+            user,
+            medio_pago=request.POST.get('medio_pago', 'efectivo'),
+            caja=request.POST.get('caja', ''),
+        )
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'message': ' '.join(e.messages)}, status=409)
+    
+    return JsonResponse({
+        'success': True,
+        'venta': {'id': venta.id_venta, 'total': venta.total, 'folio': venta.folio},
+    })